@@ -0,0 +1,82 @@
+"""
+Benchmarks the native builtin scorers against the MLflow evaluation path.
+
+    python -m app.benchmark_scorers --rows 1000000 --mlflow-rows 2000
+
+Native scorers run on the full synthetic dataset, one chunk at a time like the
+eval worker does. MLflow is far slower, so it is timed on a sample of
+`--mlflow-rows` rows and its throughput extrapolated.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.eval.native_scorers import NATIVE_SCORERS, native_scores
+
+WORDS = np.array(
+    "the a of to and in is it you that was for on are with as his they be at one have this from "
+    "package return policy days weather sunny refund order shipping account password support".split()
+)
+
+
+def make_dataset(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    def sentences(lengths):
+        tokens = WORDS[rng.integers(0, len(WORDS), lengths.sum())]
+        return [" ".join(t) + "." for t in np.split(tokens, np.cumsum(lengths)[:-1])]
+
+    outputs = sentences(rng.integers(3, 40, rows))
+    ground_truth = sentences(rng.integers(3, 40, rows))
+    # Some exact answers, so match metrics are not all zero
+    exact = rng.random(rows) < 0.2
+    ground_truth = [o if e else g for o, e, g in zip(outputs, exact, ground_truth)]
+    return pd.DataFrame({"inputs": ["question"] * rows, "outputs": outputs, "ground_truth": ground_truth})
+
+
+def bench_native(df: pd.DataFrame, metric_name: str, chunk_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(df), chunk_size):
+        native_scores(df.iloc[offset:offset + chunk_size], NATIVE_SCORERS[metric_name], metric_name)
+    return len(df) / (time.perf_counter() - start)
+
+
+def bench_mlflow(df: pd.DataFrame, metric_name: str) -> float:
+    import mlflow
+
+    start = time.perf_counter()
+    with mlflow.start_run(run_name=f"benchmark-{metric_name}"):
+        mlflow.genai.evaluate(data=df, scorers=[metric_name])
+    return len(df) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="rows per chunk, as EVAL_CHUNK_SIZE")
+    parser.add_argument("--mlflow-rows", type=int, default=2_000, help="0 to skip the MLflow path")
+    parser.add_argument("--metrics", nargs="*", default=list(NATIVE_SCORERS))
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows} rows...")
+    df = make_dataset(args.rows)
+    sample = df.head(args.mlflow_rows)
+
+    print(f"\n{'metric':<28}{'native rows/s':>16}{'mlflow rows/s':>16}{'speedup':>10}")
+    for metric_name in args.metrics:
+        native = bench_native(df, metric_name, args.chunk_size)
+        line = f"{metric_name:<28}{native:>16,.0f}"
+        if args.mlflow_rows:
+            try:
+                reference = bench_mlflow(sample, metric_name)
+                line += f"{reference:>16,.0f}{native / reference:>9.0f}x"
+            except Exception as e:
+                line += f"{'n/a':>16}  ({type(e).__name__}: {e})"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
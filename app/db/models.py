@@ -3,7 +3,7 @@ from enum import Enum
 from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import Enum as SQLAlchemyEnum, JSON, ARRAY, UUID as SA_UUID, Column
+from sqlalchemy import Enum as SQLAlchemyEnum, JSON, ARRAY, UUID as SA_UUID, BigInteger, Column, Index, UniqueConstraint
 from sqlmodel import Field, SQLModel
 
 
@@ -43,7 +43,10 @@ class ScorerDefinition(SQLModel, table=True):
     name: str = Field(max_length=255)
     description: Optional[str] = None
     scorer_type: ScorerType = Field(
-        sa_type=SQLAlchemyEnum(ScorerType, name="scorertype", create_type=False)
+        # The database enum holds the values ('builtin', ...), not the member names
+        sa_type=SQLAlchemyEnum(
+            ScorerType, name="scorertype", create_type=False, values_callable=lambda enum: [m.value for m in enum]
+        )
     )
     configuration: dict = Field(default_factory=dict, sa_type=JSON)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -61,6 +64,27 @@ class EvaluationProfile(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class Dataset(SQLModel, table=True):
+    """An uploaded dataset, ingested once into Parquet and addressed by content hash."""
+
+    __tablename__ = "datasets"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    sha256: str = Field(unique=True, max_length=64)
+    filename: str = Field(max_length=255)
+    # Format of the upload: 'csv' or 'jsonl'
+    source_format: str = Field(max_length=16)
+    path: str = Field(max_length=255)
+    size_bytes: int = Field(sa_type=BigInteger)
+    row_count: int
+    # Column name -> Arrow type
+    columns: dict = Field(default_factory=dict, sa_type=JSON)
+    # Column name -> null_count, min, max
+    column_stats: dict = Field(default_factory=dict, sa_type=JSON)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
 class RunStatus(str, Enum):
     PENDING = "PENDING"
     PROCESSING = "PROCESSING"
@@ -73,6 +97,8 @@ class EvaluationRun(SQLModel, table=True):
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     profile_id: UUID = Field(foreign_key="evaluation_profiles.id")
+    # Registered dataset; runs from before the registry only have a CSV dataset_path
+    dataset_id: Optional[UUID] = Field(default=None, foreign_key="datasets.id", index=True)
     dataset_path: str = Field(max_length=255)
     mlflow_run_id: Optional[str] = Field(default=None, max_length=255)
     status: RunStatus = Field(
@@ -82,4 +108,110 @@ class EvaluationRun(SQLModel, table=True):
     summary_results: Optional[dict] = Field(default=None, sa_type=JSON)
     row_details_path: Optional[str] = Field(default=None, max_length=255)
     error_message: Optional[str] = None
+    chunk_size: Optional[int] = None
+    # Processes used for CPU-bound (builtin) scorers
+    cpu_workers: Optional[int] = None
+    # Number of independent worker jobs the run's chunks are spread over
+    shard_count: Optional[int] = None
+    # Checkpoint: completed chunks are the run's EvaluationRunChunk records,
+    # these counters track them for progress reporting
+    chunks_completed: int = Field(default=0)
+    rows_completed: int = Field(default=0)
+    total_chunks: Optional[int] = None
+    total_rows: Optional[int] = None
+    # Live rows scored, throughput, per-scorer progress and ETA (see ProgressTracker)
+    progress: Optional[dict] = Field(default=None, sa_type=JSON)
+    cache_hits: int = Field(default=0)
+    cache_misses: int = Field(default=0)
+    # Rows not scored because an identical row of the same chunk already was
+    rows_deduplicated: int = Field(default=0)
+    # Judge calls of this run waiting for rate budget / currently in flight
+    judge_calls_queued: int = Field(default=0)
+    judge_calls_in_flight: int = Field(default=0)
+    # Derived runs reuse the parent's results for scorers that did not change
+    parent_run_id: Optional[UUID] = Field(default=None, foreign_key="evaluation_runs.id", index=True)
+    # Version (id, updated_at) of each scorer the run's results were computed with
+    scorer_versions: Optional[dict] = Field(default=None, sa_type=JSON)
+    # Runs of one batch request share the batch id and are scored in a single pass
+    batch_id: Optional[UUID] = Field(default=None, index=True)
+    # Dataset column scored as the outputs (batch runs), None for `outputs`
+    candidate: Optional[str] = Field(default=None, max_length=255)
+    # Model endpoint and eval_type the run generates its outputs with (see app.services.eval.generation)
+    generation: Optional[dict] = Field(default=None, sa_type=JSON)
+    # Sample size / stratification / sequential stopping settings (see app.services.eval.sampling)
+    sampling: Optional[dict] = Field(default=None, sa_type=JSON)
+    # Per-scorer histograms, quantiles, error counts and pass rates, set at completion
+    distributions: Optional[dict] = Field(default=None, sa_type=JSON)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class EvaluationRunChunk(SQLModel, table=True):
+    """Persisted result of one row batch of an EvaluationRun."""
+
+    __tablename__ = "evaluation_run_chunks"
+    __table_args__ = (UniqueConstraint("run_id", "chunk_index"),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    run_id: UUID = Field(foreign_key="evaluation_runs.id", index=True)
+    chunk_index: int
+    start_row: int
+    row_count: int
+    aggregates: dict = Field(default_factory=dict, sa_type=JSON)
+    results_path: str = Field(max_length=255)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class RunMetric(SQLModel, table=True):
+    """One `<scorer>/<metric>` value of a completed run's summary, for profile trends."""
+
+    __tablename__ = "run_metrics"
+    __table_args__ = (Index("ix_run_metrics_trends", "profile_id", "scorer", "metric", "created_at"),)
+
+    run_id: UUID = Field(foreign_key="evaluation_runs.id", primary_key=True)
+    profile_id: UUID = Field(foreign_key="evaluation_profiles.id")
+    scorer: str = Field(primary_key=True, max_length=255)
+    metric: str = Field(primary_key=True, max_length=64)
+    value: float
+    # The run's creation time, so trends follow the order runs were started in
+    created_at: datetime
+
+
+class ScorerResultCache(SQLModel, table=True):
+    """Memoized score of one scorer configuration on one row's content."""
+
+    __tablename__ = "scorer_result_cache"
+
+    cache_key: str = Field(primary_key=True, max_length=64)
+    score: Optional[float] = None
+    justification: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
+
+
+class JudgeRateBucket(SQLModel, table=True):
+    """Shared request/token bucket levels of one judge model."""
+
+    __tablename__ = "judge_rate_buckets"
+
+    judge_model: str = Field(primary_key=True, max_length=255)
+    requests_level: float = Field(default=0.0)
+    tokens_level: float = Field(default=0.0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class EvaluationJob(SQLModel, table=True):
+    """Queue entry for an EvaluationRun waiting for (or held by) an eval worker."""
+
+    __tablename__ = "evaluation_jobs"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    run_id: UUID = Field(foreign_key="evaluation_runs.id", index=True)
+    # Set for sharded runs: the job scores its shard's contiguous range of chunks
+    shard_index: Optional[int] = None
+    # Set for batch jobs, which execute every run of the batch (run_id is the first one)
+    batch_id: Optional[UUID] = None
+    attempts: int = Field(default=0)
+    worker_id: Optional[str] = Field(default=None, max_length=255)
+    claimed_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,89 @@
+"""
+Local stand-in for an OpenAI-compatible chat completions server.
+
+Answers generation requests by echoing the question and judge requests
+(`response_format: json_object`) with a score derived from the payload, so
+the generation stage and the async judge engine can be exercised without a
+real model:
+
+    python -m app.fake_model_server --port 9000 --latency 0.05 --error-rate 0.05
+
+then use `"base_url": "http://localhost:9000/v1"` in a run's `generation`
+configuration or a judge's configuration.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import zlib
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+# fail_next: answer that many upcoming requests with 429, for deterministic retry tests
+settings = {"latency": 0.0, "error_rate": 0.0, "fail_next": 0}
+stats = {"requests": 0}
+
+
+def _score(payload: str) -> int:
+    return zlib.crc32(payload.encode()) % 5 + 1
+
+
+def _judge_content(payload: str) -> str:
+    try:
+        items = json.loads(payload)
+    except json.JSONDecodeError:
+        items = None
+    if isinstance(items, list):
+        results = [{"id": item.get("id", i), "score": _score(json.dumps(item)), "justification": "stub"}
+                   for i, item in enumerate(items)]
+        return json.dumps({"results": results})
+    return json.dumps({"score": _score(payload), "justification": "stub"})
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    await asyncio.sleep(settings["latency"] * (0.5 + random.random()))
+    if settings["fail_next"] > 0:
+        settings["fail_next"] -= 1
+        return JSONResponse({"error": {"message": "rate limited"}}, status_code=429, headers={"retry-after": "0.01"})
+    if random.random() < settings["error_rate"]:
+        return JSONResponse({"error": {"message": "rate limited"}}, status_code=429, headers={"retry-after": "0.1"})
+
+    payload = body["messages"][-1]["content"]
+    if body.get("response_format", {}).get("type") == "json_object":
+        content = _judge_content(payload)
+    else:
+        content = f"Answer to: {payload.splitlines()[-1]}"
+    prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": "stub",
+        "object": "chat.completion",
+        "model": body.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429")
+    args = parser.parse_args()
+    settings.update(latency=args.latency, error_rate=args.error_rate)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
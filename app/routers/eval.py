@@ -1,37 +1,74 @@
+import asyncio
 import json
 import os
-import shutil
-import tempfile
-from typing import List, Optional
-from uuid import UUID
-
-import pandas as pd
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+import secrets
+import time
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func
 from sqlmodel import Session, select
 
-from app.db.database import get_db_session
+from app.db.database import db, get_db_session
 from app.db.models import (
+    Dataset,
+    EvaluationJob,
     EvaluationProfile,
     EvaluationRun,
+    EvaluationRunChunk,
+    RunMetric,
     RunStatus,
     ScorerDefinition,
 )
 from app.schemas.eval import (
+    BatchRun,
+    BatchRunRequest,
+    BatchRunResponse,
+    DatasetResponse,
     ProfileCreate,
     ProfileResponse,
+    ProfileTrendsResponse,
     ProfileUpdate,
+    ResumableUploadCreate,
+    ResumableUploadResponse,
     RunDetailResponse,
+    RunDistributionsResponse,
     RunRequest,
     RunResponse,
     ScorerCreate,
     ScorerResponse,
     ScorerUpdate,
+    TrendPoint,
     UploadResponse,
 )
-from app.services.eval.execution import run_evaluation_task
+from app.services.eval.compare import REGRESSED_ROWS, compare_runs, remove_comparisons
+from app.services.eval.datasets import ingest_dataset
+from app.services.eval.export import EXPORT_FORMATS, export_report
+from app.services.eval.queue import enqueue_batch, enqueue_run
+from app.services.eval.reports import evict_report, open_report, page_rows, query
+from app.services.eval.results import remove_run_results, run_results_dir
+from app.services.eval.uploads import (
+    MultipartFileStream,
+    UploadOffsetError,
+    UploadTooLargeError,
+    append_part,
+    check_size,
+    complete_upload,
+    get_upload,
+    save_stream,
+    start_upload,
+)
 
 router = APIRouter(prefix="/eval", tags=["eval"])
 
+# How often an SSE stream re-reads its run, and the idle time before a keep-alive
+SSE_POLL_INTERVAL_SECONDS = 1.0
+SSE_KEEPALIVE_SECONDS = 15.0
+
 
 # --- Scorers ---
 
@@ -59,6 +96,8 @@ def update_scorer(scorer_id: UUID, scorer_update: ScorerUpdate, session: Session
     scorer_data = scorer_update.model_dump(exclude_unset=True)
     for key, value in scorer_data.items():
         setattr(db_scorer, key, value)
+    # Also invalidates the workers' hydrated scorer cache entry
+    db_scorer.updated_at = datetime.utcnow()
         
     session.add(db_scorer)
     session.commit()
@@ -103,6 +142,7 @@ def update_profile(profile_id: UUID, profile_update: ProfileUpdate, session: Ses
     profile_data = profile_update.model_dump(exclude_unset=True)
     for key, value in profile_data.items():
         setattr(db_profile, key, value)
+    db_profile.updated_at = datetime.utcnow()
         
     session.add(db_profile)
     session.commit()
@@ -121,39 +161,223 @@ def delete_profile(profile_id: UUID, session: Session = Depends(get_db_session))
     return {"ok": True}
 
 
+@router.get("/profiles/{profile_id}/trends", response_model=ProfileTrendsResponse)
+def get_profile_trends(
+    profile_id: UUID,
+    bucket: str = Query("day", pattern="^(hour|day|week|month)$"),
+    scorer: Optional[List[str]] = Query(None),
+    metric: List[str] = Query(["mean"]),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session: Session = Depends(get_db_session),
+):
+    """
+    Time series of the profile's completed runs: per scorer and summary metric
+    (`mean`, `p50`, `errors`, ...), the runs of each `bucket` averaged in SQL.
+    """
+    if not session.get(EvaluationProfile, profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    bucket_start = func.date_trunc(bucket, RunMetric.created_at).label("bucket")
+    query = (
+        select(
+            RunMetric.scorer,
+            RunMetric.metric,
+            bucket_start,
+            func.count(RunMetric.run_id),
+            func.avg(RunMetric.value),
+            func.min(RunMetric.value),
+            func.max(RunMetric.value),
+        )
+        .where(RunMetric.profile_id == profile_id, RunMetric.metric.in_(metric))
+        .group_by(RunMetric.scorer, RunMetric.metric, bucket_start)
+        .order_by(RunMetric.scorer, RunMetric.metric, bucket_start)
+    )
+    if scorer:
+        query = query.where(RunMetric.scorer.in_(scorer))
+    if start:
+        query = query.where(RunMetric.created_at >= start)
+    if end:
+        query = query.where(RunMetric.created_at < end)
+
+    series: dict = {}
+    for scorer_name, metric_name, bucket_at, runs, mean, low, high in session.exec(query).all():
+        series.setdefault(scorer_name, {}).setdefault(metric_name, []).append(
+            TrendPoint(bucket=bucket_at, runs=runs, mean=mean, min=low, max=high)
+        )
+    return ProfileTrendsResponse(profile_id=profile_id, bucket=bucket, series=series)
+
+
 # --- Data Ingestion ---
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_dataset(file: UploadFile = File(...)):
-    # Save file to a temp location or dedicated upload folder
-    # For MVP, using a temp file that persists (not auto-deleted immediately)
-    # In production, use S3 or a managed volume.
-    
-    upload_dir = os.path.join(tempfile.gettempdir(), "dead-simpl-uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    file_path = os.path.join(upload_dir, f"{file.filename}")
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    # Detect columns
+def _ingest(file_path: str, sha256: str, size: int, filename: str) -> UploadResponse:
+    with Session(db.engine) as session:
+        dataset = ingest_dataset(session, file_path, sha256, filename, size)
+        return UploadResponse(
+            dataset_id=str(dataset.id),
+            detected_columns=list(dataset.columns),
+            sha256=sha256,
+            size_bytes=size,
+            row_count=dataset.row_count,
+        )
+
+
+async def _upload_response(file_path: str, sha256: str, size: int, filename: str) -> UploadResponse:
+    # Registers the dataset, converting it to Parquet unless the content is already known
     try:
-        df = pd.read_csv(file_path, nrows=5) # Read only first few rows
-        columns = df.columns.tolist()
+        return await run_in_threadpool(_ingest, file_path, sha256, size, filename)
     except Exception as e:
-        os.remove(file_path)
-        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {e}")
-        
-    return UploadResponse(dataset_id=file_path, detected_columns=columns)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise HTTPException(status_code=400, detail=f"Invalid dataset file: {e}")
+
+
+def _upload_error(e: ValueError) -> HTTPException:
+    if isinstance(e, UploadTooLargeError):
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, UploadOffsetError):
+        return HTTPException(status_code=409, detail=str(e), headers={"Upload-Offset": str(e.expected)})
+    return HTTPException(status_code=400, detail=str(e))
+
+
+# The body is parsed by hand, so the form is documented here
+_UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }
+        }
+    },
+}
+
+
+@router.post("/upload", response_model=UploadResponse, openapi_extra={"requestBody": _UPLOAD_REQUEST_BODY})
+async def upload_dataset(request: Request):
+    # The multipart body is streamed straight from the request to the upload's
+    # file (see app.services.eval.uploads), and reading stops once it is over
+    # the size limit. In production, point EVAL_UPLOAD_DIR at S3-backed or managed storage.
+    content_length = request.headers.get("content-length")
+    try:
+        check_size(int(content_length) if content_length and content_length.isdigit() else None)
+        upload = MultipartFileStream(request.headers.get("content-type", ""), request.stream())
+        filename = await upload.open()
+        file_path, sha256, size = await save_stream(upload.chunks(), filename)
+    except ValueError as e:
+        raise _upload_error(e)
+    return await _upload_response(file_path, sha256, size, filename)
+
+
+@router.post("/uploads", response_model=ResumableUploadResponse)
+def start_resumable_upload(upload: ResumableUploadCreate):
+    """Opens a resumable upload; send its parts with PUT /uploads/{upload_id}."""
+    try:
+        started = start_upload(upload.filename, upload.size, upload.sha256)
+    except ValueError as e:
+        raise _upload_error(e)
+    return ResumableUploadResponse(upload_id=started.upload_id, size=started.size, offset=0)
+
+
+@router.get("/uploads/{upload_id}", response_model=ResumableUploadResponse)
+def get_resumable_upload(upload_id: str):
+    """Current offset of an upload, to resume it after a dropped connection."""
+    upload = get_upload(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return ResumableUploadResponse(upload_id=upload.upload_id, size=upload.size, offset=upload.offset)
+
+
+@router.put("/uploads/{upload_id}", response_model=ResumableUploadResponse)
+async def append_resumable_upload(upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+    """Appends the raw request body at `offset`, which must be the upload's current offset."""
+    upload = get_upload(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    try:
+        new_offset = await append_part(upload, offset, request.stream())
+    except ValueError as e:
+        raise _upload_error(e)
+    return ResumableUploadResponse(upload_id=upload.upload_id, size=upload.size, offset=new_offset)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=UploadResponse)
+async def complete_resumable_upload(upload_id: str):
+    upload = get_upload(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    try:
+        file_path, sha256, size = await complete_upload(upload)
+    except ValueError as e:
+        raise _upload_error(e)
+    return await _upload_response(file_path, sha256, size, upload.filename)
+
+
+@router.get("/datasets/{dataset_id}", response_model=DatasetResponse)
+def get_dataset(dataset_id: UUID, session: Session = Depends(get_db_session)):
+    dataset = session.get(Dataset, dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return dataset
+
+
+def _resolve_dataset(session: Session, dataset_id: str) -> Tuple[Optional[Dataset], str]:
+    """
+    Looks up a run's dataset: a registered dataset id, or the path of a
+    dataset uploaded before the registry existed.
+    """
+    try:
+        dataset = session.get(Dataset, UUID(dataset_id))
+    except ValueError:
+        if not os.path.exists(dataset_id):
+            raise HTTPException(status_code=404, detail="Dataset not found")
+        return None, dataset_id
+    if not dataset or not os.path.exists(dataset.path):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    # Keeps the dataset clear of garbage collection until the run references it
+    dataset.last_used_at = datetime.utcnow()
+    session.add(dataset)
+    return dataset, dataset.path
 
 
 # --- Execution ---
 
+def _sampling_settings(session: Session, run_request: RunRequest, dataset_path: str) -> Optional[dict]:
+    if not run_request.sample_size and not run_request.sequential:
+        return None
+    if run_request.parent_run_id:
+        raise HTTPException(status_code=400, detail="Derived runs cannot be sampled")
+    if run_request.sequential:
+        if not run_request.ci_width and not run_request.baseline_run_id:
+            raise HTTPException(status_code=400, detail="Sequential runs need ci_width or baseline_run_id")
+        if (run_request.shards or 1) > 1:
+            raise HTTPException(status_code=400, detail="Sequential runs cannot be sharded")
+    if run_request.baseline_run_id:
+        baseline = session.get(EvaluationRun, run_request.baseline_run_id)
+        if not baseline or baseline.status != RunStatus.COMPLETED:
+            raise HTTPException(status_code=400, detail="Baseline run not found or not completed")
+        if baseline.dataset_path != dataset_path:
+            raise HTTPException(status_code=400, detail="Baseline run was evaluated on a different dataset")
+
+    sampling = {
+        "sample_size": run_request.sample_size,
+        "stratify_by": run_request.stratify_by,
+        # Fixed up front, so a resumed run draws the same sample
+        "seed": run_request.sample_seed if run_request.sample_seed is not None else secrets.randbits(32),
+        "sequential": run_request.sequential,
+        "ci_width": run_request.ci_width,
+        "confidence": run_request.confidence,
+        "baseline_run_id": str(run_request.baseline_run_id) if run_request.baseline_run_id else None,
+        "min_rows": run_request.min_rows,
+    }
+    return {k: v for k, v in sampling.items() if v is not None}
+
+
 @router.post("/runs", response_model=RunResponse)
 def trigger_run(
     run_request: RunRequest, 
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_db_session)
 ):
     # Validate Profile
@@ -162,38 +386,160 @@ def trigger_run(
         raise HTTPException(status_code=404, detail="Profile not found")
         
     # Validate Dataset
-    if not os.path.exists(run_request.dataset_id):
-        raise HTTPException(status_code=404, detail="Dataset not found")
-        
+    dataset, dataset_path = _resolve_dataset(session, run_request.dataset_id)
+
+    chunk_size = run_request.chunk_size
+    if run_request.parent_run_id:
+        # Derived run: reuses the parent's row results, chunk by chunk
+        parent = session.get(EvaluationRun, run_request.parent_run_id)
+        if not parent:
+            raise HTTPException(status_code=404, detail="Parent run not found")
+        if parent.status != RunStatus.COMPLETED:
+            raise HTTPException(status_code=409, detail="Parent run is not completed")
+        if parent.dataset_path != dataset_path:
+            raise HTTPException(status_code=400, detail="Parent run was evaluated on a different dataset")
+        if not os.path.isdir(run_results_dir(parent.id)):
+            raise HTTPException(status_code=409, detail="Parent run has no chunked row results")
+        if parent.sampling:
+            raise HTTPException(status_code=400, detail="Sampled or sequential runs cannot be parents")
+        if (parent.candidate or "outputs") != "outputs":
+            # Batch runs may have scored another column than `outputs`
+            raise HTTPException(status_code=400, detail=f"Parent run scored the {parent.candidate} candidate")
+        if parent.generation:
+            # Derived runs score the dataset's outputs, not the parent's generated ones
+            raise HTTPException(status_code=400, detail="Parent run generated its outputs")
+        # Same chunk boundaries as the parent, so chunks line up one to one
+        chunk_size = parent.chunk_size
+
+    sampling = _sampling_settings(session, run_request, dataset_path)
+    generation = None
+    if run_request.generation:
+        if run_request.parent_run_id:
+            raise HTTPException(status_code=400, detail="Derived runs cannot generate outputs")
+        if run_request.eval_type not in ("rag", "chatbot", "agent"):
+            raise HTTPException(status_code=400, detail=f"Unknown eval_type: {run_request.eval_type}")
+        generation = {**run_request.generation.model_dump(), "eval_type": run_request.eval_type}
+
     # Create Run Record
     db_run = EvaluationRun(
         profile_id=run_request.profile_id,
-        dataset_path=run_request.dataset_id,
+        dataset_id=dataset.id if dataset else None,
+        dataset_path=dataset_path,
+        total_rows=dataset.row_count if dataset else None,
+        chunk_size=chunk_size,
+        cpu_workers=run_request.cpu_workers,
+        shard_count=run_request.shards,
+        parent_run_id=run_request.parent_run_id,
+        sampling=sampling,
+        generation=generation,
         status=RunStatus.PENDING
     )
     session.add(db_run)
+    session.flush()
+    
+    # Queue for the eval workers (app.services.eval.worker), same transaction as the run
+    enqueue_run(session, db_run.id, db_run.shard_count)
     session.commit()
     session.refresh(db_run)
     
-    # Dispatch Background Task
-    background_tasks.add_task(run_evaluation_task, db_run.id)
-    
     return RunResponse(run_id=db_run.id, status=RunStatus.PENDING)
 
 
+@router.post("/runs/batch", response_model=BatchRunResponse)
+def trigger_batch_run(batch_request: BatchRunRequest, session: Session = Depends(get_db_session)):
+    """
+    Evaluates several candidates against several profiles in one pass over
+    the dataset: one run per (profile, candidate), sharing a batch id.
+    """
+    profile_ids = list(dict.fromkeys(batch_request.profile_ids))
+    found = set(session.exec(select(EvaluationProfile.id).where(EvaluationProfile.id.in_(profile_ids))).all())
+    if len(found) < len(profile_ids):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    dataset, dataset_path = _resolve_dataset(session, batch_request.dataset_id)
+    candidates = list(dict.fromkeys(batch_request.candidates))
+    if dataset:
+        missing = [c for c in candidates if c not in dataset.columns]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Dataset has no column {', '.join(missing)}")
+
+    batch_id = uuid4()
+    runs = [
+        EvaluationRun(
+            profile_id=profile_id,
+            dataset_id=dataset.id if dataset else None,
+            dataset_path=dataset_path,
+            total_rows=dataset.row_count if dataset else None,
+            chunk_size=batch_request.chunk_size,
+            cpu_workers=batch_request.cpu_workers,
+            batch_id=batch_id,
+            candidate=candidate,
+            status=RunStatus.PENDING,
+        )
+        for profile_id in profile_ids
+        for candidate in candidates
+    ]
+    session.add_all(runs)
+    session.flush()
+
+    # A single job: one worker scores the whole batch
+    enqueue_batch(session, batch_id, [run.id for run in runs])
+    session.commit()
+
+    return BatchRunResponse(
+        batch_id=batch_id,
+        status=RunStatus.PENDING,
+        runs=[BatchRun(run_id=run.id, profile_id=run.profile_id, candidate=run.candidate) for run in runs],
+    )
+
+
 @router.get("/runs", response_model=List[RunDetailResponse])
 def list_runs(
     profile_id: Optional[UUID] = None, 
+    batch_id: Optional[UUID] = None,
     session: Session = Depends(get_db_session)
 ):
     query = select(EvaluationRun)
     if profile_id:
         query = query.where(EvaluationRun.profile_id == profile_id)
+    if batch_id:
+        query = query.where(EvaluationRun.batch_id == batch_id)
     
     runs = session.exec(query).all()
     return runs
 
 
+@router.get("/runs/compare")
+def compare_runs_endpoint(
+    a: UUID,
+    b: UUID,
+    top: int = Query(20, ge=0, le=REGRESSED_ROWS),
+    session: Session = Depends(get_db_session),
+):
+    """
+    Diffs run `b` against run `a` (same dataset): per-scorer mean delta,
+    win/loss/tie counts and the `top` most regressed rows.
+    """
+    runs = {}
+    for key, run_id in (("a", a), ("b", b)):
+        run = session.get(EvaluationRun, run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail=f"Run {key} not found")
+        if run.status != RunStatus.COMPLETED or not run.row_details_path:
+            raise HTTPException(status_code=409, detail=f"Run {key} is not completed")
+        runs[key] = run
+    if runs["a"].dataset_path != runs["b"].dataset_path:
+        raise HTTPException(status_code=400, detail="Runs were evaluated on different datasets")
+
+    try:
+        comparison = compare_runs(a, runs["a"].row_details_path, b, runs["b"].row_details_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to compare runs: {e}")
+    for diff in comparison["scorers"].values():
+        diff["most_regressed"] = diff["most_regressed"][:top]
+    return comparison
+
+
 @router.get("/runs/{run_id}", response_model=RunDetailResponse)
 def get_run(run_id: UUID, session: Session = Depends(get_db_session)):
     run = session.get(EvaluationRun, run_id)
@@ -202,14 +548,139 @@ def get_run(run_id: UUID, session: Session = Depends(get_db_session)):
     return run
 
 
+@router.get("/runs/{run_id}/distributions", response_model=RunDistributionsResponse)
+def get_run_distributions(run_id: UUID, session: Session = Depends(get_db_session)):
+    """Per-scorer score distributions, precomputed when the run completed."""
+    row = session.exec(
+        select(EvaluationRun.status, EvaluationRun.distributions).where(EvaluationRun.id == run_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Run not found")
+    status, distributions = row
+    return RunDistributionsResponse(run_id=run_id, status=status, distributions=distributions)
+
+
+def _run_events_snapshot(run_id: UUID) -> Optional[dict]:
+    with Session(db.engine) as session:
+        run = session.get(EvaluationRun, run_id)
+        if not run:
+            return None
+        return {
+            "status": run.status.value,
+            "progress": run.progress,
+            "summary_results": run.summary_results,
+            "error_message": run.error_message,
+        }
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/runs/{run_id}/events")
+async def stream_run_events(run_id: UUID, request: Request):
+    """
+    Server-Sent Events stream of a run: `progress` events while it runs, then
+    one terminal `status` event (COMPLETED/FAILED) before the stream closes.
+    """
+    if await asyncio.to_thread(_run_events_snapshot, run_id) is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    async def events():
+        last_status, last_progress, last_sent = None, None, time.monotonic()
+        while not await request.is_disconnected():
+            snapshot = await asyncio.to_thread(_run_events_snapshot, run_id)
+            if snapshot is None:
+                yield _sse("status", {"status": "DELETED"})
+                return
+
+            if snapshot["status"] in (RunStatus.COMPLETED.value, RunStatus.FAILED.value):
+                yield _sse("progress", snapshot["progress"])
+                yield _sse("status", snapshot)
+                return
+            if snapshot["status"] != last_status:
+                yield _sse("status", {"status": snapshot["status"]})
+                last_status, last_sent = snapshot["status"], time.monotonic()
+            if snapshot["progress"] != last_progress:
+                yield _sse("progress", snapshot["progress"])
+                last_progress, last_sent = snapshot["progress"], time.monotonic()
+            elif time.monotonic() - last_sent > SSE_KEEPALIVE_SECONDS:
+                # Comment line, keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+            await asyncio.sleep(SSE_POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/runs/{run_id}/retry", response_model=RunResponse)
+def retry_run(run_id: UUID, session: Session = Depends(get_db_session)):
+    run = session.get(EvaluationRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if run.status != RunStatus.FAILED:
+        raise HTTPException(status_code=409, detail="Only failed runs can be retried")
+    
+    # Workers resume from the completed chunks
+    if run.batch_id:
+        # Batch runs fail together and are retried together, by a new batch job
+        batch = session.exec(
+            select(EvaluationRun).where(EvaluationRun.batch_id == run.batch_id).order_by(EvaluationRun.created_at)
+        ).all()
+        for batch_run in batch:
+            if batch_run.status == RunStatus.FAILED:
+                batch_run.status = RunStatus.PENDING
+                session.add(batch_run)
+        for job in session.exec(select(EvaluationJob).where(EvaluationJob.batch_id == run.batch_id)).all():
+            session.delete(job)
+        enqueue_batch(session, run.batch_id, [batch_run.id for batch_run in batch])
+        session.commit()
+        return RunResponse(run_id=run.id, status=RunStatus.PENDING)
+
+    run.status = RunStatus.PENDING
+    session.add(run)
+    for job in session.exec(select(EvaluationJob).where(EvaluationJob.run_id == run_id)).all():
+        session.delete(job)
+    enqueue_run(session, run.id, run.shard_count)
+    session.commit()
+    
+    return RunResponse(run_id=run.id, status=RunStatus.PENDING)
+
+
 @router.delete("/runs/{run_id}")
 def delete_run(run_id: UUID, session: Session = Depends(get_db_session)):
     run = session.get(EvaluationRun, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     
+    for job in session.exec(select(EvaluationJob).where(EvaluationJob.run_id == run_id)).all():
+        # A batch job keeps going for the batch's other runs
+        sibling = session.exec(
+            select(EvaluationRun.id).where(EvaluationRun.batch_id == job.batch_id, EvaluationRun.id != run_id)
+        ).first() if job.batch_id else None
+        if sibling:
+            job.run_id = sibling
+            session.add(job)
+        else:
+            session.delete(job)
+    for chunk in session.exec(select(EvaluationRunChunk).where(EvaluationRunChunk.run_id == run_id)).all():
+        session.delete(chunk)
+    session.execute(delete(RunMetric).where(RunMetric.run_id == run_id))
+    # Derived runs own a full copy of their results, they only lose the link
+    for child in session.exec(select(EvaluationRun).where(EvaluationRun.parent_run_id == run_id)).all():
+        child.parent_run_id = None
+        session.add(child)
     session.delete(run)
     session.commit()
+    if run.row_details_path:
+        evict_report(run.row_details_path)
+    remove_run_results(run_id)
+    remove_comparisons(run_id)
     return {"ok": True}
 
 
@@ -218,47 +689,81 @@ def delete_run(run_id: UUID, session: Session = Depends(get_db_session)):
 @router.get("/reports/{run_id}/rows")
 def get_run_rows(
     run_id: UUID, 
-    page: int = 1, 
-    page_size: int = 50, 
+    page: int = Query(1, ge=1), 
+    page_size: int = Query(50, ge=1, le=1000), 
+    cursor: Optional[int] = None,
+    filters: Optional[List[str]] = Query(None, alias="filter"),
+    sort: Optional[str] = None,
+    search: Optional[str] = None,
     session: Session = Depends(get_db_session)
 ):
+    """
+    Pages through a run's row-level results.
+
+    - `filter`: repeatable `<scorer><op><value>` (op: < <= > >= = !=),
+      e.g. `faithfulness<3`; `<scorer>=null` selects rows the scorer errored on.
+    - `sort`: scorer to sort by, `-<scorer>` for descending.
+    - `search`: case-insensitive substring of the inputs or outputs.
+
+    Pass the previous page's `next_cursor` as `cursor` to page by keyset:
+    any page then costs the same as the first. Without a cursor (and on
+    sorted queries), `page` is used.
+    """
     run = session.get(EvaluationRun, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
         
     if not run.row_details_path or not os.path.exists(run.row_details_path):
         # If no details yet or file missing
-        return {"items": [], "total": 0, "page": page, "pages": 0}
+        return {"items": [], "total": 0, "page": page, "pages": 0, "next_cursor": None}
         
     try:
-        # Load the JSON/Parquet file
-        # For MVP, assuming JSON list of dicts or similar structure
-        # If it's a large file, we should use a library that supports chunking or a DB
-        # But for "dead simpl", loading into pandas and paginating is fine for moderate sizes
-        
-        # Check file extension to decide how to read
-        if run.row_details_path.endswith(".json"):
-            df = pd.read_json(run.row_details_path)
-        elif run.row_details_path.endswith(".parquet"):
-            df = pd.read_parquet(run.row_details_path)
-        else:
-             # Fallback or error
-             df = pd.read_json(run.row_details_path)
-             
-        total_items = len(df)
-        total_pages = (total_items + page_size - 1) // page_size
-        
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        
-        page_data = df.iloc[start_idx:end_idx].to_dict(orient="records")
-        
-        return {
-            "items": page_data,
-            "total": total_items,
-            "page": page,
-            "pages": total_pages
-        }
-        
+        report = open_report(run.row_details_path)
+        table, total_items = query(
+            report,
+            filters=filters,
+            sort=sort,
+            search=search,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+            cursor=cursor,
+        )
+        items, next_cursor = page_rows(table, page_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load report: {e}")
+
+    return {
+        "items": items,
+        "total": total_items,
+        "page": page,
+        "pages": (total_items + page_size - 1) // page_size,
+        "next_cursor": None if sort else next_cursor,
+    }
+
+
+@router.get("/reports/{run_id}/export")
+def export_run_rows(
+    run_id: UUID,
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    columns: Optional[List[str]] = Query(None),
+    session: Session = Depends(get_db_session),
+):
+    """Streams all row-level results of a run as NDJSON, CSV or Parquet, optionally only `columns`."""
+    run = session.get(EvaluationRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if not run.row_details_path or not os.path.exists(run.row_details_path):
+        raise HTTPException(status_code=409, detail="Run has no row results yet")
+
+    try:
+        body = export_report(open_report(run.row_details_path), format, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="run-{run_id}.{format}"'},
+    )
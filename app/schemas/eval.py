@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 
 from app.db.models import RunStatus, ScorerType
 
@@ -54,12 +54,63 @@ class ProfileResponse(BaseModel):
 class UploadResponse(BaseModel):
     dataset_id: str
     detected_columns: List[str]
+    sha256: Optional[str] = None
+    size_bytes: Optional[int] = None
+    row_count: Optional[int] = None
+
+
+class DatasetResponse(BaseModel):
+    id: UUID
+    sha256: str
+    filename: str
+    source_format: str
+    size_bytes: int
+    row_count: int
+    columns: Dict[str, str]
+    column_stats: Dict[str, Any]
+    created_at: datetime
+
+
+class ResumableUploadCreate(BaseModel):
+    filename: str
+    size: int = Field(gt=0)  # total bytes the client will send
+    sha256: Optional[str] = None  # checked on completion when given
+
+
+class ResumableUploadResponse(BaseModel):
+    upload_id: str
+    size: int
+    offset: int  # bytes received so far, where the next part starts
+
+
+class GenerationConfig(BaseModel):
+    model: str  # e.g. "openai:/gpt-4o-mini"
+    base_url: Optional[str] = None  # any OpenAI-compatible endpoint, defaults to OPENAI_API_BASE
+    system_prompt: Optional[str] = None  # defaults to a prompt for the run's eval_type
+    temperature: float = 0.0
+    max_tokens: Optional[int] = Field(default=None, gt=0)
+    max_workers: int = Field(default=16, gt=0)  # concurrent requests to the endpoint
+    output_column: str = "outputs"
 
 
 class RunRequest(BaseModel):
     profile_id: UUID
-    dataset_id: str
+    dataset_id: str  # id returned by /upload (paths of older uploads still work)
     eval_type: Optional[str] = "rag"  # 'rag', 'chatbot', 'agent'
+    generation: Optional[GenerationConfig] = None  # generate outputs from `inputs` before scoring
+    chunk_size: Optional[int] = Field(default=None, gt=0)  # rows scored per checkpointed chunk
+    cpu_workers: Optional[int] = Field(default=None, gt=0)  # processes for builtin scorers
+    shards: Optional[int] = Field(default=None, gt=0)  # worker jobs the run is split across
+    parent_run_id: Optional[UUID] = None  # only score scorers added or changed since this run
+    # Sampled / sequential runs (see app.services.eval.sampling)
+    sample_size: Optional[int] = Field(default=None, gt=0)  # score a random sample of this many rows
+    stratify_by: Optional[str] = None  # column the sample keeps the proportions of
+    sample_seed: Optional[int] = None
+    sequential: bool = False  # score in random order and stop once the intervals below are reached
+    ci_width: Optional[float] = Field(default=None, gt=0)  # target width of each scorer's mean interval
+    confidence: float = Field(default=0.95, gt=0, lt=1)
+    baseline_run_id: Optional[UUID] = None  # stop once every mean is decided above/below this run's
+    min_rows: Optional[int] = Field(default=None, gt=0)  # rows scored before a sequential run may stop
 
 
 class RunResponse(BaseModel):
@@ -67,12 +118,86 @@ class RunResponse(BaseModel):
     status: RunStatus
 
 
+class BatchRunRequest(BaseModel):
+    dataset_id: str
+    profile_ids: List[UUID] = Field(min_length=1)
+    # Dataset columns holding each candidate's outputs; one run per (profile, candidate)
+    candidates: List[str] = Field(default_factory=lambda: ["outputs"], min_length=1)
+    chunk_size: Optional[int] = Field(default=None, gt=0)
+    cpu_workers: Optional[int] = Field(default=None, gt=0)
+
+
+class BatchRun(BaseModel):
+    run_id: UUID
+    profile_id: UUID
+    candidate: str
+
+
+class BatchRunResponse(BaseModel):
+    batch_id: UUID
+    status: RunStatus
+    runs: List[BatchRun]
+
+
 class RunDetailResponse(BaseModel):
     id: UUID
     profile_id: UUID
+    dataset_id: Optional[UUID] = None
     dataset_path: str
     mlflow_run_id: Optional[str]
     status: RunStatus
     summary_results: Optional[Dict[str, Any]]
     error_message: Optional[str]
+    chunk_size: Optional[int]
+    cpu_workers: Optional[int]
+    shard_count: Optional[int]
+    chunks_completed: int
+    total_chunks: Optional[int]
+    rows_completed: int
+    total_rows: Optional[int]
+    progress: Optional[Dict[str, Any]]
+    cache_hits: int
+    cache_misses: int
+    rows_deduplicated: int
+    judge_calls_queued: int
+    judge_calls_in_flight: int
+    parent_run_id: Optional[UUID]
+    batch_id: Optional[UUID] = None
+    candidate: Optional[str] = None
+    sampling: Optional[Dict[str, Any]] = None
+    generation: Optional[Dict[str, Any]] = None
+    scorer_versions: Optional[Dict[str, Any]]
     created_at: datetime
+
+    @computed_field
+    @property
+    def cache_hit_ratio(self) -> Optional[float]:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+    @computed_field
+    @property
+    def dedup_ratio(self) -> Optional[float]:
+        return self.rows_deduplicated / self.rows_completed if self.rows_completed else None
+
+
+class RunDistributionsResponse(BaseModel):
+    run_id: UUID
+    status: RunStatus
+    # Scorer output name -> count, errors, error_rate, histogram, quantiles, pass_rates
+    distributions: Optional[Dict[str, Any]]
+
+
+class TrendPoint(BaseModel):
+    bucket: datetime
+    runs: int
+    mean: float
+    min: float
+    max: float
+
+
+class ProfileTrendsResponse(BaseModel):
+    profile_id: UUID
+    bucket: str
+    # Scorer -> metric -> one point per time bucket, oldest first
+    series: Dict[str, Dict[str, List[TrendPoint]]]
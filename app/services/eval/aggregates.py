@@ -0,0 +1,198 @@
+"""
+Mergeable aggregation state for scorer results.
+
+Each chunk (or shard) of a run produces a small state per scorer: count, sum,
+sum of squares, min, max and a t-digest of the score distribution. States
+merge without looking at rows again, so summary metrics, including p50/p90/p99,
+never require re-reading row-level results.
+
+Most scores are discrete (judge grades, pass/fail), where interpolating
+between t-digest centroids is biased. While a scorer has at most
+EXACT_QUANTILE_VALUES distinct scores, its state also keeps the count of each
+one and quantiles are computed exactly from those.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.eval.results import score_columns, scorer_name
+
+# t-digest compression: higher keeps more centroids and gives tighter quantiles
+DIGEST_COMPRESSION = 200
+QUANTILES = (0.5, 0.9, 0.99)
+# Distinct scores counted exactly before quantiles fall back to the t-digest
+EXACT_QUANTILE_VALUES = 128
+
+
+def empty_state() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "sum": 0.0,
+        "sum_sq": 0.0,
+        "min": None,
+        "max": None,
+        "errors": 0,
+        "digest": [],
+        "values": [],
+    }
+
+
+def _compress_digest(means: np.ndarray, weights: np.ndarray) -> List[List[float]]:
+    """
+    Merges sorted centroids so that each one covers at most one unit of the
+    t-digest k1 scale function. Tails keep small centroids, the middle large ones.
+    """
+    if not len(means):
+        return []
+    order = np.argsort(means, kind="stable")
+    means, weights = means[order], weights[order]
+    total = weights.sum()
+
+    def k(q: float) -> float:
+        return DIGEST_COMPRESSION / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    merged = []
+    cur_mean, cur_weight = float(means[0]), float(weights[0])
+    cumulative = 0.0
+    k_left = k(0.0)
+    for mean, weight in zip(means[1:], weights[1:]):
+        if k((cumulative + cur_weight + weight) / total) - k_left <= 1.0:
+            cur_mean += (mean - cur_mean) * weight / (cur_weight + weight)
+            cur_weight += weight
+        else:
+            merged.append([cur_mean, cur_weight])
+            cumulative += cur_weight
+            k_left = k(cumulative / total)
+            cur_mean, cur_weight = float(mean), float(weight)
+    merged.append([cur_mean, cur_weight])
+    return merged
+
+
+def _digest_from_values(values: np.ndarray) -> List[List[float]]:
+    # Scores are often discrete (e.g. 1-5), collapse exact duplicates first
+    unique, counts = np.unique(values, return_counts=True)
+    return _compress_digest(unique.astype(float), counts.astype(float))
+
+
+def _merge_digests(digests: Iterable[List[List[float]]]) -> List[List[float]]:
+    centroids = [c for digest in digests for c in digest]
+    if not centroids:
+        return []
+    array = np.asarray(centroids, dtype=float)
+    return _compress_digest(array[:, 0], array[:, 1])
+
+
+def digest_quantile(digest: List[List[float]], q: float, low: float, high: float) -> float:
+    """Estimates quantile `q` by interpolating between centroid centers."""
+    array = np.asarray(digest, dtype=float)
+    means, weights = array[:, 0], array[:, 1]
+    if len(means) == 1:
+        return float(means[0])
+    # Each centroid's mass is centered on its mean
+    centers = np.cumsum(weights) - weights / 2
+    positions = np.concatenate(([0.0], centers, [weights.sum()]))
+    values = np.concatenate(([low], means, [high]))
+    return float(np.interp(q * weights.sum(), positions, values))
+
+
+def _merge_values(parts: Iterable[Optional[List[List[float]]]]) -> Optional[List[List[float]]]:
+    """Merges [value, count] lists; None once any part is missing or there are too many distinct values."""
+    counts: Dict[float, float] = {}
+    for part in parts:
+        if part is None:
+            return None
+        for value, count in part:
+            counts[value] = counts.get(value, 0) + count
+        if len(counts) > EXACT_QUANTILE_VALUES:
+            return None
+    return [[value, counts[value]] for value in sorted(counts)]
+
+
+def exact_quantile(values: List[List[float]], q: float) -> float:
+    """Quantile `q` of the scores counted in `values`, as np.quantile (linear) on the expanded scores."""
+    array = np.asarray(values, dtype=float)
+    scores, counts = array[:, 0], array[:, 1]
+    cumulative = np.cumsum(counts)
+    position = q * (cumulative[-1] - 1)
+    lower = int(math.floor(position))
+    # Index of the score holding the lower and upper order statistics
+    below = scores[np.searchsorted(cumulative, lower, side="right")]
+    above = scores[np.searchsorted(cumulative, min(lower + 1, cumulative[-1] - 1), side="right")]
+    return float(below + (above - below) * (position - lower))
+
+
+def chunk_state(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Computes the aggregation state of every scorer present in a result chunk."""
+    states = {}
+    for column in score_columns(df):
+        values = pd.to_numeric(df[column], errors="coerce")
+        valid = values.dropna()
+        state = empty_state()
+        state["count"] = int(valid.count())
+        state["sum"] = float(valid.sum())
+        state["sum_sq"] = float((valid ** 2).sum())
+        state["errors"] = int(len(values) - len(valid))
+        if len(valid):
+            state["min"] = float(valid.min())
+            state["max"] = float(valid.max())
+            state["digest"] = _digest_from_values(valid.to_numpy(dtype=float))
+            unique, counts = np.unique(valid.to_numpy(dtype=float), return_counts=True)
+            state["values"] = (
+                [[float(v), int(c)] for v, c in zip(unique, counts)] if len(unique) <= EXACT_QUANTILE_VALUES else None
+            )
+        states[scorer_name(column)] = state
+    return states
+
+
+def merge_states(states: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Merges per-chunk states into one state per scorer."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    digests: Dict[str, List[List[List[float]]]] = {}
+    values: Dict[str, List[Optional[List[List[float]]]]] = {}
+    for chunk in states:
+        for name, state in chunk.items():
+            target = merged.setdefault(name, empty_state())
+            target["count"] += state["count"]
+            target["sum"] += state["sum"]
+            target["sum_sq"] += state["sum_sq"]
+            target["errors"] += state.get("errors", 0)
+            for key, pick in (("min", min), ("max", max)):
+                if state[key] is not None:
+                    target[key] = state[key] if target[key] is None else pick(target[key], state[key])
+            digests.setdefault(name, [target["digest"]]).append(state.get("digest", []))
+            # States persisted before exact counts existed have no "values"
+            values.setdefault(name, [target["values"]]).append(state.get("values"))
+    for name, parts in digests.items():
+        merged[name]["digest"] = _merge_digests(parts)
+        merged[name]["values"] = _merge_values(values[name])
+    return merged
+
+
+def finalize(states: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Turns merged states into `<scorer>/<aggregation>` summary metrics."""
+    metrics = {}
+    for name, state in states.items():
+        count = state["count"]
+        metrics[f"{name}/count"] = count
+        metrics[f"{name}/errors"] = state["errors"]
+        if not count:
+            continue
+        mean = state["sum"] / count
+        variance = max(state["sum_sq"] / count - mean ** 2, 0.0)
+        metrics[f"{name}/mean"] = mean
+        metrics[f"{name}/variance"] = variance
+        metrics[f"{name}/std"] = math.sqrt(variance)
+        metrics[f"{name}/min"] = state["min"]
+        metrics[f"{name}/max"] = state["max"]
+        if state.get("values"):
+            for q in QUANTILES:
+                metrics[f"{name}/p{int(q * 100)}"] = exact_quantile(state["values"], q)
+        elif state.get("digest"):
+            for q in QUANTILES:
+                metrics[f"{name}/p{int(q * 100)}"] = digest_quantile(
+                    state["digest"], q, state["min"], state["max"]
+                )
+    return metrics
@@ -0,0 +1,135 @@
+"""
+Cross-run memoization of scorer results.
+
+A cached score is keyed by a fingerprint of the scorer (type, implementation
+version and configuration) combined with a hash of the row content it was
+computed on. Re-running a profile on a mostly unchanged dataset then only
+sends the changed rows to the scorers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import mlflow
+import pandas as pd
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.db.models import ScorerDefinition, ScorerResultCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when scoring code changes in a way that invalidates stored results
+SCORER_CACHE_VERSION = "1"
+CACHE_TTL_DAYS = int(os.getenv("EVAL_SCORER_CACHE_TTL_DAYS", "30"))
+CACHE_ENABLED = os.getenv("EVAL_SCORER_CACHE", "true").lower() == "true"
+
+# Columns that define what a scorer sees for a row
+ROW_CONTENT_COLUMNS = ("inputs", "outputs", "context", "ground_truth")
+
+_LOOKUP_BATCH_SIZE = 1000
+
+CachedResult = Tuple[Optional[float], Optional[str]]
+
+
+def scorer_fingerprint(scorer_def: ScorerDefinition) -> str:
+    """Hash of everything about a scorer that can change its output."""
+    payload = json.dumps(
+        {
+            "type": scorer_def.scorer_type.value,
+            "version": SCORER_CACHE_VERSION,
+            "mlflow": mlflow.__version__,
+            "configuration": scorer_def.configuration,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _normalize(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return value
+
+
+def row_hashes(df: pd.DataFrame) -> List[str]:
+    """Content hash of each row, over the columns a scorer can read."""
+    columns = [c for c in ROW_CONTENT_COLUMNS if c in df.columns]
+    records = df[columns].itertuples(index=False, name=None)
+    return [
+        hashlib.sha256(
+            json.dumps([_normalize(v) for v in record], default=str).encode()
+        ).hexdigest()
+        for record in records
+    ]
+
+
+def cache_keys(fingerprint: str, hashes: List[str]) -> List[str]:
+    return [hashlib.sha256(f"{fingerprint}:{h}".encode()).hexdigest() for h in hashes]
+
+
+def lookup(session: Session, keys: List[str]) -> Dict[str, CachedResult]:
+    """Returns the unexpired cached results among `keys`."""
+    found: Dict[str, CachedResult] = {}
+    if not CACHE_ENABLED:
+        return found
+
+    now = datetime.utcnow()
+    unique_keys = list(dict.fromkeys(keys))
+    for i in range(0, len(unique_keys), _LOOKUP_BATCH_SIZE):
+        batch = unique_keys[i:i + _LOOKUP_BATCH_SIZE]
+        rows = session.exec(
+            select(ScorerResultCache).where(
+                ScorerResultCache.cache_key.in_(batch),
+                ScorerResultCache.expires_at > now,
+            )
+        ).all()
+        for row in rows:
+            found[row.cache_key] = (row.score, row.justification)
+    return found
+
+
+def store(session: Session, results: Dict[str, CachedResult]) -> None:
+    """Upserts freshly computed results. The caller owns the commit."""
+    if not CACHE_ENABLED or not results:
+        return
+
+    now = datetime.utcnow()
+    expires_at = now + timedelta(days=CACHE_TTL_DAYS)
+    rows = [
+        {
+            "cache_key": key,
+            "score": None if score is None or pd.isna(score) else float(score),
+            "justification": justification,
+            "created_at": now,
+            "expires_at": expires_at,
+        }
+        for key, (score, justification) in results.items()
+    ]
+    for i in range(0, len(rows), _LOOKUP_BATCH_SIZE):
+        statement = insert(ScorerResultCache).values(rows[i:i + _LOOKUP_BATCH_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=[ScorerResultCache.cache_key],
+            set_={
+                "score": statement.excluded.score,
+                "justification": statement.excluded.justification,
+                "created_at": statement.excluded.created_at,
+                "expires_at": statement.excluded.expires_at,
+            },
+        )
+        session.execute(statement)
+
+
+def evict_expired(session: Session) -> int:
+    """Deletes expired cache entries. Returns the number of rows removed."""
+    result = session.execute(
+        delete(ScorerResultCache).where(ScorerResultCache.expires_at <= datetime.utcnow())
+    )
+    session.commit()
+    return result.rowcount
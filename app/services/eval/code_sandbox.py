@@ -0,0 +1,171 @@
+"""
+Sandboxed subprocess executing user-supplied CODE scorers.
+
+Started by `app.services.eval.code_scorer` inside a bubblewrap jail (own
+user, network, PID and mount namespaces, only the Python installation mounted
+read-only) as `python -I -B <this file> <limits>`; it never imports the
+application. The process checks that it really is isolated, refusing to serve
+otherwise, applies its resource limits (address space, CPU time per batch, no
+file writes), answers with a ready frame and then serves requests read from
+stdin until EOF. Isolation comes from the jail alone: nothing in this process
+is a security boundary.
+
+Each message is a frame: a 4-byte header length, a JSON header, an 8-byte
+payload length and the payload. Score requests carry a batch of rows as an
+Arrow IPC stream and get back an Arrow IPC stream with `score` and
+`justification` columns, one row per input row.
+
+A scorer's code is executed once per process and its function kept, keyed by
+the hash of the code, for all later batches.
+"""
+
+import io
+import json
+import os
+import resource
+import socket
+import struct
+import sys
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+_HEADER = struct.Struct(">I")
+_PAYLOAD = struct.Struct(">Q")
+
+
+
+def encode_frame(header: Dict[str, Any], payload: bytes = b"") -> bytes:
+    encoded = json.dumps(header).encode()
+    return _HEADER.pack(len(encoded)) + encoded + _PAYLOAD.pack(len(payload)) + payload
+
+
+def _read_exact(stream, size: int) -> Optional[bytes]:
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return data
+
+
+def read_frame(stream) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    raw = _read_exact(stream, _HEADER.size)
+    if raw is None:
+        return None
+    header = json.loads(_read_exact(stream, _HEADER.unpack(raw)[0]))
+    payload = _read_exact(stream, _PAYLOAD.unpack(_read_exact(stream, _PAYLOAD.size))[0])
+    return header, payload
+
+
+def table_to_ipc(table: pa.Table) -> bytes:
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def ipc_to_table(payload: bytes) -> pa.Table:
+    return pa.ipc.open_stream(payload).read_all()
+
+
+def _check_isolation(limits: Dict[str, Any]) -> None:
+    """Fails unless the process runs as the jail's user, without network and without the host filesystem."""
+    if os.getuid() != limits["uid"]:
+        raise RuntimeError(f"Running as uid {os.getuid()}, not the sandbox uid {limits['uid']}")
+    interfaces = {name for _, name in socket.if_nameindex()} - {"lo"}
+    if interfaces:
+        raise RuntimeError(f"Network interfaces {sorted(interfaces)} are reachable")
+    for path in limits["hidden_paths"]:
+        if os.path.exists(path):
+            raise RuntimeError(f"{path} is visible")
+
+
+def _apply_limits(limits: Dict[str, Any]) -> None:
+    memory = limits["memory_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _arm_cpu_limit(seconds: int) -> None:
+    # RLIMIT_CPU counts the process lifetime, so move the soft limit before every batch
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (used + seconds, hard))
+
+
+def _load(code: str, function: str) -> Callable:
+    namespace: Dict[str, Any] = {"__name__": "code_scorer"}
+    exec(compile(code, "<code scorer>", "exec"), namespace)
+    fn = namespace.get(function)
+    if not callable(fn):
+        raise ValueError(f"Code scorer defines no function named {function!r}")
+    return fn
+
+
+def _to_result_table(output: Any, rows: int) -> pa.Table:
+    """
+    Accepts a DataFrame or dict with `score` (and optional `justification`),
+    or a sequence of scores or of (score, justification) pairs.
+    """
+    if isinstance(output, (pd.DataFrame, dict)):
+        scores = list(output["score"])
+        justifications = list(output["justification"]) if "justification" in output else [None] * len(scores)
+    else:
+        items = list(output)
+        pairs = [item if isinstance(item, (tuple, list)) else (item, None) for item in items]
+        scores = [pair[0] for pair in pairs]
+        justifications = [pair[1] for pair in pairs]
+    if len(scores) != rows:
+        raise ValueError(f"Code scorer returned {len(scores)} results for {rows} rows")
+    return pa.table({
+        "score": pa.array(pd.to_numeric(pd.Series(scores, dtype=object), errors="coerce"), type=pa.float64()),
+        "justification": pa.array([None if j is None else str(j) for j in justifications], type=pa.string()),
+    })
+
+
+def main() -> None:
+    limits = json.loads(sys.argv[1])
+
+    # The protocol owns the original stdin/stdout; prints from user code go to stderr
+    proto_in = os.fdopen(os.dup(0), "rb")
+    proto_out = os.fdopen(os.dup(1), "wb")
+    os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+    os.dup2(2, 1)
+
+    try:
+        _check_isolation(limits)
+        _apply_limits(limits)
+    except Exception as e:
+        proto_out.write(encode_frame({"ok": False, "error": f"Sandbox is not isolated: {e}"}))
+        proto_out.flush()
+        sys.exit(1)
+    proto_out.write(encode_frame({"ok": True}))
+    proto_out.flush()
+
+    functions: Dict[str, Callable] = {}
+    while True:
+        frame = read_frame(proto_in)
+        if frame is None:
+            return
+        header, payload = frame
+        try:
+            code_hash = header["code_hash"]
+            if code_hash not in functions:
+                if "code" not in header:
+                    raise KeyError(f"Code {code_hash} is not loaded")
+                functions[code_hash] = _load(header["code"], header.get("function", "score"))
+
+            batch = ipc_to_table(payload).to_pandas()
+            _arm_cpu_limit(limits["cpu_seconds"])
+            output = functions[code_hash](batch)
+            response = encode_frame({"ok": True}, table_to_ipc(_to_result_table(output, len(batch))))
+        except Exception as e:
+            response = encode_frame({"ok": False, "error": f"{type(e).__name__}: {e}"})
+        proto_out.write(response)
+        proto_out.flush()
+
+
+if __name__ == "__main__":
+    main()
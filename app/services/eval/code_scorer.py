@@ -0,0 +1,300 @@
+"""
+CODE scorers: user-supplied Python executed in a pool of sandboxed processes.
+
+A CODE scorer's configuration holds its source and the function to call:
+
+    {"code": "def score(batch):\\n    return batch['outputs'].str.len()", "function": "score"}
+
+The function receives a batch of rows (their ROW_CONTENT_COLUMNS, the same
+columns results are cached and deduplicated on) as a pandas DataFrame and
+returns one result per row: a sequence of scores, a sequence of (score, justification)
+pairs, or a DataFrame/dict with `score` and optional `justification`.
+
+Batches are shipped to long-lived sandbox processes (see code_sandbox.py) as
+Arrow IPC streams over a pipe. Each process compiles a scorer's code once and
+reuses it for every later batch.
+
+Sandbox processes run under bubblewrap (EVAL_CODE_SCORER_BWRAP) in their own
+user, network, PID and mount namespaces, as an unprivileged uid, with only
+the Python installation mounted read-only and an empty environment. Without
+bubblewrap, or when the namespaces cannot be created, CODE scorers refuse to
+run and the run fails.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import select
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.services.eval.cache import ROW_CONTENT_COLUMNS
+from app.services.eval.code_sandbox import encode_frame, ipc_to_table, table_to_ipc
+from app.services.eval.results import JUSTIFICATION_SUFFIX, SCORE_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+CODE_SCORER_WORKERS = int(os.getenv("EVAL_CODE_SCORER_WORKERS", "2"))
+CODE_SCORER_BATCH_SIZE = int(os.getenv("EVAL_CODE_SCORER_BATCH_SIZE", "1000"))
+# Per sandbox process: address space, and CPU / wall-clock time per batch
+CODE_SCORER_MEMORY_MB = int(os.getenv("EVAL_CODE_SCORER_MEMORY_MB", "2048"))
+CODE_SCORER_CPU_SECONDS = int(os.getenv("EVAL_CODE_SCORER_CPU_SECONDS", "60"))
+CODE_SCORER_TIMEOUT_SECONDS = float(os.getenv("EVAL_CODE_SCORER_TIMEOUT_SECONDS", "120"))
+# Backstop on waiting for a free sandbox process
+CODE_SCORER_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("EVAL_CODE_SCORER_ACQUIRE_TIMEOUT_SECONDS", "600"))
+
+CODE_SCORER_BWRAP = os.getenv("EVAL_CODE_SCORER_BWRAP", "bwrap")
+
+_SANDBOX_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "code_sandbox.py")
+# Where the script is mounted inside the jail
+_JAILED_SCRIPT = "/sandbox/code_sandbox.py"
+# nobody: owns nothing the jail could reach
+_SANDBOX_UID = 65534
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SandboxError(Exception):
+    """A batch could not be scored: the user code raised, or its process died."""
+
+
+class SandboxIsolationError(RuntimeError):
+    """The sandbox could not be isolated, so no user code is run at all."""
+
+
+@dataclass(frozen=True)
+class CodeScorer:
+    code: str
+    function: str
+    code_hash: str
+
+
+def build_code_scorer(configuration: Dict[str, Any]) -> CodeScorer:
+    code = configuration.get("code")
+    if not code:
+        raise ValueError("Code scorers require a 'code' configuration")
+    # Surface syntax errors when the scorer is hydrated, not batch by batch
+    compile(code, "<code scorer>", "exec")
+    return CodeScorer(
+        code=code,
+        function=configuration.get("function", "score"),
+        code_hash=hashlib.sha256(code.encode()).hexdigest(),
+    )
+
+
+def _jail_command(limits: Dict[str, Any]) -> List[str]:
+    """bubblewrap command line running the sandbox script in fresh namespaces."""
+    bwrap = shutil.which(CODE_SCORER_BWRAP)
+    if not bwrap:
+        raise SandboxIsolationError(f"Code scorers need bubblewrap ({CODE_SCORER_BWRAP}) to run isolated")
+    mounts: List[str] = []
+    for path in sorted({"/bin", "/lib", "/lib64", "/usr", sys.base_prefix, sys.prefix}):
+        mounts += ["--ro-bind-try", path, path]
+    return [
+        bwrap,
+        "--unshare-all",
+        "--unshare-user",
+        "--uid", str(_SANDBOX_UID),
+        "--gid", str(_SANDBOX_UID),
+        "--die-with-parent",
+        "--new-session",
+        "--clearenv",
+        "--setenv", "LANG", "C.UTF-8",
+        *mounts,
+        "--ro-bind", _SANDBOX_SCRIPT, _JAILED_SCRIPT,
+        "--proc", "/proc",
+        "--dev", "/dev",
+        "--tmpfs", "/tmp",
+        "--chdir", "/tmp",
+        sys.executable, "-I", "-B", _JAILED_SCRIPT, json.dumps(limits),
+    ]
+
+
+class SandboxProcess:
+    def __init__(self):
+        limits = {
+            "memory_mb": CODE_SCORER_MEMORY_MB,
+            "cpu_seconds": CODE_SCORER_CPU_SECONDS,
+            "uid": _SANDBOX_UID,
+            "hidden_paths": [_APP_DIR],
+        }
+        # A bare environment for bwrap too, so no process in the jail ever held app secrets
+        self.proc = subprocess.Popen(
+            _jail_command(limits),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env={"PATH": os.environ.get("PATH", ""), "LANG": "C.UTF-8"},
+            cwd=tempfile.gettempdir(),
+            close_fds=True,
+        )
+        self.loaded: set = set()
+
+        # The sandbox checks its own isolation and reports before serving anything
+        try:
+            response, _ = self._read_frame(time.monotonic() + CODE_SCORER_TIMEOUT_SECONDS)
+        except SandboxError as e:
+            raise SandboxIsolationError(f"Code scorer sandbox failed to start: {e}") from e
+        if not response["ok"]:
+            self.kill()
+            raise SandboxIsolationError(response["error"])
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def kill(self) -> None:
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+    def _read(self, size: int, deadline: float) -> bytes:
+        fd = self.proc.stdout.fileno()
+        data = b""
+        while len(data) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                self.kill()
+                raise SandboxError(f"Code scorer timed out after {CODE_SCORER_TIMEOUT_SECONDS}s")
+            block = os.read(fd, size - len(data))
+            if not block:
+                self.kill()
+                raise SandboxError(f"Code scorer process exited with code {self.proc.returncode}")
+            data += block
+        return data
+
+    def _read_frame(self, deadline: float) -> Tuple[Dict[str, Any], bytes]:
+        header_size = int.from_bytes(self._read(4, deadline), "big")
+        response = json.loads(self._read(header_size, deadline))
+        payload = self._read(int.from_bytes(self._read(8, deadline), "big"), deadline)
+        return response, payload
+
+    def score(self, scorer: CodeScorer, table: pa.Table) -> pa.Table:
+        header = {"code_hash": scorer.code_hash}
+        if scorer.code_hash not in self.loaded:
+            header.update(code=scorer.code, function=scorer.function)
+        try:
+            self.proc.stdin.write(encode_frame(header, table_to_ipc(table)))
+            self.proc.stdin.flush()
+        except BrokenPipeError:
+            self.kill()
+            raise SandboxError(f"Code scorer process exited with code {self.proc.returncode}")
+
+        response, payload = self._read_frame(time.monotonic() + CODE_SCORER_TIMEOUT_SECONDS)
+        if not response["ok"]:
+            raise SandboxError(response["error"])
+        self.loaded.add(scorer.code_hash)
+        return ipc_to_table(payload)
+
+
+class SandboxPool:
+    """Up to `size` sandbox processes, started on demand and reused across batches and runs."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: List[SandboxProcess] = []
+        self._started = 0
+        # Signalled whenever a process goes back idle or a slot frees up
+        self._available = threading.Condition()
+
+    def _acquire(self) -> SandboxProcess:
+        deadline = time.monotonic() + CODE_SCORER_ACQUIRE_TIMEOUT_SECONDS
+        with self._available:
+            while not self._idle and self._started >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._available.wait(remaining):
+                    raise SandboxError(
+                        f"No code scorer process became available in {CODE_SCORER_ACQUIRE_TIMEOUT_SECONDS}s"
+                    )
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return SandboxProcess()
+        except BaseException:
+            self._free_slot()
+            raise
+
+    def _free_slot(self) -> None:
+        # A waiter starts a fresh process in the slot
+        with self._available:
+            self._started -= 1
+            self._available.notify()
+
+    def _release(self, process: SandboxProcess) -> None:
+        if not process.alive():
+            self._free_slot()
+            return
+        with self._available:
+            self._idle.append(process)
+            self._available.notify()
+
+    def score(self, scorer: CodeScorer, table: pa.Table) -> pa.Table:
+        process = self._acquire()
+        try:
+            return process.score(scorer, table)
+        finally:
+            self._release(process)
+
+    def close(self) -> None:
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+        for process in idle:
+            process.kill()
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def sandbox_pool() -> SandboxPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool(CODE_SCORER_WORKERS)
+            atexit.register(_pool.close)
+        return _pool
+
+
+def is_code_scorer(hydrated) -> bool:
+    return isinstance(hydrated.scorer, CodeScorer)
+
+
+def _score_batch(scorer: CodeScorer, batch: pd.DataFrame) -> Tuple[np.ndarray, List[Optional[str]]]:
+    try:
+        table = sandbox_pool().score(scorer, pa.Table.from_pandas(batch, preserve_index=False))
+    except SandboxError as e:
+        # The whole batch errors; errored rows are not cached and retried next run
+        logger.warning(f"Code scorer batch of {len(batch)} rows failed: {e}")
+        return np.full(len(batch), np.nan), [f"Error: {e}"] * len(batch)
+    return table.column("score").to_numpy(zero_copy_only=False), table.column("justification").to_pylist()
+
+
+def code_scores(df: pd.DataFrame, scorer: CodeScorer, name: str) -> pd.DataFrame:
+    """
+    Scores rows with a CODE scorer, in batches spread over the sandbox pool.
+
+    Returns:
+        `<name>/score` and `<name>/justification` columns aligned with df's index.
+    """
+    # Only the columns rows are cached and deduplicated on, so equal keys mean equal input
+    data = df[[c for c in ROW_CONTENT_COLUMNS if c in df.columns]]
+    batches = [data.iloc[i:i + CODE_SCORER_BATCH_SIZE] for i in range(0, len(data), CODE_SCORER_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=CODE_SCORER_WORKERS) as executor:
+        outputs = list(executor.map(lambda batch: _score_batch(scorer, batch), batches))
+
+    scores = pd.DataFrame(index=df.index)
+    scores[f"{name}{SCORE_SUFFIX}"] = np.concatenate([s for s, _ in outputs]) if outputs else []
+    scores[f"{name}{JUSTIFICATION_SUFFIX}"] = [j for _, js in outputs for j in js]
+    return scores
@@ -0,0 +1,120 @@
+"""
+Run-vs-run comparison of two completed runs on the same dataset.
+
+Rows of both runs are aligned on `row_index` and every scorer present in
+both runs is diffed column-wise with NumPy: mean delta, win/loss/tie counts
+(higher scores win) and the most regressed rows. Completed runs never
+change, so each diff is computed once and cached as a JSON file keyed by
+the (a, b) run pair.
+"""
+
+import glob
+import json
+import os
+from typing import Any, Dict
+from uuid import UUID
+
+import numpy as np
+
+from app.services.eval.reports import Report, open_report
+from app.services.eval.results import (
+    RESULTS_DIR,
+    ROW_INDEX_COLUMN,
+    SCORE_SUFFIX,
+    scorer_name,
+)
+from app.services.eval.sampling import DATASET_ROW_COLUMN
+
+COMPARISONS_DIR = os.path.join(RESULTS_DIR, "comparisons")
+# Most regressed rows kept per scorer in a cached diff
+REGRESSED_ROWS = int(os.getenv("EVAL_COMPARE_REGRESSED_ROWS", "100"))
+
+
+def _comparison_path(run_a: UUID, run_b: UUID) -> str:
+    return os.path.join(COMPARISONS_DIR, f"{run_a}_{run_b}.json")
+
+
+def _diff_scorer(row_index: np.ndarray, a: np.ndarray, b: np.ndarray) -> Dict[str, Any]:
+    both = ~np.isnan(a) & ~np.isnan(b)
+    delta = b[both] - a[both]
+    diff: Dict[str, Any] = {
+        "rows": int(len(a)),
+        "compared": int(both.sum()),
+        "errors_a": int(np.isnan(a).sum()),
+        "errors_b": int(np.isnan(b).sum()),
+        "wins": int((delta > 0).sum()),
+        "losses": int((delta < 0).sum()),
+        "ties": int((delta == 0).sum()),
+        "mean_a": float(a[both].mean()) if len(delta) else None,
+        "mean_b": float(b[both].mean()) if len(delta) else None,
+        "mean_delta": float(delta.mean()) if len(delta) else None,
+        "most_regressed": [],
+    }
+    if not (delta < 0).any():
+        return diff
+
+    # Partial sort: only the worst REGRESSED_ROWS deltas are ordered
+    k = min(REGRESSED_ROWS, len(delta))
+    worst = np.argpartition(delta, k - 1)[:k]
+    worst = worst[np.argsort(delta[worst], kind="stable")]
+    worst = worst[delta[worst] < 0]
+    indexes, scores_a, scores_b = row_index[both][worst], a[both][worst], b[both][worst]
+    diff["most_regressed"] = [
+        {ROW_INDEX_COLUMN: int(i), "score_a": float(sa), "score_b": float(sb), "delta": float(sb - sa)}
+        for i, sa, sb in zip(indexes, scores_a, scores_b)
+    ]
+    return diff
+
+
+def _dataset_rows(report: Report) -> np.ndarray:
+    # Sampled runs number their rows in sample order, the dataset position is kept aside
+    column = DATASET_ROW_COLUMN if DATASET_ROW_COLUMN in report.column_names else ROW_INDEX_COLUMN
+    return report.scan(column).to_numpy()
+
+
+def diff_reports(report_a: Report, report_b: Report) -> Dict[str, Any]:
+    """Aligns two reports on dataset rows and diffs every scorer they share."""
+    index_a = _dataset_rows(report_a)
+    index_b = _dataset_rows(report_b)
+    row_index, positions_a, positions_b = np.intersect1d(index_a, index_b, assume_unique=True, return_indices=True)
+
+    shared = [c for c in report_a.column_names if c.endswith(SCORE_SUFFIX) and c in report_b.column_names]
+    return {
+        "rows_a": report_a.total,
+        "rows_b": report_b.total,
+        "rows_aligned": int(len(row_index)),
+        "scorers": {
+            scorer_name(column): _diff_scorer(
+                row_index,
+                report_a.scores(column)[positions_a],
+                report_b.scores(column)[positions_b],
+            )
+            for column in shared
+        },
+    }
+
+
+def compare_runs(run_a: UUID, path_a: str, run_b: UUID, path_b: str) -> Dict[str, Any]:
+    """Diff of run b against run a, from the cache when it was computed before."""
+    path = _comparison_path(run_a, run_b)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    comparison = {"a": str(run_a), "b": str(run_b), **diff_reports(open_report(path_a), open_report(path_b))}
+
+    os.makedirs(COMPARISONS_DIR, exist_ok=True)
+    # Renamed into place, so concurrent requests never read a partial diff
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(comparison, f)
+    os.replace(tmp_path, path)
+    return comparison
+
+
+def remove_comparisons(run_id: UUID) -> None:
+    for path in glob.glob(os.path.join(COMPARISONS_DIR, f"*{run_id}*.json")):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,317 @@
+"""
+Content-addressed dataset registry.
+
+Uploads are ingested once: CSV and JSONL files are converted into typed,
+zstd-compressed Parquet stored under their content hash, and a `datasets`
+row records the row count, schema and per-column statistics. Uploading the
+same content again returns the existing dataset. Runs reference datasets by
+id and the executor reads the Parquet file in record batches, so types are
+inferred once at ingest instead of on every chunk of every run.
+
+Datasets no run references are garbage-collected after a grace period.
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from sqlalchemy import exists
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.db.models import Dataset, EvaluationRun
+
+logger = logging.getLogger(__name__)
+
+DATASETS_DIR = os.getenv("EVAL_DATASETS_DIR", os.path.join(tempfile.gettempdir(), "dead-simpl-datasets"))
+DATASET_COMPRESSION = os.getenv("EVAL_DATASET_COMPRESSION", "zstd")
+# Rows per Parquet row group of an ingested dataset
+DATASET_ROW_GROUP_SIZE = int(os.getenv("EVAL_DATASET_ROW_GROUP_SIZE", "65536"))
+# Bytes of CSV the column types are inferred from
+CSV_BLOCK_BYTES = int(os.getenv("EVAL_CSV_BLOCK_BYTES", str(64 * 1024 ** 2)))
+JSONL_CHUNK_ROWS = 50_000
+# Unreferenced datasets are kept this long after their last use
+DATASET_GC_GRACE = timedelta(hours=float(os.getenv("EVAL_DATASET_GC_GRACE_HOURS", "24")))
+
+
+def dataset_path(sha256: str) -> str:
+    return os.path.join(DATASETS_DIR, sha256[:2], f"{sha256}.parquet")
+
+
+def is_parquet_dataset(path: str) -> bool:
+    return path.endswith(".parquet")
+
+
+def _csv_batches(path: str, column_types: Optional[Dict[str, pa.DataType]] = None) -> Iterator[pa.RecordBatch]:
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+        convert_options=pacsv.ConvertOptions(column_types=column_types or {}),
+    )
+    for batch in reader:
+        yield batch
+
+
+def _jsonl_schema(path: str) -> pa.Schema:
+    """
+    Column types unified over every block of a JSONL file: promoted where
+    compatible (e.g. null or int in one block, float in another), strings
+    where not.
+    """
+    types: Dict[str, List[pa.DataType]] = {}
+    for df in pd.read_json(path, lines=True, chunksize=JSONL_CHUNK_ROWS):
+        for name in df.columns:
+            try:
+                # All-null blocks (read as NaN floats) take any other block's type
+                column_type = pa.null() if df[name].isna().all() else pa.Array.from_pandas(df[name]).type
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed values within the block
+                column_type = pa.string()
+            types.setdefault(name, []).append(column_type)
+
+    fields = []
+    for name, column_types in types.items():
+        try:
+            schemas = [pa.schema([(name, t)]) for t in column_types]
+            fields.append(pa.unify_schemas(schemas, promote_options="permissive").field(name))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            logger.warning(f"Column {name} of {os.path.basename(path)} has mixed types, ingesting as strings")
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def _as_string(value: Any) -> Optional[str]:
+    if value is None or value is pd.NA or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+def _jsonl_batches(path: str) -> Iterator[pa.RecordBatch]:
+    # Two passes: types are settled over the whole file before anything is written
+    schema = _jsonl_schema(path)
+    for df in pd.read_json(path, lines=True, chunksize=JSONL_CHUNK_ROWS):
+        df = df.reindex(columns=schema.names)
+        for field in schema:
+            if pa.types.is_string(field.type):
+                df[field.name] = df[field.name].map(_as_string)
+        yield from pa.Table.from_pandas(df, schema=schema, preserve_index=False).to_batches()
+
+
+class _ColumnStats:
+    """Per-column null count and min/max, accumulated batch by batch."""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def update(self, batch: pa.RecordBatch) -> None:
+        for name, column in zip(batch.schema.names, batch.columns):
+            stats = self.stats.setdefault(name, {"null_count": 0, "min": None, "max": None})
+            stats["null_count"] += column.null_count
+            if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+                    or pa.types.is_temporal(column.type)):
+                continue
+            bounds = pc.min_max(column)
+            low, high = bounds["min"].as_py(), bounds["max"].as_py()
+            if low is not None:
+                stats["min"] = low if stats["min"] is None else min(stats["min"], low)
+                stats["max"] = high if stats["max"] is None else max(stats["max"], high)
+
+    def as_json(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {k: v.isoformat() if hasattr(v, "isoformat") else v for k, v in stats.items()}
+            for name, stats in self.stats.items()
+        }
+
+
+def _convert(source_path: str, target_path: str, batches: Iterator[pa.RecordBatch]) -> Dict[str, Any]:
+    """Writes batches to `target_path` as Parquet; returns row count, schema and column stats."""
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    # Unique per call: threads of one process may convert the same content concurrently
+    tmp_path = f"{target_path}.{uuid4().hex}.tmp"
+    stats, rows, writer = _ColumnStats(), 0, None
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, batch.schema, compression=DATASET_COMPRESSION)
+            writer.write_batch(batch, row_group_size=DATASET_ROW_GROUP_SIZE)
+            stats.update(batch)
+            rows += batch.num_rows
+        if writer is None:
+            raise ValueError(f"{os.path.basename(source_path)} has no rows")
+        writer.close()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    schema = pq.read_schema(tmp_path)
+    os.replace(tmp_path, target_path)
+    return {
+        "row_count": rows,
+        "columns": {field.name: str(field.type) for field in schema},
+        "column_stats": stats.as_json(),
+    }
+
+
+def _touch(session: Session, dataset: Dataset) -> Dataset:
+    # Keeps the dataset clear of garbage collection until a run references it
+    dataset.last_used_at = datetime.utcnow()
+    session.add(dataset)
+    session.commit()
+    session.refresh(dataset)
+    return dataset
+
+
+def ingest_dataset(session: Session, source_path: str, sha256: str, filename: str, size_bytes: int) -> Dataset:
+    """
+    Registers an uploaded file, converting it to Parquet unless the same
+    content was ingested before. The uploaded file, which belongs to this
+    upload alone, is removed either way.
+
+    Concurrent ingests of the same content each convert their own file to
+    the same target (written atomically); the first to register the row wins
+    and the others return it.
+    """
+    existing = session.exec(select(Dataset).where(Dataset.sha256 == sha256)).first()
+    if existing and os.path.exists(existing.path):
+        os.remove(source_path)
+        return _touch(session, existing)
+
+    target_path = dataset_path(sha256)
+    if filename.lower().endswith((".jsonl", ".ndjson")):
+        source_format = "jsonl"
+        info = _convert(source_path, target_path, _jsonl_batches(source_path))
+    else:
+        source_format = "csv"
+        try:
+            info = _convert(source_path, target_path, _csv_batches(source_path))
+        except pa.ArrowInvalid:
+            # A later block contradicts the types inferred from the first one
+            names = pacsv.open_csv(source_path).schema.names
+            logger.warning(f"Column types of {filename} are not uniform, ingesting as strings")
+            info = _convert(source_path, target_path, _csv_batches(source_path, {n: pa.string() for n in names}))
+    os.remove(source_path)
+
+    values = {
+        "filename": filename,
+        "source_format": source_format,
+        "path": target_path,
+        "size_bytes": size_bytes,
+        "row_count": info["row_count"],
+        "columns": info["columns"],
+        "column_stats": info["column_stats"],
+    }
+    now = datetime.utcnow()
+    session.execute(
+        insert(Dataset)
+        .values(id=uuid4(), sha256=sha256, created_at=now, last_used_at=now, **values)
+        .on_conflict_do_nothing(index_elements=[Dataset.sha256])
+    )
+    session.commit()
+    dataset = session.exec(select(Dataset).where(Dataset.sha256 == sha256)).one()
+    if dataset.path != target_path:
+        # The row outlived its file: point it at the fresh conversion
+        for key, value in values.items():
+            setattr(dataset, key, value)
+    return _touch(session, dataset)
+
+
+def _row_range_batches(
+    path: str, start_row: int, stop_row: Optional[int], batch_size: int
+) -> Iterator[pa.RecordBatch]:
+    """Record batches of rows [start_row, stop_row) of a Parquet file, reading only the row groups holding them."""
+    parquet = pq.ParquetFile(path, memory_map=True)
+    metadata = parquet.metadata
+    stop_row = metadata.num_rows if stop_row is None else min(stop_row, metadata.num_rows)
+    row_groups: List[int] = []
+    skip = first_row = 0
+    for i in range(metadata.num_row_groups):
+        rows = metadata.row_group(i).num_rows
+        if first_row + rows > start_row and first_row < stop_row:
+            if not row_groups:
+                skip = start_row - first_row
+            row_groups.append(i)
+        first_row += rows
+    if not row_groups:
+        return
+
+    remaining = stop_row - start_row
+    for batch in parquet.iter_batches(batch_size=batch_size, row_groups=row_groups):
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        batch = batch.slice(skip, min(remaining, batch.num_rows - skip))
+        skip = 0
+        remaining -= batch.num_rows
+        yield batch
+        if not remaining:
+            return
+
+
+def iter_chunks(
+    path: str, chunk_size: int, start_chunk: int = 0, stop_chunk: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads a dataset in chunks of exactly `chunk_size` rows (the last one
+    may be shorter), so chunk boundaries do not depend on the file layout.
+
+    Only chunks [start_chunk, stop_chunk) are read: Parquet row groups
+    outside that row range are never loaded, CSV rows before it are skipped
+    without being converted.
+    """
+    start_row = start_chunk * chunk_size
+    stop_row = None if stop_chunk is None else stop_chunk * chunk_size
+    if not is_parquet_dataset(path):
+        yield from pd.read_csv(
+            path,
+            chunksize=chunk_size,
+            skiprows=range(1, start_row + 1),
+            nrows=None if stop_row is None else stop_row - start_row,
+        )
+        return
+
+    pending: List[pa.RecordBatch] = []
+    pending_rows = 0
+    for batch in _row_range_batches(path, start_row, stop_row, chunk_size):
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        # Row groups end batches early: regroup into full chunks
+        while pending_rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size).to_pandas()
+            rest = table.slice(chunk_size)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+def collect_garbage(session: Session) -> int:
+    """Deletes datasets no run references and nobody used within the grace period."""
+    cutoff = datetime.utcnow() - DATASET_GC_GRACE
+    unreferenced = session.exec(
+        select(Dataset)
+        .where(Dataset.last_used_at < cutoff)
+        .where(~exists().where(EvaluationRun.dataset_id == Dataset.id))
+    ).all()
+    for dataset in unreferenced:
+        session.delete(dataset)
+    session.commit()
+    for dataset in unreferenced:
+        try:
+            os.remove(dataset.path)
+        except FileNotFoundError:
+            pass
+    if unreferenced:
+        logger.info(f"Garbage-collected {len(unreferenced)} unreferenced datasets")
+    return len(unreferenced)
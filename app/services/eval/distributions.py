@@ -0,0 +1,77 @@
+"""
+Per-scorer score distributions of a completed run.
+
+Computed once by the reducer from the run's score columns and stored in
+`EvaluationRun.distributions`, so dashboards get histograms, quantiles,
+error counts and pass rates from the database without reading row results.
+"""
+
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.services.eval.reports import Report
+from app.services.eval.results import SCORE_SUFFIX, scorer_name
+
+HISTOGRAM_BINS = int(os.getenv("EVAL_HISTOGRAM_BINS", "20"))
+DISTRIBUTION_QUANTILES = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+# Pass thresholds of scorers that do not configure `pass_threshold`, e.g. "0.5,3"
+DEFAULT_PASS_THRESHOLDS = [
+    float(t) for t in os.getenv("EVAL_PASS_THRESHOLDS", "").split(",") if t.strip()
+]
+
+
+def pass_thresholds(configuration: dict) -> List[float]:
+    """A scorer's pass thresholds: `pass_threshold` (a number or a list) or the defaults."""
+    configured = configuration.get("pass_threshold")
+    if configured is None:
+        return DEFAULT_PASS_THRESHOLDS
+    if isinstance(configured, (list, tuple)):
+        return [float(t) for t in configured]
+    return [float(configured)]
+
+
+def _histogram(values: np.ndarray) -> Dict[str, List[float]]:
+    unique, counts = np.unique(values, return_counts=True)
+    # Discrete scores (e.g. 1-5) get one bar per value
+    if len(unique) <= HISTOGRAM_BINS:
+        return {"values": unique.tolist(), "counts": counts.tolist()}
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def score_distribution(values: np.ndarray, thresholds: List[float]) -> Dict[str, Any]:
+    """Distribution of one score column (NaN for errored rows)."""
+    valid = values[~np.isnan(values)]
+    distribution: Dict[str, Any] = {
+        "count": int(len(valid)),
+        "errors": int(len(values) - len(valid)),
+        "error_rate": float((len(values) - len(valid)) / len(values)) if len(values) else None,
+    }
+    if not len(valid):
+        return distribution
+    distribution["histogram"] = _histogram(valid)
+    distribution["quantiles"] = {
+        f"p{q * 100:g}": float(v) for q, v in zip(DISTRIBUTION_QUANTILES, np.quantile(valid, DISTRIBUTION_QUANTILES))
+    }
+    # A row passes when its score is at least the threshold
+    distribution["pass_rates"] = {f"{t:g}": float((valid >= t).mean()) for t in thresholds}
+    return distribution
+
+
+def report_distributions(report: Report, thresholds: Dict[str, List[float]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Distributions of every scorer of a report.
+
+    Args:
+        thresholds: pass thresholds per scorer output name.
+    """
+    distributions = {}
+    for column in report.column_names:
+        if column.endswith(SCORE_SUFFIX):
+            name = scorer_name(column)
+            distributions[name] = score_distribution(
+                report.scores(column), thresholds.get(name, DEFAULT_PASS_THRESHOLDS)
+            )
+    return distributions
@@ -1,104 +1,805 @@
 import logging
+import math
 import os
-import tempfile
-from datetime import datetime
+from contextlib import nullcontext
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
 import mlflow
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+from sqlalchemy import any_, update
 from sqlmodel import Session, select
 
 from app.db.database import db
-from app.db.models import EvaluationProfile, EvaluationRun, RunStatus, ScorerDefinition
-from app.services.eval.scorer_factory import scorer_factory
+from app.db.models import (
+    EvaluationProfile,
+    EvaluationRun,
+    EvaluationRunChunk,
+    RunMetric,
+    RunStatus,
+    ScorerDefinition,
+)
+from app.services.eval.aggregates import chunk_state, finalize, merge_states
+from app.services.eval.cache import (
+    cache_keys,
+    lookup,
+    row_hashes,
+    scorer_fingerprint,
+    store,
+)
+from app.services.eval.code_scorer import code_scores, is_code_scorer
+from app.services.eval.datasets import is_parquet_dataset, iter_chunks
+from app.services.eval.distributions import pass_thresholds, report_distributions
+from app.services.eval.generation import (
+    GENERATION_ERROR_COLUMN,
+    CandidateGenerator,
+    with_generation_errors,
+)
+from app.services.eval.judge_executor import is_async_judge, score_judges
+from app.services.eval.mlflow_scorer import mlflow_scores
+from app.services.eval.native_scorers import is_native_scorer, native_scores
+from app.services.eval.parallel import (
+    DEFAULT_CPU_WORKERS,
+    is_cpu_scorer,
+    parallel_scores,
+)
+from app.services.eval.progress import ProgressTracker
+from app.services.eval.reports import Report, write_sort_index
+from app.services.eval.results import (
+    JUSTIFICATION_SUFFIX,
+    ROW_INDEX_COLUMN,
+    SCORE_SUFFIX,
+    chunk_path,
+    run_results_dir,
+    write_chunk,
+)
+from app.services.eval.sampling import (
+    DATASET_ROW_COLUMN,
+    build_sample,
+    sample_path,
+    sampling_summary,
+    sequential_stop,
+)
+from app.services.eval.scorer_factory import (
+    HydratedScorer,
+    hydrate_scorer,
+    scorer_output_name,
+)
+from app.services.eval.tracking import log_run_summary
 
 logger = logging.getLogger(__name__)
 
+# Rows scored per chunk when the run does not specify a chunk size.
+# Peak worker memory is bounded by this, not by the dataset size.
+DEFAULT_CHUNK_SIZE = int(os.getenv("EVAL_CHUNK_SIZE", "10000"))
 
-def run_evaluation_task(run_id: UUID):
+
+def _load_profile_scorers(
+    session: Session, profile_id: UUID
+) -> Tuple[Optional[EvaluationProfile], List[HydratedScorer]]:
+    """
+    Loads a profile and all of its scorer definitions in a single query, then
+    hydrates the scorers through the in-process LRU.
+    """
+    rows = session.exec(
+        select(EvaluationProfile, ScorerDefinition)
+        .outerjoin(ScorerDefinition, ScorerDefinition.id == any_(EvaluationProfile.scorer_ids))
+        .where(EvaluationProfile.id == profile_id)
+    ).all()
+    if not rows:
+        return None, []
+
+    profile = rows[0][0]
+    definitions = {scorer_def.id: scorer_def for _, scorer_def in rows if scorer_def is not None}
+
+    scorers = []
+    for scorer_id in profile.scorer_ids:
+        scorer_def = definitions.get(scorer_id)
+        if scorer_def:
+            scorers.append(hydrate_scorer(scorer_def))
+        else:
+            logger.warning(f"Scorer {scorer_id} not found in profile {profile.name}")
+    return profile, scorers
+
+
+def _count_rows(dataset_path: str) -> int:
+    """Counts data rows (used for progress and ETA): from the Parquet footer, or a single-column CSV pass."""
+    if is_parquet_dataset(dataset_path):
+        return pq.ParquetFile(dataset_path).metadata.num_rows
+    return sum(len(df) for df in pd.read_csv(dataset_path, usecols=[0], chunksize=DEFAULT_CHUNK_SIZE * 10))
+
+
+def _record_judge_calls(run_ids: List[UUID], queued: int, in_flight: int) -> None:
+    # Separate session: the run's own session is busy in the executing thread
+    with Session(db.engine) as session:
+        session.execute(
+            update(EvaluationRun)
+            .where(EvaluationRun.id.in_(run_ids))
+            .values(judge_calls_queued=queued, judge_calls_in_flight=in_flight)
+        )
+        session.commit()
+
+
+def _uses_mlflow(hydrated: HydratedScorer) -> bool:
+    """Whether the scorer is executed by `mlflow.genai.evaluate`, which needs an active MLflow run."""
+    return not (is_native_scorer(hydrated) or is_code_scorer(hydrated) or is_async_judge(hydrated))
+
+
+def _ensure_mlflow_run(session: Session, run_id: UUID) -> str:
+    """Creates the run's MLflow run once, under the run row lock so shards share it."""
+    run = session.exec(select(EvaluationRun).where(EvaluationRun.id == run_id).with_for_update()).one()
+    if not run.mlflow_run_id:
+        with mlflow.start_run(run_name=str(run_id)) as mlflow_run:
+            run.mlflow_run_id = mlflow_run.info.run_id
+        session.add(run)
+    mlflow_run_id = run.mlflow_run_id
+    session.commit()
+    return mlflow_run_id
+
+
+def _mlflow_group_scores(
+    run: EvaluationRun, distinct: pd.DataFrame, work: List[Tuple[HydratedScorer, np.ndarray]]
+) -> pd.DataFrame:
+    """
+    Scores the rows any of the given MLflow-executed scorers misses (by
+    their cache `hit` masks) with all of them at once: builtins in the
+    process pool when the run has `cpu_workers > 1`, everything else in a
+    single `mlflow.genai.evaluate` call.
+
+    Returns:
+        Score and justification columns of every scorer, for those rows.
+    """
+    work = [(h, hit) for h, hit in work if not hit.all()]
+    if not work:
+        return pd.DataFrame()
+    misses = distinct[~np.logical_and.reduce([hit for _, hit in work])]
+    pooled = {scorer_output_name(h): h.scorer for h, _ in work if is_cpu_scorer(h) and run.cpu_workers > 1}
+    direct = {scorer_output_name(h): h.scorer for h, _ in work if scorer_output_name(h) not in pooled}
+    parts = []
+    if pooled:
+        parts.append(parallel_scores(misses, pooled, run.cpu_workers))
+    if direct:
+        parts.append(mlflow_scores(misses, direct))
+    return pd.concat(parts, axis=1)
+
+
+def _score_chunk(
+    session: Session,
+    run: EvaluationRun,
+    df: pd.DataFrame,
+    scorers: List[HydratedScorer],
+    progress: ProgressTracker,
+    judge_run_ids: Optional[List[UUID]] = None,
+) -> Tuple[pd.DataFrame, int, int, int]:
+    """
+    Scores one chunk, only sending each distinct row without a cached result
+    to each scorer.
+
+    Rows with identical content (see ROW_CONTENT_COLUMNS) are scored once and
+    their results fanned back out to every duplicate, so the row table and the
+    aggregates still count each row. New cache entries are staged in the
+    session, so they commit together with the chunk checkpoint. Judge call
+    counts are published on `judge_run_ids` (default: the run).
+
+    Returns:
+        The chunk's row-level results, cache hits, cache misses and the number
+        of duplicate rows that were not scored.
+    """
+    results = df.copy()
+    hashes = row_hashes(df)
+    is_first = ~pd.Series(hashes).duplicated().to_numpy()
+    distinct = df[is_first]
+    distinct_hashes = [h for h, first in zip(hashes, is_first) if first]
+    # Position of each row's distinct representative
+    positions = pd.Index(distinct_hashes).get_indexer(hashes)
+    duplicates = len(df) - len(distinct)
+    cache_hits = cache_misses = 0
+
+    # 1. Fill in cached results and collect each scorer's misses
+    scored = pd.DataFrame(index=distinct.index)
+    pending = []
+    for hydrated in scorers:
+        name = scorer_output_name(hydrated)
+        if is_native_scorer(hydrated):
+            # Recomputing is cheaper than a cache round trip
+            keys, hit = None, np.zeros(len(distinct), dtype=bool)
+            scored[f"{name}{SCORE_SUFFIX}"] = np.nan
+            scored[f"{name}{JUSTIFICATION_SUFFIX}"] = None
+        else:
+            keys = cache_keys(scorer_fingerprint(hydrated), distinct_hashes)
+            cached = lookup(session, keys)
+            hit = np.array([key in cached for key in keys], dtype=bool)
+            scored[f"{name}{SCORE_SUFFIX}"] = [cached[k][0] if k in cached else np.nan for k in keys]
+            scored[f"{name}{JUSTIFICATION_SUFFIX}"] = [cached[k][1] if k in cached else None for k in keys]
+        pending.append((hydrated, keys, hit))
+
+    # 2. LLM judges on OpenAI-compatible endpoints run together on the async engine
+    judge_work = [(h, distinct[~hit]) for h, _, hit in pending if is_async_judge(h) and not hit.all()]
+    on_stats = partial(_record_judge_calls, judge_run_ids or [run.id])
+    judged = score_judges(judge_work, on_stats=on_stats) if judge_work else {}
+
+    # 3. Scorers executed by MLflow share one evaluate call per chunk (builtins
+    #    one per process-pool shard), over the rows any of them misses
+    evaluated = _mlflow_group_scores(run, distinct, [(h, hit) for h, _, hit in pending if _uses_mlflow(h)])
+
+    # 4. Everything else is scored natively or in the sandbox pool, then fresh
+    #    results are cached
+    for hydrated, keys, hit in pending:
+        name = scorer_output_name(hydrated)
+        score_column = f"{name}{SCORE_SUFFIX}"
+        justification_column = f"{name}{JUSTIFICATION_SUFFIX}"
+
+        misses = distinct[~hit]
+        if len(misses):
+            fresh = judged.get(name)
+            if fresh is None and is_native_scorer(hydrated):
+                fresh = native_scores(misses, hydrated.scorer, name)
+            elif fresh is None and is_code_scorer(hydrated):
+                fresh = code_scores(misses, hydrated.scorer, name)
+            elif fresh is None:
+                fresh = evaluated.loc[misses.index]
+            scored.loc[misses.index, score_column] = fresh[score_column]
+            scored.loc[misses.index, justification_column] = fresh[justification_column]
+
+        # Errored rows are not cached, so they are retried next time
+        if len(misses) and keys is not None:
+            miss_keys = [k for k, is_hit in zip(keys, hit) if not is_hit]
+            store(session, {
+                key: (score, justification)
+                for key, score, justification in zip(
+                    miss_keys, fresh[score_column], fresh[justification_column]
+                )
+                if not pd.isna(score)
+            })
+
+        # 5. Fan results out to every row, duplicates included
+        results[score_column] = pd.to_numeric(scored[score_column], errors="coerce").to_numpy()[positions]
+        results[justification_column] = scored[justification_column].to_numpy()[positions]
+        if keys is not None:
+            cache_hits += int(hit.sum())
+            cache_misses += int((~hit).sum())
+        progress.scorer_done(name, len(df))
+
+    return results, cache_hits, cache_misses, duplicates
+
+
+def _scorer_version(hydrated: HydratedScorer) -> dict:
+    return {"id": str(hydrated.id), "updated_at": hydrated.updated_at.isoformat()}
+
+
+def _reusable_scorers(
+    session: Session, run: EvaluationRun, scorers: List[HydratedScorer]
+) -> Tuple[Optional[EvaluationRun], List[str]]:
+    """
+    For a run derived from a parent run, picks the scorers whose results can be
+    copied from the parent: same scorer, not updated since the parent scored it.
+
+    Returns:
+        The parent run (None for regular runs) and the reusable output names.
+    """
+    if not run.parent_run_id:
+        return None, []
+    parent = session.get(EvaluationRun, run.parent_run_id)
+    if not parent or parent.status != RunStatus.COMPLETED:
+        logger.warning(f"Parent run {run.parent_run_id} of run {run.id} is gone, scoring everything")
+        return None, []
+    if parent.chunk_size != run.chunk_size:
+        logger.warning(f"Run {run.id} and parent {parent.id} chunk differently, scoring everything")
+        return None, []
+    if parent.sampling:
+        # Its chunks hold sampled rows in sample order, not the dataset's rows
+        logger.warning(f"Parent {parent.id} of run {run.id} is a sampled run, scoring everything")
+        return None, []
+    if (parent.candidate or "outputs") != (run.candidate or "outputs"):
+        logger.warning(f"Parent {parent.id} of run {run.id} scored another candidate, scoring everything")
+        return None, []
+    if parent.generation != run.generation:
+        logger.warning(f"Parent {parent.id} of run {run.id} generated its outputs differently, scoring everything")
+        return None, []
+
+    parent_versions = parent.scorer_versions or {}
+    reused = [
+        scorer_output_name(h) for h in scorers
+        if parent_versions.get(scorer_output_name(h)) == _scorer_version(h)
+    ]
+    return parent, reused
+
+
+def _parent_columns(parent: EvaluationRun, chunk_index: int, df: pd.DataFrame, names: List[str]) -> pd.DataFrame:
+    """Reads the reused scorers' columns of one chunk of the parent run, aligned with df."""
+    columns = [ROW_INDEX_COLUMN] + [f"{n}{suffix}" for n in names for suffix in (SCORE_SUFFIX, JUSTIFICATION_SUFFIX)]
+    parent_df = pd.read_parquet(chunk_path(parent.id, chunk_index), columns=columns)
+    if not np.array_equal(parent_df[ROW_INDEX_COLUMN].to_numpy(), df[ROW_INDEX_COLUMN].to_numpy()):
+        raise ValueError(f"Chunk {chunk_index} of parent run {parent.id} does not match the dataset")
+    parent_df.index = df.index
+    return parent_df.drop(columns=[ROW_INDEX_COLUMN])
+
+
+def _prepare_run(session: Session, run_id: UUID) -> Optional[EvaluationRun]:
+    """
+    Marks the run as PROCESSING and sets up what every shard shares (chunk
+    size, row count), under a row lock so concurrent shards agree on them.
+
+    Returns None when there is nothing to do: the run is gone, already
+    completed, or a sibling shard already failed it.
+    """
+    run = session.exec(select(EvaluationRun).where(EvaluationRun.id == run_id).with_for_update()).first()
+    if not run:
+        logger.error(f"Run {run_id} not found")
+        return None
+    if run.status in (RunStatus.COMPLETED, RunStatus.FAILED):
+        logger.info(f"Run {run_id} is {run.status.value}, skipping")
+        session.rollback()
+        return None
+
+    run.status = RunStatus.PROCESSING
+    run.error_message = None
+    run.chunk_size = run.chunk_size or DEFAULT_CHUNK_SIZE
+    run.cpu_workers = run.cpu_workers or DEFAULT_CPU_WORKERS
+    if not os.path.exists(run.dataset_path):
+        raise FileNotFoundError(f"Dataset not found at {run.dataset_path}")
+    if run.sampling:
+        run.total_rows = build_sample(run.id, run.dataset_path, run.sampling)
+    elif run.total_rows is None:
+        run.total_rows = _count_rows(run.dataset_path)
+    session.add(run)
+    session.commit()
+    session.refresh(run)
+    return run
+
+
+def _pass_thresholds(session: Session, run: EvaluationRun) -> Dict[str, List[float]]:
+    """Pass thresholds of the run's scorers, by output name."""
+    ids = {name: UUID(version["id"]) for name, version in (run.scorer_versions or {}).items()}
+    configurations = dict(session.exec(
+        select(ScorerDefinition.id, ScorerDefinition.configuration).where(ScorerDefinition.id.in_(ids.values()))
+    ).all())
+    return {name: pass_thresholds(configurations.get(scorer_id) or {}) for name, scorer_id in ids.items()}
+
+
+def _input_path(run: EvaluationRun) -> str:
+    """What the run streams: its sample file for sampled/sequential runs, else the dataset."""
+    return sample_path(run.id) if run.sampling else run.dataset_path
+
+
+def _shard_chunks(total_chunks: int, shard_count: int, shard_index: Optional[int]) -> Tuple[int, int]:
+    """The contiguous range [start, stop) of chunks a shard scores; shards get near-equal ranges, in order."""
+    shard = shard_index or 0
+    return total_chunks * shard // shard_count, total_chunks * (shard + 1) // shard_count
+
+
+def _baseline_summary(session: Session, run: EvaluationRun) -> Optional[dict]:
+    baseline_run_id = (run.sampling or {}).get("baseline_run_id")
+    if not baseline_run_id:
+        return None
+    baseline = session.get(EvaluationRun, UUID(baseline_run_id))
+    return baseline.summary_results if baseline else None
+
+
+def _check_sequential_stop(session: Session, run: EvaluationRun, baseline: Optional[dict]) -> Optional[str]:
+    """Evaluates the stopping rule on all chunks so far and records a decision to stop."""
+    chunks = session.exec(
+        select(EvaluationRunChunk.aggregates).where(EvaluationRunChunk.run_id == run.id)
+    ).all()
+    reason = sequential_stop(merge_states(chunks), run.sampling, baseline)
+    if reason:
+        logger.info(f"Run {run.id}: stopping early ({reason}) after {len(chunks)} chunks")
+        run.sampling = {**run.sampling, "stop_reason": reason}
+        session.add(run)
+        session.commit()
+    return reason
+
+
+def _finish_if_complete(session: Session, run_id: UUID) -> bool:
+    """
+    Reducer: once every chunk of the run is persisted, merges the chunks'
+    aggregation states into `summary_results` and completes the run.
+
+    Safe to call from every shard; only the one that sees all chunks done
+    (under the run row lock) completes it.
+    """
+    run = session.exec(select(EvaluationRun).where(EvaluationRun.id == run_id).with_for_update()).one()
+    chunks = session.exec(
+        select(EvaluationRunChunk.aggregates).where(EvaluationRunChunk.run_id == run_id)
+    ).all()
+    if run.status != RunStatus.PROCESSING or run.total_chunks is None or len(chunks) < run.total_chunks:
+        session.commit()
+        return False
+
+    states = merge_states(chunks)
+    run.summary_results = finalize(states)
+    if run.sampling:
+        run.summary_results = {
+            **run.summary_results,
+            **sampling_summary(states, run.sampling, _baseline_summary(session, run)),
+        }
+    # Row-level results are the chunk files in the run's results directory
+    run.row_details_path = run_results_dir(run.id)
+    # One pass over the score columns serves the sort index and the distributions
+    report = Report(run.row_details_path)
+    write_sort_index(report)
+    run.distributions = report_distributions(report, _pass_thresholds(session, run))
+    # Materialized for profile trends, in the same transaction as the completion
+    for key, value in run.summary_results.items():
+        scorer, _, metric = key.rpartition("/")
+        if scorer and isinstance(value, (int, float)) and math.isfinite(value):
+            session.add(RunMetric(
+                run_id=run.id,
+                profile_id=run.profile_id,
+                scorer=scorer,
+                metric=metric,
+                value=float(value),
+                created_at=run.created_at,
+            ))
+    run.status = RunStatus.COMPLETED
+    session.add(run)
+    session.commit()
+    return True
+
+
+def _record_chunk(
+    session: Session,
+    run_id: UUID,
+    chunk_index: int,
+    start_row: int,
+    results: pd.DataFrame,
+    cache_hits: int,
+    cache_misses: int,
+    duplicates: int,
+) -> None:
+    """
+    Writes a scored chunk's results and stages its checkpoint record and
+    counters, so the caller commits them atomically. Counters are incremented
+    in SQL since several shards update the same run.
+    """
+    path = chunk_path(run_id, chunk_index)
+    write_chunk(results, path)
+    session.add(EvaluationRunChunk(
+        run_id=run_id,
+        chunk_index=chunk_index,
+        start_row=start_row,
+        row_count=len(results),
+        aggregates=chunk_state(results),
+        results_path=path,
+    ))
+    session.execute(
+        update(EvaluationRun)
+        .where(EvaluationRun.id == run_id)
+        .values(
+            chunks_completed=EvaluationRun.chunks_completed + 1,
+            rows_completed=EvaluationRun.rows_completed + len(results),
+            cache_hits=EvaluationRun.cache_hits + cache_hits,
+            cache_misses=EvaluationRun.cache_misses + cache_misses,
+            rows_deduplicated=EvaluationRun.rows_deduplicated + duplicates,
+        )
+    )
+
+
+def _complete_run(session: Session, run_id: UUID, total_chunks: int) -> bool:
+    """Records the run's chunk count and completes it if every chunk is done."""
+    session.execute(
+        update(EvaluationRun).where(EvaluationRun.id == run_id).values(total_chunks=total_chunks)
+    )
+    session.commit()
+    if not _finish_if_complete(session, run_id):
+        return False
+    log_run_summary(run_id)
+    return True
+
+
+def run_evaluation_task(run_id: UUID, shard_index: Optional[int] = None):
     """
     Background task to execute the evaluation.
+
+    The dataset is streamed in chunks of `run.chunk_size` rows. After each chunk
+    its results are persisted and recorded as completed, so an interrupted or
+    failed run resumes from its completed chunks.
+
+    For sharded runs each worker job reads and executes only its shard's
+    contiguous range of chunks (see _shard_chunks); whichever shard finishes
+    last reduces all chunk states into the run summary.
     """
-    logger.info(f"Starting evaluation run {run_id}")
-    
+    logger.info(f"Starting evaluation run {run_id} (shard {shard_index})")
+
     # We need a new session for the background thread
+    generator = None
     with Session(db.engine) as session:
-        run = session.get(EvaluationRun, run_id)
-        if not run:
-            logger.error(f"Run {run_id} not found")
-            return
-
         try:
-            # Update status to PROCESSING
-            run.status = RunStatus.PROCESSING
-            session.add(run)
-            session.commit()
-            session.refresh(run)
-
-            # 1. Load Data
-            if not os.path.exists(run.dataset_path):
-                raise FileNotFoundError(f"Dataset not found at {run.dataset_path}")
-            
-            # Load CSV
-            df = pd.read_csv(run.dataset_path)
-            
+            # 1. Mark PROCESSING, check data
+            run = _prepare_run(session, run_id)
+            if not run:
+                return
+            shard_count = run.shard_count or 1
+
             # 2. Hydrate Profile & Scorers
-            profile = session.get(EvaluationProfile, run.profile_id)
+            profile, scorers = _load_profile_scorers(session, run.profile_id)
             if not profile:
                 raise ValueError(f"Profile {run.profile_id} not found")
-            
-            scorers = []
-            for scorer_id in profile.scorer_ids:
-                scorer_def = session.get(ScorerDefinition, scorer_id)
-                if scorer_def:
-                    scorers.append(scorer_factory(scorer_def))
-                else:
-                    logger.warning(f"Scorer {scorer_id} not found in profile {profile.name}")
 
             if not scorers:
                 raise ValueError("No valid scorers found for this profile")
 
-            # 3. Run MLflow Evaluation
-            with mlflow.start_run() as mlflow_run:
-                run.mlflow_run_id = mlflow_run.info.run_id
-                
-                # Prepare data for mlflow.evaluate
-                # We pass the dataframe directly. MLflow will look for 'inputs' column by default.
-                # If 'ground_truth' is present, it will be used.
-                
-                # Use mlflow.genai.evaluate as requested
-                eval_result = mlflow.genai.evaluate(
-                    data=df,
-                    scorers=scorers,
+            session.execute(
+                update(EvaluationRun)
+                .where(EvaluationRun.id == run.id)
+                .values(scorer_versions={scorer_output_name(h): _scorer_version(h) for h in scorers})
+            )
+            session.commit()
+
+            # Derived runs copy unchanged scorers' columns from the parent run
+            parent, reused = _reusable_scorers(session, run, scorers)
+            to_score = [h for h in scorers if scorer_output_name(h) not in reused]
+            if parent:
+                logger.info(
+                    f"Run {run_id} derived from {parent.id}: reusing {len(reused)} scorers, "
+                    f"scoring {len(to_score)}"
                 )
-                
-                # 4. Digest & Save Results
-                # Aggregate metrics
-                run.summary_results = eval_result.metrics
-                
-                # Save row-level details
-                # eval_result.tables["eval_results_table"] is the artifact path (e.g. "eval_results_table.json")
-                if "eval_results_table" in eval_result.tables:
-                    artifact_path = eval_result.tables["eval_results_table"]
-                    
-                    # Download the artifact to a local temp path to ensure we have it
-                    local_path = mlflow.artifacts.download_artifacts(
-                        run_id=mlflow_run.info.run_id, 
-                        artifact_path=artifact_path
+
+            # 3. Resume: chunks with a persisted record are never re-scored
+            completed = set(session.exec(
+                select(EvaluationRunChunk.chunk_index).where(EvaluationRunChunk.run_id == run.id)
+            ).all())
+            if completed:
+                logger.info(f"Resuming run {run_id}: {len(completed)} chunks already scored")
+            shard_key = "all" if shard_index is None else str(shard_index)
+            progress = ProgressTracker(run.id, shard_key, [scorer_output_name(h) for h in scorers])
+
+            # Only scorers executed by MLflow need an MLflow run while scoring;
+            # row results go straight to the results store either way
+            uses_mlflow = any(_uses_mlflow(h) for h in to_score)
+            mlflow_run_id = _ensure_mlflow_run(session, run.id) if uses_mlflow else None
+
+            # Runs with a generation stage produce their outputs chunk by chunk
+            if run.generation:
+                generator = CandidateGenerator(run.id, run.generation.get("eval_type"), run.generation)
+
+            # Sequential runs check their stopping rule after every chunk
+            sampling = run.sampling or {}
+            stop_reason = sampling.get("stop_reason")
+            baseline = _baseline_summary(session, run)
+
+            # 4. Stream the shard's rows, one chunk at a time. The chunk size
+            # is pinned on the run, so chunk boundaries are stable.
+            total_chunks = math.ceil(run.total_rows / run.chunk_size)
+            start_chunk, stop_chunk = _shard_chunks(total_chunks, shard_count, shard_index)
+            with mlflow.start_run(run_id=mlflow_run_id) if uses_mlflow else nullcontext():
+                chunks = enumerate(iter_chunks(_input_path(run), run.chunk_size, start_chunk, stop_chunk), start_chunk)
+                if generator:
+                    # Generation of the next chunk overlaps scoring of this one
+                    chunks = generator.pipeline(chunks, wanted=lambda i: not stop_reason and i not in completed)
+                for chunk_index, df in chunks:
+                    # A stopped sequential run ends after its last scored chunk
+                    if stop_reason and chunk_index not in completed:
+                        total_chunks = chunk_index
+                        break
+                    # Completed chunks are only read, never scored
+                    if chunk_index in completed:
+                        continue
+
+                    session.refresh(run)
+                    if run.status != RunStatus.PROCESSING:
+                        logger.info(f"Run {run_id} is {run.status.value}, stopping shard {shard_index}")
+                        return
+
+                    start_row = chunk_index * run.chunk_size
+                    df.insert(0, ROW_INDEX_COLUMN, range(start_row, start_row + len(df)))
+                    # Sampled rows keep their dataset position, but it is not row content
+                    dataset_rows = df.pop(DATASET_ROW_COLUMN) if DATASET_ROW_COLUMN in df.columns else None
+                    # Rows without generated outputs are not scored
+                    generation_errors = df.pop(GENERATION_ERROR_COLUMN) if generator else None
+                    to_score_df = df[generation_errors.isna()] if generator else df
+                    chunk_run = (
+                        mlflow.start_run(run_name=f"chunk-{chunk_index}", nested=True) if uses_mlflow else nullcontext()
                     )
-                    
-                    # For this MVP, we store the local path to the downloaded artifact
-                    run.row_details_path = local_path
+                    with chunk_run:
+                        results, cache_hits, cache_misses, duplicates = _score_chunk(
+                            session, run, to_score_df, to_score, progress
+                        )
+                    if generator:
+                        results = with_generation_errors(df, results, generation_errors)
+                    if reused:
+                        results = results.join(_parent_columns(parent, chunk_index, df, reused))
+                        for name in reused:
+                            progress.scorer_done(name, len(df))
+                    if dataset_rows is not None:
+                        results.insert(1, DATASET_ROW_COLUMN, dataset_rows.to_numpy())
 
-            # Success
-            run.status = RunStatus.COMPLETED
-            session.add(run)
-            session.commit()
-            logger.info(f"Run {run_id} completed successfully")
+                    _record_chunk(session, run.id, chunk_index, start_row, results, cache_hits, cache_misses, duplicates)
+                    session.commit()
+                    progress.chunk_done()
+                    logger.info(f"Run {run_id}: chunk {chunk_index} done ({len(df)} rows)")
+
+                    if sampling.get("sequential"):
+                        stop_reason = _check_sequential_stop(session, run, baseline)
+
+                # 5. Reduce: the last shard to finish digests & saves results
+                progress.flush(force=True)
+                if _complete_run(session, run.id, total_chunks):
+                    logger.info(f"Run {run_id} completed successfully")
+                else:
+                    logger.info(f"Run {run_id}: shard {shard_index} done, waiting for other shards")
 
         except Exception as e:
             logger.exception(f"Run {run_id} failed")
-            run.status = RunStatus.FAILED
-            run.error_message = str(e)
-            session.add(run)
+            session.rollback()
+            session.execute(
+                update(EvaluationRun)
+                .where(EvaluationRun.id == run_id)
+                .values(status=RunStatus.FAILED, error_message=str(e))
+            )
+            session.commit()
+        finally:
+            if generator:
+                generator.close()
+
+
+class _BatchProgress:
+    """Forwards scorer progress of a shared scoring pass to the trackers of the runs using each scorer."""
+
+    def __init__(self, trackers: List[ProgressTracker]):
+        self.trackers = trackers
+
+    def scorer_done(self, name: str, rows: int) -> None:
+        for tracker in self.trackers:
+            if name in tracker.scorer_names:
+                tracker.scorer_done(name, rows)
+
+
+def _candidate_frame(df: pd.DataFrame, candidate: str, candidates: List[str]) -> pd.DataFrame:
+    """A chunk as one candidate is scored: its column becomes `outputs`, other candidates are dropped."""
+    df = df.drop(columns=[c for c in candidates if c != candidate])
+    if candidate != "outputs":
+        df = df.drop(columns=["outputs"], errors="ignore").rename(columns={candidate: "outputs"})
+    return df
+
+
+def run_batch_task(batch_id: UUID):
+    """
+    Executes every run of a batch in a single pass over the dataset.
+
+    Each chunk is read once. Per candidate column, the union of the scorers
+    of that candidate's runs scores it once (with the usual deduplication and
+    result cache); each (profile, candidate) run then gets its own profile's
+    columns as its chunk results and summary. Runs checkpoint and resume
+    chunk by chunk like regular runs.
+    """
+    logger.info(f"Starting evaluation batch {batch_id}")
+
+    with Session(db.engine) as session:
+        try:
+            # 1. Mark PROCESSING; the dataset is counted by the first run only
+            batch = session.exec(
+                select(EvaluationRun).where(EvaluationRun.batch_id == batch_id).order_by(EvaluationRun.created_at)
+            ).all()
+            candidates = sorted({run.candidate or "outputs" for run in batch})
+            runs: List[EvaluationRun] = []
+            for run in batch:
+                if runs and run.total_rows is None:
+                    run.total_rows = runs[0].total_rows
+                prepared = _prepare_run(session, run.id)
+                if prepared:
+                    runs.append(prepared)
+            if not runs:
+                return
+            chunk_size = runs[0].chunk_size
+
+            # 2. Hydrate each profile once; same-named scorers must be the same scorer
+            profile_scorers: Dict[UUID, List[HydratedScorer]] = {}
+            union: Dict[str, HydratedScorer] = {}
+            for run in runs:
+                if run.profile_id not in profile_scorers:
+                    profile, scorers = _load_profile_scorers(session, run.profile_id)
+                    if not profile:
+                        raise ValueError(f"Profile {run.profile_id} not found")
+                    if not scorers:
+                        raise ValueError(f"No valid scorers found for profile {profile.name}")
+                    profile_scorers[run.profile_id] = scorers
+                for hydrated in profile_scorers[run.profile_id]:
+                    name = scorer_output_name(hydrated)
+                    if name in union and union[name].id != hydrated.id:
+                        raise ValueError(f"Scorers {union[name].id} and {hydrated.id} both report as {name}")
+                    union[name] = hydrated
+                session.execute(
+                    update(EvaluationRun)
+                    .where(EvaluationRun.id == run.id)
+                    .values(scorer_versions={
+                        scorer_output_name(h): _scorer_version(h) for h in profile_scorers[run.profile_id]
+                    })
+                )
+            session.commit()
+            run_names = {
+                run.id: {scorer_output_name(h) for h in profile_scorers[run.profile_id]} for run in runs
+            }
+            logger.info(
+                f"Batch {batch_id}: {len(runs)} runs, {len(candidates)} candidates, {len(union)} distinct scorers"
+            )
+
+            # 3. Resume: each run skips its own completed chunks
+            completed: Dict[UUID, set] = {run.id: set() for run in runs}
+            for run_id, chunk_index in session.exec(
+                select(EvaluationRunChunk.run_id, EvaluationRunChunk.chunk_index)
+                .where(EvaluationRunChunk.run_id.in_(list(completed)))
+            ).all():
+                completed[run_id].add(chunk_index)
+            progress = {run.id: ProgressTracker(run.id, "all", sorted(run_names[run.id])) for run in runs}
+
+            # MLflow-executed scorers run inside the first run's MLflow run
+            uses_mlflow = any(_uses_mlflow(h) for h in union.values())
+            mlflow_run_id = _ensure_mlflow_run(session, runs[0].id) if uses_mlflow else None
+
+            # 4. Stream the dataset once for all runs
+            total_chunks = 0
+            with mlflow.start_run(run_id=mlflow_run_id) if uses_mlflow else nullcontext():
+                for chunk_index, df in enumerate(iter_chunks(runs[0].dataset_path, chunk_size)):
+                    total_chunks = chunk_index + 1
+                    pending = [run for run in runs if chunk_index not in completed[run.id]]
+                    if not pending:
+                        continue
+
+                    # Runs deleted or failed meanwhile drop out of the batch
+                    active = set(session.exec(
+                        select(EvaluationRun.id)
+                        .where(EvaluationRun.id.in_([run.id for run in runs]))
+                        .where(EvaluationRun.status == RunStatus.PROCESSING)
+                    ).all())
+                    runs = [run for run in runs if run.id in active]
+                    pending = [run for run in pending if run.id in active]
+                    if not runs:
+                        logger.info(f"Batch {batch_id} has no runs left to process, stopping")
+                        return
+
+                    start_row = chunk_index * chunk_size
+                    df.insert(0, ROW_INDEX_COLUMN, range(start_row, start_row + len(df)))
+                    for candidate in candidates:
+                        candidate_runs = [run for run in pending if (run.candidate or "outputs") == candidate]
+                        if not candidate_runs:
+                            continue
+                        needed = set().union(*(run_names[run.id] for run in candidate_runs))
+                        scorers = [hydrated for name, hydrated in union.items() if name in needed]
+                        chunk_run = (
+                            mlflow.start_run(run_name=f"chunk-{chunk_index}-{candidate}", nested=True)
+                            if uses_mlflow else nullcontext()
+                        )
+                        with chunk_run:
+                            results, cache_hits, cache_misses, duplicates = _score_chunk(
+                                session,
+                                candidate_runs[0],
+                                _candidate_frame(df, candidate, candidates),
+                                scorers,
+                                _BatchProgress([progress[run.id] for run in candidate_runs]),
+                                judge_run_ids=[run.id for run in candidate_runs],
+                            )
+                        # Every run keeps only its own profile's scorer columns
+                        for run in candidate_runs:
+                            others = [
+                                f"{name}{suffix}" for name in needed - run_names[run.id]
+                                for suffix in (SCORE_SUFFIX, JUSTIFICATION_SUFFIX)
+                            ]
+                            _record_chunk(
+                                session, run.id, chunk_index, start_row, results.drop(columns=others),
+                                cache_hits, cache_misses, duplicates,
+                            )
+                    # All runs' chunks (and new cache entries) commit together
+                    session.commit()
+                    for run in pending:
+                        progress[run.id].chunk_done()
+                    logger.info(f"Batch {batch_id}: chunk {chunk_index} done ({len(df)} rows, {len(pending)} runs)")
+
+            # 5. Reduce every run
+            for run in runs:
+                progress[run.id].flush(force=True)
+                if _complete_run(session, run.id, total_chunks):
+                    logger.info(f"Run {run.id} of batch {batch_id} completed successfully")
+
+        except Exception as e:
+            logger.exception(f"Batch {batch_id} failed")
+            session.rollback()
+            session.execute(
+                update(EvaluationRun)
+                .where(EvaluationRun.batch_id == batch_id, EvaluationRun.status != RunStatus.COMPLETED)
+                .values(status=RunStatus.FAILED, error_message=str(e))
+            )
             session.commit()
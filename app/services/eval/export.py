@@ -0,0 +1,77 @@
+"""
+Streaming export of a run's row-level results.
+
+Rows are read one row group at a time and serialized as they are read, so
+memory stays flat whatever the size of the run.
+"""
+
+import io
+import json
+from typing import Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from app.services.eval.reports import Report
+from app.services.eval.results import RESULTS_COMPRESSION
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _nan_to_null(batch: pa.RecordBatch) -> pa.RecordBatch:
+    # Errored scores are NaN, which is not valid JSON
+    columns = [
+        pc.if_else(pc.is_nan(column), None, column) if pa.types.is_floating(column.type) else column
+        for column in batch.columns
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=batch.schema)
+
+
+def _ndjson(batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    for batch in batches:
+        rows = _nan_to_null(batch).to_pylist()
+        yield "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+
+
+def _csv(batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    header = True
+    for batch in batches:
+        buffer = io.BytesIO()
+        pacsv.write_csv(batch, buffer, write_options=pacsv.WriteOptions(include_header=header))
+        header = False
+        yield buffer.getvalue()
+
+
+def _parquet(batches: Iterator[pa.RecordBatch], schema: pa.Schema) -> Iterator[bytes]:
+    buffer = io.BytesIO()
+    with pq.ParquetWriter(buffer, schema, compression=RESULTS_COMPRESSION) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            # Hand over each finished row group, keeping the buffer small
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_report(report: Report, format: str, columns: Optional[List[str]] = None) -> Iterator[bytes]:
+    """
+    Serializes a report in `format` (ndjson, csv or parquet).
+
+    Column validation happens here, before the first byte is produced.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    schema = report.project(columns)
+    batches = report.iter_batches(schema)
+    if format == "ndjson":
+        return _ndjson(batches)
+    if format == "csv":
+        return _csv(batches)
+    return _parquet(batches, schema)
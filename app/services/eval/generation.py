@@ -0,0 +1,184 @@
+"""
+Candidate generation stage of a run.
+
+When a run has a `generation` configuration, the outputs to score are
+produced by a model instead of being read from the dataset: every row's
+`inputs` (plus its `context` for RAG runs) is sent to an OpenAI-compatible
+chat completions endpoint and the answer becomes the row's `outputs`.
+
+Calls go through the judge engine (app.services.eval.judge_executor), so
+they share its adaptive concurrency, shared rate budgets and
+retry/backoff. Generation runs on its own event loop thread and is
+pipelined with scoring: while the executor scores chunk N, chunk N+1 (up to
+EVAL_GENERATION_PREFETCH chunks ahead) is being generated. Each generated
+chunk is written to the run's results directory as soon as it is done, so a
+resumed run does not generate it again.
+
+Point `base_url` at any local stand-in server (e.g. `python -m
+app.fake_model_server`) to exercise the stage without a real model.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from app.services.eval.judge_executor import (
+    DEFAULT_BASE_URL,
+    JudgeCallError,
+    JudgeEndpoint,
+    JudgeExecutor,
+)
+from app.services.eval.results import JUSTIFICATION_SUFFIX, run_results_dir
+
+logger = logging.getLogger(__name__)
+
+# Chunks generated ahead of the chunk being scored
+GENERATION_PREFETCH = int(os.getenv("EVAL_GENERATION_PREFETCH", "1"))
+GENERATION_ERROR_COLUMN = "generation/error"
+
+_SYSTEM_PROMPTS = {
+    "rag": "Answer the question using only the provided context.",
+    "chatbot": "You are a helpful assistant.",
+    "agent": "You are an agent. Work through the task step by step and give the final answer.",
+}
+
+
+def generation_endpoint(config: Dict[str, Any]) -> JudgeEndpoint:
+    model_uri = config["model"]
+    _, _, model = model_uri.rpartition(":/")
+    base_url = (config.get("base_url") or DEFAULT_BASE_URL).rstrip("/")
+    # The model URI also names the shared rate budget, as for judges
+    return JudgeEndpoint(base_url=base_url, model=model, judge_model=model_uri)
+
+
+def _messages(row: Dict[str, Any], eval_type: str, config: Dict[str, Any]) -> List[Dict[str, str]]:
+    system = config.get("system_prompt") or _SYSTEM_PROMPTS.get(eval_type, _SYSTEM_PROMPTS["chatbot"])
+    question = str(row.get("inputs", ""))
+    if eval_type == "rag" and row.get("context") is not None:
+        question = f"Context:\n{row['context']}\n\nQuestion:\n{question}"
+    return [{"role": "system", "content": system}, {"role": "user", "content": question}]
+
+
+def with_generation_errors(df: pd.DataFrame, results: pd.DataFrame, errors: pd.Series) -> pd.DataFrame:
+    """
+    Completes the results of a chunk's scored rows with the rows whose
+    generation failed. Every scorer errors on those (no score, the generation
+    error as justification), so they stay out of the run's aggregates.
+    """
+    scored_columns = [c for c in results.columns if c not in df.columns]
+    full = df.join(results[scored_columns])
+    failed = errors.notna()
+    for column in scored_columns:
+        if column.endswith(JUSTIFICATION_SUFFIX):
+            full.loc[failed, column] = errors[failed]
+    full[GENERATION_ERROR_COLUMN] = errors
+    return full
+
+
+def generated_chunk_path(run_id, chunk_index: int) -> str:
+    return os.path.join(run_results_dir(run_id), "generated", f"chunk-{chunk_index:06d}.parquet")
+
+
+class CandidateGenerator:
+    """Generates the outputs of a run's chunks on a background event loop."""
+
+    def __init__(self, run_id, eval_type: str, config: Dict[str, Any]):
+        self.run_id = run_id
+        self.eval_type = eval_type or "chatbot"
+        self.config = config
+        self.output_column = config.get("output_column", "outputs")
+        self.endpoint = generation_endpoint(config)
+        self._options = {
+            "temperature": config.get("temperature", 0),
+            **({"max_tokens": config["max_tokens"]} if config.get("max_tokens") else {}),
+        }
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="candidate-generation", daemon=True)
+        self._thread.start()
+        self._executor = JudgeExecutor()
+
+    async def _generate_row(self, row: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        limiter = self._executor._limiter(self.endpoint, int(self.config.get("max_workers", 16)))
+        try:
+            content = await self._executor._call(
+                self.endpoint, limiter, _messages(row, self.eval_type, self.config), options=self._options
+            )
+            return content, None
+        except JudgeCallError as e:
+            return None, f"Generation failed: {e}"
+
+    async def _generate(self, chunk_index: int, df: pd.DataFrame) -> pd.DataFrame:
+        rows = df.to_dict(orient="records")
+        results = await asyncio.gather(*(self._generate_row(row) for row in rows))
+        generated = pd.DataFrame(
+            {
+                self.output_column: [output for output, _ in results],
+                GENERATION_ERROR_COLUMN: [error for _, error in results],
+            },
+            index=df.index,
+        )
+        # Checkpoint: a resumed run reuses this chunk's outputs
+        path = generated_chunk_path(self.run_id, chunk_index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        await asyncio.to_thread(generated.to_parquet, tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return generated
+
+    def _submit(self, chunk_index: int, df: pd.DataFrame) -> Future:
+        path = generated_chunk_path(self.run_id, chunk_index)
+        if os.path.exists(path):
+            future: Future = Future()
+            generated = pd.read_parquet(path)
+            generated.index = df.index
+            future.set_result(generated)
+            return future
+        return asyncio.run_coroutine_threadsafe(self._generate(chunk_index, df), self._loop)
+
+    def _with_outputs(self, df: pd.DataFrame, future: Optional[Future]) -> pd.DataFrame:
+        if future is None:
+            return df
+        generated = future.result()
+        df = df.copy()
+        df[self.output_column] = generated[self.output_column]
+        df[GENERATION_ERROR_COLUMN] = generated[GENERATION_ERROR_COLUMN]
+        return df
+
+    def pipeline(
+        self,
+        chunks: Iterator[Tuple[int, pd.DataFrame]],
+        wanted: Callable[[int], bool],
+    ) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """
+        Yields the chunks in order, with generated outputs for the `wanted`
+        ones. Generation of the next chunks is started before a chunk is
+        handed to the caller, so it overlaps the caller's scoring.
+        """
+        pending: deque = deque()
+        try:
+            for chunk_index, df in chunks:
+                future = self._submit(chunk_index, df) if wanted(chunk_index) else None
+                pending.append((chunk_index, df, future))
+                while len(pending) > GENERATION_PREFETCH or (pending and pending[0][2] is None):
+                    chunk_index, df, future = pending.popleft()
+                    yield chunk_index, self._with_outputs(df, future)
+            while pending:
+                chunk_index, df, future = pending.popleft()
+                yield chunk_index, self._with_outputs(df, future)
+        finally:
+            # The caller stopped early: drop generation nobody will use
+            for _, _, future in pending:
+                if future is not None:
+                    future.cancel()
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._executor.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
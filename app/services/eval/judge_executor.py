@@ -0,0 +1,363 @@
+"""
+Asyncio execution engine for LLM_JUDGE scorers.
+
+All judges of a profile are run over the rows concurrently. Calls are
+multiplexed per judge endpoint (base URL + model): judges that share an
+endpoint share one HTTP client and one adaptive concurrency limit. The limit
+follows AIMD: it grows additively while calls succeed at normal latency and
+halves on 429s, server errors, timeouts or latency spikes.
+
+Any OpenAI-compatible chat completions server works, so the engine can be
+exercised locally by pointing `OPENAI_API_BASE` (or a scorer's `base_url`
+configuration) at a fake server.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from app.db.models import ScorerType
+from app.services.eval.rate_limit import bucket_store, estimate_tokens, rate_limit_for
+from app.services.eval.results import JUSTIFICATION_SUFFIX, SCORE_SUFFIX
+from app.services.eval.scorer_factory import HydratedScorer, scorer_output_name
+
+logger = logging.getLogger(__name__)
+
+JUDGE_EXECUTOR = os.getenv("EVAL_JUDGE_EXECUTOR", "async")  # 'async' or 'mlflow'
+DEFAULT_BASE_URL = os.getenv("OPENAI_API_BASE", os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("EVAL_JUDGE_TIMEOUT_SECONDS", "120"))
+MAX_RETRIES = int(os.getenv("EVAL_JUDGE_MAX_RETRIES", "5"))
+STATS_INTERVAL_SECONDS = float(os.getenv("EVAL_JUDGE_STATS_INTERVAL_SECONDS", "2"))
+
+# Latency above this multiple of the best observed latency counts as congestion
+LATENCY_SPIKE_FACTOR = 3.0
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Request options of judge calls: deterministic, JSON verdicts
+_JUDGE_OPTIONS = {"temperature": 0, "response_format": {"type": "json_object"}}
+
+# Row columns a judge prompt can reference
+_PROMPT_COLUMNS = ("inputs", "outputs", "context", "ground_truth")
+
+# Concurrency limits learned by previous chunks/runs in this process, per endpoint
+_learned_limits: Dict[Tuple[str, str], float] = {}
+_learned_limits_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class JudgeEndpoint:
+    base_url: str
+    model: str
+    # Original `judge_model` URI, which also names the shared rate budget
+    judge_model: str
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.base_url, self.model)
+
+
+def judge_endpoint(hydrated: HydratedScorer) -> Optional[JudgeEndpoint]:
+    """
+    Resolves the OpenAI-compatible endpoint of an LLM judge.
+
+    Returns None when the judge should go through MLflow instead (non-OpenAI
+    `judge_model` URI without an explicit `base_url`).
+    """
+    config = hydrated.configuration
+    judge_model = config.get("judge_model", "openai:/gpt-4")
+    provider, _, model = judge_model.partition(":/")
+    base_url = config.get("base_url")
+    if not base_url:
+        if provider != "openai":
+            return None
+        base_url = DEFAULT_BASE_URL
+    return JudgeEndpoint(base_url=base_url.rstrip("/"), model=model, judge_model=judge_model)
+
+
+def is_async_judge(hydrated: HydratedScorer) -> bool:
+    return (
+        JUDGE_EXECUTOR == "async"
+        and hydrated.scorer_type == ScorerType.LLM_JUDGE
+        and judge_endpoint(hydrated) is not None
+    )
+
+
+class JudgeCallError(Exception):
+    def __init__(self, message: str, retryable: bool, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one endpoint, shared by every judge using it."""
+
+    def __init__(self, endpoint: JudgeEndpoint, initial: float, max_limit: int):
+        self.endpoint = endpoint
+        self.limit = max(1.0, min(initial, max_limit))
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.best_latency: Optional[float] = None
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float], congested: bool) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if latency is not None and not congested:
+                self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+                congested = latency > self.best_latency * LATENCY_SPIKE_FACTOR
+            if congested:
+                self.limit = max(1.0, self.limit / 2)
+            elif latency is not None:
+                # Roughly +1 per "window" of successful calls
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+
+def _build_messages(config: Dict[str, Any], rows: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    instructions = [
+        "You are an impartial judge grading the output of an AI system.",
+        f"Metric definition:\n{config.get('definition', '')}",
+        f"Grading rubric:\n{config.get('grading_prompt', '')}",
+    ]
+    for example in config.get("examples", []):
+        instructions.append(f"Example:\n{json.dumps(example, default=str)}")
+
+    if len(rows) == 1:
+        instructions.append(
+            'Respond with a JSON object: {"score": <number>, "justification": "<why>"}.'
+        )
+        payload = json.dumps(rows[0], default=str)
+    else:
+        instructions.append(
+            "Grade every item independently. Respond with a JSON object: "
+            '{"results": [{"id": <item id>, "score": <number>, "justification": "<why>"}]}.'
+        )
+        payload = json.dumps([{"id": i, **row} for i, row in enumerate(rows)], default=str)
+
+    return [
+        {"role": "system", "content": "\n\n".join(instructions)},
+        {"role": "user", "content": payload},
+    ]
+
+
+def _parse_results(content: str, expected: int) -> List[Tuple[Optional[float], Optional[str]]]:
+    data = json.loads(content)
+    items = [data] if expected == 1 else sorted(data["results"], key=lambda item: int(item["id"]))
+    if len(items) != expected:
+        raise ValueError(f"Judge returned {len(items)} results for {expected} rows")
+    return [(float(item["score"]), str(item.get("justification", ""))) for item in items]
+
+
+class JudgeExecutor:
+    """Runs one batch of judge work inside a single event loop."""
+
+    def __init__(self, on_stats: Optional[Callable[[int, int], None]] = None):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._limiters: Dict[Tuple[str, str], AdaptiveLimiter] = {}
+        self._api_key = os.getenv("OPENAI_API_KEY", "")
+        self._buckets = bucket_store()
+        self._on_stats = on_stats
+        # Calls waiting for rate budget or a concurrency slot / calls awaiting a response
+        self.queued = 0
+        self.in_flight = 0
+
+    def _client(self, endpoint: JudgeEndpoint) -> httpx.AsyncClient:
+        if endpoint.base_url not in self._clients:
+            headers = {"Authorization": f"Bearer {self._api_key}"} if self._api_key else {}
+            self._clients[endpoint.base_url] = httpx.AsyncClient(
+                base_url=endpoint.base_url,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT_SECONDS,
+            )
+        return self._clients[endpoint.base_url]
+
+    def _limiter(self, endpoint: JudgeEndpoint, max_workers: int) -> AdaptiveLimiter:
+        limiter = self._limiters.get(endpoint.key)
+        if limiter is None:
+            with _learned_limits_lock:
+                initial = _learned_limits.get(endpoint.key, min(4.0, max_workers))
+            limiter = AdaptiveLimiter(endpoint, initial, max_workers)
+            self._limiters[endpoint.key] = limiter
+        else:
+            limiter.max_limit = max(limiter.max_limit, max_workers)
+        return limiter
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        with _learned_limits_lock:
+            for key, limiter in self._limiters.items():
+                _learned_limits[key] = limiter.limit
+
+    async def _wait_for_budget(self, endpoint: JudgeEndpoint, tokens: int) -> None:
+        limit = rate_limit_for(endpoint.judge_model)
+        if limit is None:
+            return
+        while True:
+            wait = await asyncio.to_thread(self._buckets.try_acquire, endpoint.judge_model, limit, tokens)
+            if not wait:
+                return
+            await asyncio.sleep(min(wait, 5.0) * (0.5 + random.random()))
+
+    async def _report_stats(self) -> None:
+        while True:
+            await asyncio.to_thread(self._on_stats, self.queued, self.in_flight)
+            await asyncio.sleep(STATS_INTERVAL_SECONDS)
+
+    async def _call(
+        self,
+        endpoint: JudgeEndpoint,
+        limiter: AdaptiveLimiter,
+        messages: List[Dict[str, str]],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        body = {
+            "model": endpoint.model,
+            "messages": messages,
+            **(_JUDGE_OPTIONS if options is None else options),
+        }
+        estimated_tokens = estimate_tokens(json.dumps(messages))
+        for attempt in range(MAX_RETRIES + 1):
+            self.queued += 1
+            try:
+                await self._wait_for_budget(endpoint, estimated_tokens)
+                await limiter.acquire()
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            started = time.monotonic()
+            latency, congested = None, False
+            try:
+                response = await self._client(endpoint).post("/chat/completions", json=body)
+                if response.status_code in _RETRYABLE_STATUS:
+                    congested = True
+                    retry_after = response.headers.get("retry-after")
+                    raise JudgeCallError(
+                        f"{endpoint.model} returned {response.status_code}",
+                        retryable=True,
+                        retry_after=float(retry_after) if retry_after else None,
+                    )
+                if response.status_code >= 400:
+                    raise JudgeCallError(
+                        f"{endpoint.model} returned {response.status_code}: {response.text[:200]}",
+                        retryable=False,
+                    )
+                latency = time.monotonic() - started
+                data = response.json()
+                used_tokens = data.get("usage", {}).get("total_tokens")
+                if used_tokens is not None and rate_limit_for(endpoint.judge_model):
+                    # Settle the estimate against what the provider actually counted
+                    await asyncio.to_thread(
+                        self._buckets.adjust_tokens, endpoint.judge_model, used_tokens - estimated_tokens
+                    )
+                return data["choices"][0]["message"]["content"]
+            except httpx.TransportError as e:
+                congested = True
+                error = JudgeCallError(str(e), retryable=True)
+            except JudgeCallError as e:
+                error = e
+            finally:
+                self.in_flight -= 1
+                await limiter.release(latency, congested)
+
+            if not error.retryable or attempt == MAX_RETRIES:
+                raise error
+            delay = error.retry_after or min(60.0, 2 ** attempt) * (0.5 + random.random())
+            await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable")
+
+    async def _score_batch(
+        self,
+        hydrated: HydratedScorer,
+        endpoint: JudgeEndpoint,
+        rows: List[Dict[str, Any]],
+    ) -> List[Tuple[Optional[float], Optional[str]]]:
+        limiter = self._limiter(endpoint, int(hydrated.configuration.get("max_workers", 10)))
+        try:
+            content = await self._call(endpoint, limiter, _build_messages(hydrated.configuration, rows))
+            return _parse_results(content, len(rows))
+        except (ValueError, KeyError, TypeError, json.JSONDecodeError) as e:
+            if len(rows) == 1:
+                return [(None, f"Unparseable judge response: {e}")]
+            # The judge could not handle the batch, grade those rows one by one
+            results = await asyncio.gather(*(self._score_batch(hydrated, endpoint, [row]) for row in rows))
+            return [result for batch in results for result in batch]
+        except JudgeCallError as e:
+            return [(None, f"Judge call failed: {e}")] * len(rows)
+
+    async def score(self, work: List[Tuple[HydratedScorer, pd.DataFrame]]) -> Dict[str, pd.DataFrame]:
+        """Scores each judge's rows, all judges concurrently. Returns one frame per judge output name."""
+        tasks, layout = [], []
+        for hydrated, df in work:
+            endpoint = judge_endpoint(hydrated)
+            rows = df[[c for c in _PROMPT_COLUMNS if c in df.columns]].to_dict(orient="records")
+            batch_size = max(1, int(hydrated.configuration.get("batch_size", 1)))
+            for start in range(0, len(rows), batch_size):
+                tasks.append(self._score_batch(hydrated, endpoint, rows[start:start + batch_size]))
+                layout.append((hydrated, start))
+
+        reporter = asyncio.create_task(self._report_stats()) if self._on_stats else None
+        try:
+            batches = await asyncio.gather(*tasks)
+        finally:
+            if reporter:
+                reporter.cancel()
+                await asyncio.to_thread(self._on_stats, 0, 0)
+
+        outputs: Dict[str, pd.DataFrame] = {}
+        for hydrated, df in work:
+            name = scorer_output_name(hydrated)
+            outputs[name] = pd.DataFrame(
+                {f"{name}{SCORE_SUFFIX}": np.nan, f"{name}{JUSTIFICATION_SUFFIX}": None},
+                index=df.index,
+            )
+        for (hydrated, start), batch in zip(layout, batches):
+            frame = outputs[scorer_output_name(hydrated)]
+            positions = range(start, start + len(batch))
+            frame.iloc[positions, 0] = [np.nan if score is None else score for score, _ in batch]
+            frame.iloc[positions, 1] = [justification for _, justification in batch]
+        return outputs
+
+
+def score_judges(
+    work: List[Tuple[HydratedScorer, pd.DataFrame]],
+    on_stats: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Synchronous entry point used by the executor.
+
+    Args:
+        work: (judge, rows to score) pairs. Every judge can have its own rows,
+            e.g. only its cache misses.
+        on_stats: Called periodically (from a worker thread) with the number
+            of queued and in-flight judge calls.
+
+    Returns:
+        For each judge output name, `<name>/score` and `<name>/justification`
+        columns aligned with the index of that judge's rows.
+    """
+    async def _run():
+        executor = JudgeExecutor(on_stats=on_stats)
+        try:
+            return await executor.score(work)
+        finally:
+            await executor.close()
+
+    return asyncio.run(_run())
@@ -0,0 +1,55 @@
+from typing import Any, Dict, Optional
+
+import mlflow
+import numpy as np
+import pandas as pd
+
+from app.services.eval.results import (
+    JUSTIFICATION_SUFFIX,
+    ROW_INDEX_COLUMN,
+    SCORE_SUFFIX,
+    normalize_result_columns,
+)
+
+
+def _find_column(results: pd.DataFrame, name: str, suffix: str) -> Optional[str]:
+    # MLflow may version builtin metric columns, e.g. "<name>/v1/score"
+    for column in results.columns:
+        if isinstance(column, str) and column.startswith(f"{name}/") and column.endswith(suffix):
+            return column
+    return None
+
+
+def mlflow_scores(df: pd.DataFrame, scorers: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Scores rows with MLflow scorers (output name -> scorer), all in a single
+    `mlflow.genai.evaluate` call, so the run setup and tracing overhead is
+    paid once per chunk rather than once per scorer.
+
+    Returns:
+        `<name>/score` and `<name>/justification` columns of every scorer, aligned with df's index.
+    """
+    eval_result = mlflow.genai.evaluate(
+        data=df.drop(columns=[ROW_INDEX_COLUMN]),
+        scorers=list(scorers.values()),
+    )
+    # Read the results table from memory, never back from the artifact store
+    table = getattr(eval_result, "result_df", None)
+    if table is None:
+        table = eval_result.tables.get("eval_results_table")
+    if table is None:
+        raise ValueError(f"MLflow returned no results table for scorers {', '.join(scorers)}")
+    results = normalize_result_columns(table)
+
+    # MLflow keeps row order, so results line up positionally with df
+    scores = pd.DataFrame(index=df.index)
+    for name in scorers:
+        score_column = _find_column(results, name, SCORE_SUFFIX)
+        justification_column = _find_column(results, name, JUSTIFICATION_SUFFIX)
+        scores[f"{name}{SCORE_SUFFIX}"] = (
+            pd.to_numeric(results[score_column], errors="coerce").to_numpy() if score_column else np.nan
+        )
+        scores[f"{name}{JUSTIFICATION_SUFFIX}"] = (
+            results[justification_column].astype(str).to_numpy() if justification_column else None
+        )
+    return scores
@@ -0,0 +1,250 @@
+"""
+Native implementations of simple BUILTIN metrics.
+
+These metrics are pure functions of the `outputs` (and `ground_truth`)
+columns, so they are computed over a whole chunk at once with Arrow compute
+kernels and NumPy instead of going through `mlflow.genai.evaluate` row by
+row. `scorer_factory` picks them by `metric_name`; any other builtin metric
+still goes through MLflow.
+
+Text is normalized the SQuAD way (lowercase, no punctuation, no articles,
+whitespace tokens) for the match and overlap metrics; ROUGE-L does not stem.
+Readability grades use a vowel-group syllable estimate, so they can differ
+slightly from textstat's dictionary-based counts. They are opt-in under
+their own `*_approx` names; `flesch_kincaid_grade_level` and
+`ari_grade_level` stay on MLflow/textstat, so existing profiles keep
+comparable scores.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from app.services.eval.results import JUSTIFICATION_SUFFIX, SCORE_SUFFIX
+
+PREDICTION_COLUMN = "outputs"
+REFERENCE_COLUMN = "ground_truth"
+
+_ARTICLES = pa.array(["a", "an", "the"])
+
+
+@dataclass(frozen=True)
+class NativeScorer:
+    metric_name: str
+    fn: Callable[[pd.DataFrame], np.ndarray]
+    needs_reference: bool
+
+
+def _text(df: pd.DataFrame, column: str) -> pa.Array:
+    return pa.array(df[column].fillna("").astype(str), type=pa.string())
+
+
+def _tokens(text: pa.Array) -> Tuple[np.ndarray, pa.Array]:
+    """
+    Normalized tokens of all rows, flattened.
+
+    Returns:
+        The row position of each token and the tokens themselves.
+    """
+    lowered = pc.replace_substring_regex(pc.utf8_lower(text), r"[[:punct:]]", " ")
+    rows, flat = _split(lowered)
+    keep = pc.invert(pc.is_in(flat, value_set=_ARTICLES))
+    return rows[keep.to_numpy(zero_copy_only=False)], pc.filter(flat, keep)
+
+
+def _split(text: pa.Array) -> Tuple[np.ndarray, pa.Array]:
+    tokens = pc.utf8_split_whitespace(text)
+    rows = pc.list_parent_indices(tokens).to_numpy()
+    flat = pc.list_flatten(tokens)
+    # Leading/trailing whitespace (and empty strings) split into empty tokens
+    keep = pc.not_equal(flat, "")
+    return rows[keep.to_numpy(zero_copy_only=False)], pc.filter(flat, keep)
+
+
+def _token_ids(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Tokens of the prediction and reference columns as integer ids from one
+    shared vocabulary.
+
+    Returns:
+        Prediction token rows and ids, reference token rows and ids, vocabulary size.
+    """
+    predicted_rows, predicted = _tokens(_text(df, PREDICTION_COLUMN))
+    reference_rows, reference = _tokens(_text(df, REFERENCE_COLUMN))
+    encoded = pa.chunked_array([predicted, reference], type=pa.string()).combine_chunks().dictionary_encode()
+    ids = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    return predicted_rows, ids[: len(predicted)], reference_rows, ids[len(predicted):], len(encoded.dictionary)
+
+
+def _split_rows(rows: np.ndarray, ids: np.ndarray, n: int) -> List[np.ndarray]:
+    # Tokens are in row order, so each row is a contiguous slice
+    return np.split(ids, np.cumsum(np.bincount(rows, minlength=n))[:-1])
+
+
+def _word_count(text: pa.Array) -> np.ndarray:
+    rows, _ = _split(text)
+    return np.bincount(rows, minlength=len(text)).astype(float)
+
+
+def exact_match(df: pd.DataFrame) -> np.ndarray:
+    predicted = pc.utf8_trim_whitespace(_text(df, PREDICTION_COLUMN))
+    reference = pc.utf8_trim_whitespace(_text(df, REFERENCE_COLUMN))
+    return pc.equal(predicted, reference).to_numpy(zero_copy_only=False).astype(float)
+
+
+def normalized_match(df: pd.DataFrame) -> np.ndarray:
+    predicted_rows, predicted, reference_rows, reference, _ = _token_ids(df)
+    return np.fromiter(
+        (
+            np.array_equal(p, r)
+            for p, r in zip(
+                _split_rows(predicted_rows, predicted, len(df)),
+                _split_rows(reference_rows, reference, len(df)),
+            )
+        ),
+        dtype=float,
+        count=len(df),
+    )
+
+
+def token_f1(df: pd.DataFrame) -> np.ndarray:
+    predicted_rows, predicted, reference_rows, reference, vocabulary = _token_ids(df)
+    predicted_len = np.bincount(predicted_rows, minlength=len(df))
+    reference_len = np.bincount(reference_rows, minlength=len(df))
+
+    # One int64 key per (row, token) pair, so overlaps are counted for all rows at once
+    vocabulary = max(vocabulary, 1)
+    predicted_keys, predicted_counts = np.unique(predicted_rows * vocabulary + predicted, return_counts=True)
+    reference_keys, reference_counts = np.unique(reference_rows * vocabulary + reference, return_counts=True)
+    shared, p_idx, r_idx = np.intersect1d(predicted_keys, reference_keys, assume_unique=True, return_indices=True)
+    overlap = np.minimum(predicted_counts[p_idx], reference_counts[r_idx])
+    common = np.bincount(shared // vocabulary, weights=overlap, minlength=len(df))
+
+    total = (predicted_len + reference_len).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f1 = np.where(total > 0, 2 * common / total, 1.0)
+    # Only one side empty: no overlap is possible
+    return np.where((predicted_len == 0) ^ (reference_len == 0), 0.0, f1)
+
+
+def _lcs_length(a: np.ndarray, b: np.ndarray) -> int:
+    """Bit-parallel LCS (Hyyro): one big-int update per token of `b`."""
+    if not len(a) or not len(b):
+        return 0
+    masks: Dict[int, int] = {}
+    for i, token in enumerate(a.tolist()):
+        masks[token] = masks.get(token, 0) | (1 << i)
+    full = (1 << len(a)) - 1
+    v = full
+    for token in b.tolist():
+        u = v & masks.get(token, 0)
+        v = ((v + u) | (v - u)) & full
+    return len(a) - bin(v).count("1")
+
+
+def rouge_l(df: pd.DataFrame) -> np.ndarray:
+    predicted_rows, predicted, reference_rows, reference, _ = _token_ids(df)
+    lcs = np.fromiter(
+        (
+            _lcs_length(r, p)
+            for p, r in zip(
+                _split_rows(predicted_rows, predicted, len(df)),
+                _split_rows(reference_rows, reference, len(df)),
+            )
+        ),
+        dtype=float,
+        count=len(df),
+    )
+    total = (np.bincount(predicted_rows, minlength=len(df)) + np.bincount(reference_rows, minlength=len(df))).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, 2 * lcs / total, 0.0)
+
+
+def length_ratio(df: pd.DataFrame) -> np.ndarray:
+    predicted = _word_count(_text(df, PREDICTION_COLUMN))
+    reference = _word_count(_text(df, REFERENCE_COLUMN))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(reference > 0, predicted / reference, np.nan)
+
+
+def token_count(df: pd.DataFrame) -> np.ndarray:
+    return _word_count(_text(df, PREDICTION_COLUMN))
+
+
+def _text_stats(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    text = _text(df, PREDICTION_COLUMN)
+    lowered = pc.utf8_lower(text)
+
+    def count(values: pa.Array, pattern: str) -> np.ndarray:
+        return pc.count_substring_regex(values, pattern).to_numpy(zero_copy_only=False).astype(float)
+
+    words = count(text, r"[A-Za-z0-9']+")
+    sentences = np.maximum(count(text, r"[.!?]+(\s|$)"), 1.0)
+    # Vowel groups, minus a silent final "e", at least one syllable per word
+    syllables = np.maximum(count(lowered, r"[aeiouy]+") - count(lowered, r"[^aeiouy\s]e\b"), words)
+    characters = count(text, r"[A-Za-z0-9]")
+    return words, sentences, syllables, characters
+
+
+def flesch_kincaid_grade_level(df: pd.DataFrame) -> np.ndarray:
+    words, sentences, syllables, _ = _text_stats(df)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grade = 0.39 * words / sentences + 11.8 * syllables / words - 15.59
+    return np.where(words > 0, grade, np.nan)
+
+
+def ari_grade_level(df: pd.DataFrame) -> np.ndarray:
+    words, sentences, _, characters = _text_stats(df)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grade = 4.71 * characters / words + 0.5 * words / sentences - 21.43
+    return np.where(words > 0, grade, np.nan)
+
+
+# metric_name -> implementation. MLflow metric names are kept where the native
+# version computes the same scores, so existing scorer definitions switch to
+# the native path transparently; approximations get names of their own.
+NATIVE_SCORERS: Dict[str, NativeScorer] = {
+    scorer.metric_name: scorer
+    for scorer in (
+        NativeScorer("exact_match", exact_match, needs_reference=True),
+        NativeScorer("normalized_match", normalized_match, needs_reference=True),
+        NativeScorer("token_f1", token_f1, needs_reference=True),
+        NativeScorer("rougeL", rouge_l, needs_reference=True),
+        NativeScorer("length_ratio", length_ratio, needs_reference=True),
+        NativeScorer("token_count", token_count, needs_reference=False),
+        NativeScorer("flesch_kincaid_grade_level_approx", flesch_kincaid_grade_level, needs_reference=False),
+        NativeScorer("ari_grade_level_approx", ari_grade_level, needs_reference=False),
+    )
+}
+
+
+def native_scorer(metric_name: Optional[str]) -> Optional[NativeScorer]:
+    return NATIVE_SCORERS.get(metric_name) if metric_name else None
+
+
+def is_native_scorer(hydrated) -> bool:
+    return isinstance(hydrated.scorer, NativeScorer)
+
+
+def native_scores(df: pd.DataFrame, scorer: NativeScorer, name: str) -> pd.DataFrame:
+    """
+    Scores all rows of `df` at once with a native metric.
+
+    Returns:
+        `<name>/score` and `<name>/justification` columns aligned with df's index.
+    """
+    scores = pd.DataFrame(index=df.index)
+    required = [PREDICTION_COLUMN, REFERENCE_COLUMN] if scorer.needs_reference else [PREDICTION_COLUMN]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        scores[f"{name}{SCORE_SUFFIX}"] = np.nan
+        scores[f"{name}{JUSTIFICATION_SUFFIX}"] = f"Error: dataset has no {', '.join(missing)} column"
+        return scores
+
+    scores[f"{name}{SCORE_SUFFIX}"] = scorer.fn(df)
+    scores[f"{name}{JUSTIFICATION_SUFFIX}"] = None
+    return scores
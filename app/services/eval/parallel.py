@@ -0,0 +1,80 @@
+"""
+Process-pool execution of CPU-bound scorers.
+
+BUILTIN scorers (readability, text statistics, ...) are pure CPU work, so a
+single process pegs one core. When a run asks for `cpu_workers > 1`, the rows
+its builtin scorers have to score are split into contiguous shards, each
+scored by all of them in a pool of worker processes, and merged back in the
+original row order.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import mlflow
+import numpy as np
+import pandas as pd
+
+from app.db.models import ScorerType
+from app.services.eval.mlflow_scorer import mlflow_scores
+from app.services.eval.scorer_factory import HydratedScorer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CPU_WORKERS = int(os.getenv("EVAL_CPU_WORKERS", "1"))
+# Below this many rows per shard, process start-up and pickling cost more than they save
+MIN_ROWS_PER_SHARD = int(os.getenv("EVAL_MIN_ROWS_PER_SHARD", "500"))
+
+# Pools are reused across chunks and runs, one per pool size
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        if workers not in _pools:
+            # forkserver: the eval worker is multi-threaded, forking it directly is unsafe
+            _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _pools[workers]
+
+
+def is_cpu_scorer(hydrated: HydratedScorer) -> bool:
+    return hydrated.scorer_type == ScorerType.BUILTIN and isinstance(hydrated.scorer, str)
+
+
+def _score_shard(shard: pd.DataFrame, scorers: Dict[str, str], parent_run_id: Optional[str]) -> pd.DataFrame:
+    # Runs in a pool process: log under the chunk's MLflow run as a child run
+    tags = {"mlflow.parentRunId": parent_run_id} if parent_run_id else None
+    with mlflow.start_run(run_name="builtin-shard", tags=tags):
+        return mlflow_scores(shard, scorers)
+
+
+def parallel_scores(df: pd.DataFrame, scorers: Dict[str, str], workers: int) -> pd.DataFrame:
+    """
+    Scores `df` with builtin scorers (output name -> metric) across up to
+    `workers` processes, one `mlflow.genai.evaluate` call per shard.
+
+    Returns:
+        `<name>/score` and `<name>/justification` columns of every scorer, aligned with df's index.
+    """
+    shards = max(1, min(workers, len(df) // MIN_ROWS_PER_SHARD))
+    if shards == 1:
+        return mlflow_scores(df, scorers)
+
+    active_run = mlflow.active_run()
+    parent_run_id = active_run.info.run_id if active_run else None
+
+    pool = _pool(workers)
+    futures = [
+        pool.submit(_score_shard, df.iloc[positions], scorers, parent_run_id)
+        for positions in np.array_split(np.arange(len(df)), shards)
+    ]
+    logger.info(f"Scoring {len(df)} rows with {', '.join(scorers)} across {shards} processes")
+    return pd.concat([future.result() for future in futures]).loc[df.index]
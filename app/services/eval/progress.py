@@ -0,0 +1,92 @@
+import os
+import time
+from datetime import datetime
+from typing import Dict, List
+from uuid import UUID
+
+from sqlmodel import Session, select
+
+from app.db.database import db
+from app.db.models import EvaluationRun
+
+# Minimum delay between two progress writes of the same shard
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("EVAL_PROGRESS_INTERVAL_SECONDS", "2"))
+
+
+class ProgressTracker:
+    """
+    Tracks rows scored, throughput, per-scorer progress and ETA of a run, and
+    writes them to `EvaluationRun.progress` at most every PROGRESS_INTERVAL_SECONDS.
+
+    Each shard publishes its own throughput and in-chunk progress under
+    `progress["shards"]`; the run-level figures are recomputed from all shards
+    plus the committed `rows_completed` counter on every write. Writes go
+    through their own session, so they never interfere with the executor's
+    transaction.
+    """
+
+    def __init__(self, run_id: UUID, shard_key: str, scorer_names: List[str]):
+        self.run_id = run_id
+        self.shard_key = shard_key
+        self.scorer_names = scorer_names
+        # Rows of the chunk in progress each scorer has finished
+        self._partial: Dict[str, int] = {name: 0 for name in scorer_names}
+        self._rows_scored = 0
+        self._started_at = time.monotonic()
+        self._last_write = 0.0
+
+    def scorer_done(self, name: str, rows: int) -> None:
+        """Records that a scorer finished `rows` more rows of the current chunk."""
+        self._partial[name] = self._partial.get(name, 0) + rows
+        self.flush()
+
+    def chunk_done(self) -> None:
+        """Records that the current chunk was committed."""
+        self._rows_scored += max(self._partial.values(), default=0)
+        self._partial = {name: 0 for name in self.scorer_names}
+        self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_write = now
+        elapsed = now - self._started_at
+
+        with Session(db.engine) as session:
+            run = session.exec(
+                select(EvaluationRun).where(EvaluationRun.id == self.run_id).with_for_update()
+            ).first()
+            if not run:
+                return
+
+            shards = dict((run.progress or {}).get("shards", {}))
+            shards[self.shard_key] = {
+                "rows_per_second": self._rows_scored / elapsed if elapsed > 0 else 0.0,
+                "partial": dict(self._partial),
+                "updated_at": datetime.utcnow().isoformat(),
+            }
+
+            rows_per_second = sum(shard["rows_per_second"] for shard in shards.values())
+            eta_seconds = None
+            if run.total_rows is not None and rows_per_second > 0:
+                eta_seconds = max(run.total_rows - run.rows_completed, 0) / rows_per_second
+
+            run.progress = {
+                "rows_scored": run.rows_completed,
+                "total_rows": run.total_rows,
+                "rows_per_second": rows_per_second,
+                "eta_seconds": eta_seconds,
+                "scorers": {
+                    name: {
+                        "rows_scored": run.rows_completed
+                        + sum(shard["partial"].get(name, 0) for shard in shards.values()),
+                        "total_rows": run.total_rows,
+                    }
+                    for name in self.scorer_names
+                },
+                "shards": shards,
+                "updated_at": datetime.utcnow().isoformat(),
+            }
+            session.add(run)
+            session.commit()
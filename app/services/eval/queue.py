@@ -0,0 +1,136 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlmodel import Session, select
+
+from app.db.models import EvaluationJob, EvaluationRun, RunStatus
+
+logger = logging.getLogger(__name__)
+
+# A claimed job whose heartbeat is older than this is considered abandoned
+JOB_TIMEOUT_SECONDS = int(os.getenv("EVAL_JOB_TIMEOUT_SECONDS", "300"))
+# Runs that keep crashing their worker are failed instead of requeued forever
+MAX_JOB_ATTEMPTS = int(os.getenv("EVAL_MAX_JOB_ATTEMPTS", "3"))
+
+
+def enqueue_run(session: Session, run_id: UUID, shard_count: Optional[int] = None) -> List[EvaluationJob]:
+    """
+    Adds a run to the eval queue, as one job per shard for sharded runs. The
+    caller owns the commit so jobs are created in the same transaction as the
+    run record.
+    """
+    if shard_count and shard_count > 1:
+        jobs = [EvaluationJob(run_id=run_id, shard_index=i) for i in range(shard_count)]
+    else:
+        jobs = [EvaluationJob(run_id=run_id)]
+    session.add_all(jobs)
+    return jobs
+
+
+def enqueue_batch(session: Session, batch_id: UUID, run_ids: List[UUID]) -> EvaluationJob:
+    """
+    Adds a batch to the eval queue as a single job: one worker executes all of
+    its runs in one pass over the dataset. The caller owns the commit.
+    """
+    job = EvaluationJob(run_id=run_ids[0], batch_id=batch_id)
+    session.add(job)
+    return job
+
+
+def claim_job(session: Session, worker_id: str) -> Optional[EvaluationJob]:
+    """
+    Claims the oldest unclaimed job for `worker_id`.
+
+    Uses SELECT ... FOR UPDATE SKIP LOCKED so concurrent workers never block on
+    (or double-claim) the same row.
+    """
+    query = (
+        select(EvaluationJob)
+        .where(EvaluationJob.worker_id.is_(None))
+        .order_by(EvaluationJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = session.exec(query).first()
+    if not job:
+        session.rollback()
+        return None
+
+    now = datetime.utcnow()
+    job.worker_id = worker_id
+    job.claimed_at = now
+    job.heartbeat_at = now
+    job.attempts += 1
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def heartbeat(session: Session, job_ids: List[UUID]) -> None:
+    """Marks the given jobs as still being worked on."""
+    if not job_ids:
+        return
+    now = datetime.utcnow()
+    jobs = session.exec(select(EvaluationJob).where(EvaluationJob.id.in_(job_ids))).all()
+    for job in jobs:
+        job.heartbeat_at = now
+        session.add(job)
+    session.commit()
+
+
+def complete_job(session: Session, job_id: UUID) -> None:
+    """Removes a finished job from the queue, whatever the run outcome was."""
+    job = session.get(EvaluationJob, job_id)
+    if job:
+        session.delete(job)
+        session.commit()
+
+
+def requeue_stale_jobs(session: Session, timeout_seconds: int = JOB_TIMEOUT_SECONDS) -> int:
+    """
+    Releases jobs whose worker stopped heartbeating (crash, OOM kill, deploy).
+
+    The job goes back to the queue and its run (or shard) resumes from the last
+    completed chunk, unless it already used up MAX_JOB_ATTEMPTS, in which case
+    the run is marked FAILED.
+
+    Returns:
+        The number of jobs released or failed.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout_seconds)
+    query = (
+        select(EvaluationJob)
+        .where(EvaluationJob.worker_id.is_not(None), EvaluationJob.heartbeat_at < cutoff)
+        .with_for_update(skip_locked=True)
+    )
+    stale_jobs = session.exec(query).all()
+
+    for job in stale_jobs:
+        if job.attempts >= MAX_JOB_ATTEMPTS:
+            logger.error(f"Run {job.run_id} abandoned {job.attempts} times, marking as failed")
+            if job.batch_id:
+                runs = session.exec(
+                    select(EvaluationRun)
+                    .where(EvaluationRun.batch_id == job.batch_id, EvaluationRun.status != RunStatus.COMPLETED)
+                ).all()
+            else:
+                runs = [run for run in [session.get(EvaluationRun, job.run_id)] if run]
+            for run in runs:
+                run.status = RunStatus.FAILED
+                run.error_message = f"Worker lost {job.attempts} times while processing this run"
+                session.add(run)
+            session.delete(job)
+            continue
+
+        logger.warning(f"Requeuing run {job.run_id} abandoned by worker {job.worker_id}")
+        job.worker_id = None
+        job.claimed_at = None
+        job.heartbeat_at = None
+        session.add(job)
+
+    session.commit()
+    return len(stale_jobs)
@@ -0,0 +1,184 @@
+"""
+Shared request/token budgets for judge model endpoints.
+
+Every worker process (and every run inside it) draws from the same pair of
+token buckets per judge model: one refilled at `rpm` requests per minute, one
+at `tpm` tokens per minute. Bucket state lives in a backend shared by all
+processes:
+
+- `postgres`: a `judge_rate_buckets` row per model, updated under
+  SELECT ... FOR UPDATE. Shared by every worker on every host.
+- `local`: a small state file on tmpfs guarded by an flock. Shared by the
+  worker processes of one host.
+
+Budgets are configured per judge model with EVAL_JUDGE_RATE_LIMITS, e.g.
+`{"openai:/gpt-4": {"rpm": 500, "tpm": 80000}}`.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.db.database import db
+from app.db.models import JudgeRateBucket
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("EVAL_RATE_LIMIT_BACKEND", "postgres")  # 'postgres', 'local' or 'none'
+LOCAL_STATE_PATH = os.getenv(
+    "EVAL_RATE_LIMIT_STATE_PATH",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "dead-simpl-rate-limits.json"),
+)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+
+
+def _load_limits() -> Dict[str, RateLimit]:
+    raw = json.loads(os.getenv("EVAL_JUDGE_RATE_LIMITS", "{}"))
+    return {model: RateLimit(rpm=cfg.get("rpm"), tpm=cfg.get("tpm")) for model, cfg in raw.items()}
+
+
+RATE_LIMITS = _load_limits()
+
+
+def rate_limit_for(judge_model: str) -> Optional[RateLimit]:
+    if RATE_LIMIT_BACKEND == "none":
+        return None
+    return RATE_LIMITS.get(judge_model)
+
+
+def _refill(level: float, capacity: Optional[float], elapsed: float) -> float:
+    if capacity is None:
+        return 0.0
+    return min(capacity, level + elapsed * capacity / 60.0)
+
+
+def _take(
+    limit: RateLimit,
+    requests_level: float,
+    tokens_level: float,
+    tokens: int,
+) -> Tuple[float, float, float]:
+    """
+    Tries to take one request and `tokens` tokens from refilled buckets.
+
+    Returns:
+        (new request level, new token level, seconds to wait; 0 when granted).
+    """
+    wait = 0.0
+    if limit.rpm is not None and requests_level < 1:
+        wait = max(wait, (1 - requests_level) * 60.0 / limit.rpm)
+    # A single call larger than the whole budget is let through once the bucket is full
+    needed = min(tokens, limit.tpm) if limit.tpm is not None else 0
+    if limit.tpm is not None and tokens_level < needed:
+        wait = max(wait, (needed - tokens_level) * 60.0 / limit.tpm)
+    if wait:
+        return requests_level, tokens_level, wait
+    if limit.rpm is not None:
+        requests_level -= 1
+    if limit.tpm is not None:
+        tokens_level -= tokens
+    return requests_level, tokens_level, 0.0
+
+
+class PostgresBucketStore:
+    def try_acquire(self, judge_model: str, limit: RateLimit, tokens: int) -> float:
+        with Session(db.engine) as session:
+            now = datetime.utcnow()
+            session.execute(
+                insert(JudgeRateBucket)
+                .values(
+                    judge_model=judge_model,
+                    requests_level=limit.rpm or 0.0,
+                    tokens_level=limit.tpm or 0.0,
+                    updated_at=now,
+                )
+                .on_conflict_do_nothing(index_elements=[JudgeRateBucket.judge_model])
+            )
+            bucket = session.exec(
+                select(JudgeRateBucket).where(JudgeRateBucket.judge_model == judge_model).with_for_update()
+            ).one()
+            elapsed = max(0.0, (now - bucket.updated_at).total_seconds())
+            requests_level, tokens_level, wait = _take(
+                limit,
+                _refill(bucket.requests_level, limit.rpm, elapsed),
+                _refill(bucket.tokens_level, limit.tpm, elapsed),
+                tokens,
+            )
+            bucket.requests_level, bucket.tokens_level, bucket.updated_at = requests_level, tokens_level, now
+            session.add(bucket)
+            session.commit()
+            return wait
+
+    def adjust_tokens(self, judge_model: str, delta: int) -> None:
+        with Session(db.engine) as session:
+            bucket = session.exec(
+                select(JudgeRateBucket).where(JudgeRateBucket.judge_model == judge_model).with_for_update()
+            ).first()
+            if bucket:
+                bucket.tokens_level -= delta
+                session.add(bucket)
+                session.commit()
+
+
+class LocalBucketStore:
+    def _update(self, judge_model: str, fn):
+        with open(LOCAL_STATE_PATH, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                state = json.loads(content) if content else {}
+                result = fn(state)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def try_acquire(self, judge_model: str, limit: RateLimit, tokens: int) -> float:
+        def fn(state):
+            now = time.time()
+            bucket = state.get(judge_model) or [limit.rpm or 0.0, limit.tpm or 0.0, now]
+            elapsed = max(0.0, now - bucket[2])
+            requests_level, tokens_level, wait = _take(
+                limit,
+                _refill(bucket[0], limit.rpm, elapsed),
+                _refill(bucket[1], limit.tpm, elapsed),
+                tokens,
+            )
+            state[judge_model] = [requests_level, tokens_level, now]
+            return wait
+
+        return self._update(judge_model, fn)
+
+    def adjust_tokens(self, judge_model: str, delta: int) -> None:
+        def fn(state):
+            if judge_model in state:
+                state[judge_model][1] -= delta
+
+        self._update(judge_model, fn)
+
+
+def bucket_store():
+    return LocalBucketStore() if RATE_LIMIT_BACKEND == "local" else PostgresBucketStore()
+
+
+def estimate_tokens(text: str, max_output_tokens: int = 256) -> int:
+    """Rough prompt + completion token estimate (~4 characters per token)."""
+    return len(text) // 4 + max_output_tokens
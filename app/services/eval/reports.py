@@ -0,0 +1,386 @@
+"""
+Paged reads of a run's row-level results.
+
+A report is the run's results directory (one Parquet file per chunk, see
+results.py) or, for runs from before chunking, a single JSON/Parquet file.
+Parquet files are memory-mapped and only their footers are read up front:
+a page read decodes just the row groups that cover it. Opened reports are
+kept in a small LRU, so paging through a report does not re-open its files.
+
+Pages are addressed either by offset (`page`/`page_size`) or by keyset: the
+`row_index` of the last row already seen. Row indexes only grow along the
+report, so the row group holding the next row is found by bisecting the
+row groups' max `row_index` statistics, whatever the depth of the page.
+
+Queries filter on score columns and search inputs/outputs with Arrow compute
+kernels over just the columns involved. Sorting uses a per-run sort index
+(each scorer's row positions in score order) written when the run
+completes, so an unfiltered "worst N rows by <scorer>" query only reads the
+N rows it returns.
+"""
+
+import json
+import operator
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.services.eval.results import ROW_INDEX_COLUMN, SCORE_SUFFIX
+
+# Open reports kept per process
+REPORT_CACHE_SIZE = int(os.getenv("EVAL_REPORT_CACHE_SIZE", "16"))
+
+# Per-run sort index, next to the chunk files
+SORT_INDEX_PATH = os.path.join("indexes", "sort.parquet")
+
+# Columns searched by a query's `search` text
+SEARCH_COLUMNS = ("inputs", "outputs")
+
+# `<scorer><op><value>`, e.g. "faithfulness<3" or "faithfulness=null"
+_FILTER_PATTERN = re.compile(r"^(?P<scorer>.+?)(?P<op>>=|<=|!=|==|=|>|<)(?P<value>[^<>=!]+)$")
+_FILTER_OPS = {
+    ">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt,
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne,
+}
+
+
+@dataclass
+class _RowGroup:
+    file: Optional[pq.ParquetFile]
+    index: int
+    rows: int
+    # Last row_index of the group
+    max_row_index: int
+    # In-memory table for reports that are not Parquet
+    table: Optional[pa.Table] = None
+
+    def read(self, columns: Optional[List[str]] = None) -> pa.Table:
+        if self.table is not None:
+            return self.table.select(columns) if columns else self.table
+        return self.file.read_row_group(self.index, columns=columns)
+
+
+def _parquet_files(path: str) -> List[str]:
+    if not os.path.isdir(path):
+        return [path]
+    # Hidden files are chunks still being written
+    names = sorted(n for n in os.listdir(path) if n.startswith("chunk-") and n.endswith(".parquet"))
+    return [os.path.join(path, n) for n in names]
+
+
+def _max_row_index(file: pq.ParquetFile, index: int, column: int) -> int:
+    statistics = file.metadata.row_group(index).column(column).statistics
+    if statistics is not None and statistics.has_min_max:
+        return int(statistics.max)
+    # No statistics: read the one column of that group
+    values = file.read_row_group(index, columns=[ROW_INDEX_COLUMN]).column(0)
+    return int(pc.max(values).as_py()) if len(values) else -1
+
+
+class Report:
+    """Row groups of one report, in row order."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.row_groups: List[_RowGroup] = []
+        if path.endswith(".json"):
+            df = pd.read_json(path)
+            if ROW_INDEX_COLUMN not in df.columns:
+                df.insert(0, ROW_INDEX_COLUMN, range(len(df)))
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self.row_groups.append(_RowGroup(None, 0, len(df), len(df) - 1, table=table))
+        else:
+            for file_path in _parquet_files(path):
+                file = pq.ParquetFile(file_path, memory_map=True)
+                names = file.schema_arrow.names
+                if ROW_INDEX_COLUMN not in names:
+                    raise ValueError(f"{file_path} has no {ROW_INDEX_COLUMN} column")
+                column = names.index(ROW_INDEX_COLUMN)
+                for index in range(file.num_row_groups):
+                    rows = file.metadata.row_group(index).num_rows
+                    self.row_groups.append(_RowGroup(file, index, rows, _max_row_index(file, index, column)))
+        rows = np.array([g.rows for g in self.row_groups], dtype=np.int64)
+        # First position of each row group, plus the total at the end
+        self._starts = np.concatenate(([0], np.cumsum(rows)))
+        # Empty groups carry -1 and would break the bisection's ordering
+        self._max_row_indexes = np.maximum.accumulate(
+            np.array([g.max_row_index for g in self.row_groups] or [-1], dtype=np.int64)
+        )[: len(self.row_groups)]
+        self._columns: Dict[str, np.ndarray] = {}
+        self._sort_index: Optional[Dict[str, Tuple[np.ndarray, int]]] = None
+
+    @property
+    def column_names(self) -> List[str]:
+        return self._empty().schema.names
+
+    @property
+    def total(self) -> int:
+        return int(self._starts[-1])
+
+    def _read(self, group: int, skip: int, limit: int) -> pa.Table:
+        """Reads `limit` rows from row group `group` on, skipping the first `skip` of it."""
+        tables, needed = [], skip + limit
+        while group < len(self.row_groups) and needed > 0:
+            table = self.row_groups[group].read()
+            tables.append(table)
+            needed -= table.num_rows
+            group += 1
+        if not tables:
+            return self._empty()
+        return pa.concat_tables(tables, promote_options="default").slice(skip, limit)
+
+    def _empty(self) -> pa.Table:
+        if not self.row_groups:
+            return pa.table({ROW_INDEX_COLUMN: pa.array([], type=pa.int64())})
+        group = self.row_groups[0]
+        schema = group.table.schema if group.table is not None else group.file.schema_arrow
+        return schema.empty_table()
+
+    def read_page(self, offset: int, limit: int) -> pa.Table:
+        """Rows [offset, offset + limit) of the report."""
+        if offset >= self.total:
+            return self._empty()
+        group = int(np.searchsorted(self._starts, offset, side="right")) - 1
+        return self._read(group, offset - int(self._starts[group]), limit)
+
+    def take(self, positions: np.ndarray) -> pa.Table:
+        """Rows at `positions`, in that order, reading only the row groups they fall in."""
+        positions = np.asarray(positions, dtype=np.int64)
+        if not len(positions):
+            return self._empty()
+        groups = np.searchsorted(self._starts, positions, side="right") - 1
+        parts = [
+            self.row_groups[g].read().take(pa.array(positions[groups == g] - self._starts[g]))
+            for g in np.unique(groups)
+        ]
+        table = pa.concat_tables(parts, promote_options="default")
+        # Parts come in row group order: put rows back in the requested order
+        return table.take(pa.array(np.argsort(np.argsort(groups, kind="stable"), kind="stable")))
+
+    def scan(self, column: str) -> pa.ChunkedArray:
+        """One column over the whole report."""
+        if column not in self.column_names:
+            raise ValueError(f"Unknown column: {column}")
+        arrays = [a for g in self.row_groups for a in g.read([column]).column(0).chunks]
+        # Chunks where every value is missing are typed null
+        target = next((a.type for a in arrays if not pa.types.is_null(a.type)), pa.null())
+        return pa.chunked_array([a.cast(target) for a in arrays], type=target)
+
+    def scores(self, column: str) -> np.ndarray:
+        """A score column as floats (NaN for errored rows), kept in memory once read."""
+        if column not in self._columns:
+            values = self.scan(column)
+            self._columns[column] = pc.cast(values, pa.float64()).to_numpy(zero_copy_only=False)
+        return self._columns[column]
+
+    def sort_order(self, column: str, descending: bool = False) -> np.ndarray:
+        """Row positions ordered by a score column, errored rows last."""
+        if self._sort_index is None:
+            self._sort_index = _read_sort_index(self.path)
+        if column not in self._sort_index:
+            self._sort_index[column] = _sort_positions(self.scores(column))
+        positions, valid = self._sort_index[column]
+        if descending:
+            return np.concatenate((positions[:valid][::-1], positions[valid:]))
+        return positions
+
+    @property
+    def schema(self) -> pa.Schema:
+        """Schema of the whole report: chunks where a column is all missing type it null."""
+        schemas = [g.table.schema if g.table is not None else g.file.schema_arrow for g in self.row_groups]
+        if not schemas:
+            return self._empty().schema
+        return pa.unify_schemas(schemas, promote_options="permissive")
+
+    def project(self, columns: Optional[List[str]] = None) -> pa.Schema:
+        """The report's schema, restricted to `columns` (all columns when empty)."""
+        schema = self.schema
+        if not columns:
+            return schema
+        unknown = [c for c in columns if c not in schema.names]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        return pa.schema([schema.field(c) for c in columns])
+
+    def iter_batches(self, schema: pa.Schema) -> Iterator[pa.RecordBatch]:
+        """Record batches of the whole report, one row group at a time, cast to `schema`."""
+        for group in self.row_groups:
+            table = group.read(schema.names)
+            for batch in table.cast(schema).to_batches():
+                yield batch
+
+    def read_after(self, row_index: Optional[int], limit: int) -> pa.Table:
+        """The first `limit` rows whose row_index is greater than `row_index`."""
+        if row_index is None:
+            return self.read_page(0, limit)
+        group = int(np.searchsorted(self._max_row_indexes, row_index, side="right"))
+        if group >= len(self.row_groups):
+            return self._empty()
+        row_indexes = self.row_groups[group].read([ROW_INDEX_COLUMN]).column(0).to_numpy()
+        skip = int(np.searchsorted(row_indexes, row_index, side="right"))
+        return self._read(group, skip, limit)
+
+
+def _sort_positions(values: np.ndarray) -> Tuple[np.ndarray, int]:
+    # NaN sorts last
+    return np.argsort(values, kind="stable"), int((~np.isnan(values)).sum())
+
+
+def _read_sort_index(path: str) -> Dict[str, Tuple[np.ndarray, int]]:
+    index_path = os.path.join(path, SORT_INDEX_PATH)
+    if not os.path.isdir(path) or not os.path.exists(index_path):
+        return {}
+    table = pq.read_table(index_path, memory_map=True)
+    valid = json.loads(table.schema.metadata[b"valid"])
+    return {
+        column: (table.column(column).to_numpy(), valid[column])
+        for column in table.column_names
+    }
+
+
+def write_sort_index(report: Report) -> None:
+    """Writes the sort index of a completed run's results directory."""
+    positions, valid = {}, {}
+    for column in (c for c in report.column_names if c.endswith(SCORE_SUFFIX)):
+        positions[column], valid[column] = _sort_positions(report.scores(column))
+    table = pa.table(positions).replace_schema_metadata({"valid": json.dumps(valid)})
+    index_path = os.path.join(report.path, SORT_INDEX_PATH)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    pq.write_table(table, index_path)
+
+
+def _parse_filter(expression: str, report: Report) -> np.ndarray:
+    match = _FILTER_PATTERN.match(expression.strip())
+    if not match:
+        raise ValueError(f"Invalid filter: {expression}")
+    column = match["scorer"].strip()
+    if not column.endswith(SCORE_SUFFIX):
+        column += SCORE_SUFFIX
+    values = report.scores(column)
+    op, value = match["op"], match["value"].strip()
+
+    if value.lower() in ("null", "error"):
+        if op not in ("=", "==", "!="):
+            raise ValueError(f"Invalid filter: {expression}")
+        return np.isnan(values) if op != "!=" else ~np.isnan(values)
+    try:
+        threshold = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid filter value: {expression}")
+    with np.errstate(invalid="ignore"):
+        return _FILTER_OPS[op](values, threshold)
+
+
+def _search(report: Report, text: str) -> np.ndarray:
+    mask = np.zeros(report.total, dtype=bool)
+    for column in SEARCH_COLUMNS:
+        if column not in report.column_names:
+            continue
+        values = report.scan(column)
+        if not pa.types.is_string(values.type) and not pa.types.is_large_string(values.type):
+            values = pc.cast(values, pa.string())
+        found = pc.match_substring(values, text, ignore_case=True)
+        mask |= pc.fill_null(found, False).to_numpy(zero_copy_only=False)
+    return mask
+
+
+def query(
+    report: Report,
+    filters: Optional[List[str]] = None,
+    sort: Optional[str] = None,
+    search: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 50,
+    cursor: Optional[int] = None,
+) -> Tuple[pa.Table, int]:
+    """
+    Filters, searches and sorts a report, then reads one page of it.
+
+    Args:
+        filters: `<scorer><op><value>` expressions (op: < <= > >= = !=), all of
+            which must hold. `<scorer>=null` selects errored rows.
+        sort: scorer to sort by, `-<scorer>` for descending. Errored rows come last.
+        search: case-insensitive substring of the inputs or outputs.
+        cursor: keyset cursor (last row_index seen); only for unsorted queries.
+
+    Returns:
+        The page and the number of matching rows.
+    """
+    if not filters and not search and not sort:
+        table = report.read_after(cursor, limit) if cursor is not None else report.read_page(offset, limit)
+        return table, report.total
+
+    mask = None
+    for expression in filters or []:
+        matched = _parse_filter(expression, report)
+        mask = matched if mask is None else mask & matched
+    if search:
+        matched = _search(report, search)
+        mask = matched if mask is None else mask & matched
+
+    if sort:
+        column = sort.lstrip("-")
+        if not column.endswith(SCORE_SUFFIX):
+            column += SCORE_SUFFIX
+        if column not in report.column_names:
+            raise ValueError(f"Unknown sort column: {sort}")
+        if cursor is not None:
+            raise ValueError("Cursors are not supported on sorted queries, use page")
+        positions = report.sort_order(column, descending=sort.startswith("-"))
+        if mask is not None:
+            positions = positions[mask[positions]]
+    else:
+        positions = np.flatnonzero(mask)
+        if cursor is not None:
+            # Positions are in row order, and so are row indexes
+            row_indexes = report.scan(ROW_INDEX_COLUMN).to_numpy()[positions]
+            positions = positions[np.searchsorted(row_indexes, cursor, side="right"):]
+            return report.take(positions[:limit]), int(mask.sum())
+
+    return report.take(positions[offset:offset + limit]), len(positions)
+
+
+_reports: "OrderedDict[str, Report]" = OrderedDict()
+_reports_lock = threading.Lock()
+
+
+def open_report(path: str) -> Report:
+    """Opens a report through the LRU of open reports."""
+    with _reports_lock:
+        if path in _reports:
+            _reports.move_to_end(path)
+            return _reports[path]
+
+    report = Report(path)
+    with _reports_lock:
+        _reports[path] = report
+        _reports.move_to_end(path)
+        while len(_reports) > REPORT_CACHE_SIZE:
+            _reports.popitem(last=False)
+    return report
+
+
+def evict_report(path: str) -> None:
+    with _reports_lock:
+        _reports.pop(path, None)
+
+
+def page_rows(table: pa.Table, limit: int) -> Tuple[List[dict], Optional[int]]:
+    """
+    Rows of a page as dicts.
+
+    Returns:
+        The rows and the keyset cursor of the next page (None on the last page).
+    """
+    items = table.to_pylist()
+    next_cursor = items[-1][ROW_INDEX_COLUMN] if len(items) == limit else None
+    return items, next_cursor
@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import List
+from uuid import UUID
+
+import pandas as pd
+
+# Row-level results live under this directory, one sub-directory per run.
+# In production, point this at a managed volume.
+RESULTS_DIR = os.getenv("EVAL_RESULTS_DIR", os.path.join(tempfile.gettempdir(), "dead-simpl-results"))
+# Chunk files are compressed and split into row groups, so readers can fetch
+# a column range without decoding whole chunks
+RESULTS_COMPRESSION = os.getenv("EVAL_RESULTS_COMPRESSION", "zstd")
+RESULTS_ROW_GROUP_SIZE = int(os.getenv("EVAL_RESULTS_ROW_GROUP_SIZE", "2048"))
+
+# Position of the row in the source dataset, kept on every result row
+ROW_INDEX_COLUMN = "row_index"
+
+SCORE_SUFFIX = "/score"
+JUSTIFICATION_SUFFIX = "/justification"
+
+# mlflow.genai names these `<scorer>/value` and `<scorer>/rationale`
+_SUFFIX_ALIASES = {"/value": SCORE_SUFFIX, "/rationale": JUSTIFICATION_SUFFIX}
+
+
+def run_results_dir(run_id: UUID) -> str:
+    return os.path.join(RESULTS_DIR, str(run_id))
+
+
+def chunk_path(run_id: UUID, chunk_index: int) -> str:
+    return os.path.join(run_results_dir(run_id), f"chunk-{chunk_index:06d}.parquet")
+
+
+def normalize_result_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Renames scorer output columns to `<scorer>/score` and `<scorer>/justification`."""
+    renames = {}
+    for column in df.columns:
+        for alias, suffix in _SUFFIX_ALIASES.items():
+            if isinstance(column, str) and column.endswith(alias):
+                renames[column] = column[: -len(alias)] + suffix
+    return df.rename(columns=renames)
+
+
+def score_columns(df: pd.DataFrame) -> List[str]:
+    return [c for c in df.columns if isinstance(c, str) and c.endswith(SCORE_SUFFIX)]
+
+
+def scorer_name(score_column: str) -> str:
+    return score_column[: -len(SCORE_SUFFIX)]
+
+
+def _to_parquet_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """Serializes nested values (dicts/lists from scorer outputs) to JSON strings."""
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype == object:
+            if df[column].map(lambda v: isinstance(v, (dict, list))).any():
+                df[column] = df[column].map(
+                    lambda v: json.dumps(v, default=str) if isinstance(v, (dict, list)) else v
+                )
+    for column in score_columns(df):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df
+
+
+def write_chunk(df: pd.DataFrame, path: str) -> None:
+    """
+    Writes a chunk of row-level results.
+
+    The file is written next to its final location and renamed into place, so
+    a crash never leaves a half-written chunk behind.
+    """
+    directory, name = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+    # Hidden while in flight so readers of the results directory skip it
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    _to_parquet_safe(df).to_parquet(
+        tmp_path,
+        index=False,
+        compression=RESULTS_COMPRESSION,
+        row_group_size=RESULTS_ROW_GROUP_SIZE,
+    )
+    os.replace(tmp_path, path)
+
+
+def remove_run_results(run_id: UUID) -> None:
+    shutil.rmtree(run_results_dir(run_id), ignore_errors=True)
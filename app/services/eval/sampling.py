@@ -0,0 +1,279 @@
+"""
+Sampled and sequential runs.
+
+A run's `sampling` settings can ask for:
+
+- `sample_size`: score a random sample of the dataset instead of all of it,
+  stratified on the `stratify_by` column when given (each stratum keeps its
+  share of the dataset, and at least one row).
+- `sequential`: score rows in random order and stop as soon as the
+  confidence interval of every scorer's mean is at most `ci_width` wide, or
+  once every scorer's mean is decided to be above or below its mean in
+  `baseline_run_id`.
+
+Both are served by a sample file written when the run starts: the selected
+rows in scoring order, with their position in the dataset in
+`dataset_row`. The executor streams it like any dataset, and a sequential
+run checks its stopping rule from the merged chunk aggregates after every
+chunk, so it stops on a chunk boundary.
+"""
+
+import math
+import os
+from functools import partial
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from uuid import uuid4
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from app.services.eval.datasets import (
+    CSV_BLOCK_BYTES,
+    DATASET_COMPRESSION,
+    DATASET_ROW_GROUP_SIZE,
+    is_parquet_dataset,
+)
+from app.services.eval.results import run_results_dir
+
+# Position of a sampled row in the source dataset
+DATASET_ROW_COLUMN = "dataset_row"
+DEFAULT_CONFIDENCE = 0.95
+# Rows a sequential run scores before it may stop, so intervals rest on enough rows
+DEFAULT_MIN_ROWS = int(os.getenv("EVAL_SEQUENTIAL_MIN_ROWS", "200"))
+
+
+def sample_path(run_id) -> str:
+    return os.path.join(run_results_dir(run_id), "sample.parquet")
+
+
+def _stratified(strata: pa.ChunkedArray, sample_size: int, rng: np.random.Generator) -> np.ndarray:
+    """Proportional allocation per stratum (largest remainders), at least one row each."""
+    codes = pc.dictionary_encode(pc.cast(strata, pa.string()).fill_null("")).combine_chunks().indices
+    codes = codes.to_numpy(zero_copy_only=False)
+    counts = np.bincount(codes)
+    quotas = sample_size * counts / counts.sum()
+    allocation = np.minimum(np.maximum(np.floor(quotas).astype(int), 1), counts)
+    remainder = sample_size - allocation.sum()
+    for stratum in np.argsort(quotas - np.floor(quotas))[::-1]:
+        if remainder <= 0:
+            break
+        if allocation[stratum] < counts[stratum]:
+            allocation[stratum] += 1
+            remainder -= 1
+
+    order = np.argsort(codes, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    return np.concatenate([
+        rng.choice(order[starts[s]:starts[s + 1]], size=allocation[s], replace=False)
+        for s in range(len(counts))
+    ])
+
+
+def _row_count(dataset_path: str) -> int:
+    if is_parquet_dataset(dataset_path):
+        return pq.ParquetFile(dataset_path).metadata.num_rows
+    return len(_read_column(dataset_path, pacsv.open_csv(dataset_path).schema.names[0]))
+
+
+def _read_column(dataset_path: str, column: str) -> pa.ChunkedArray:
+    """Reads a single column of the dataset."""
+    if is_parquet_dataset(dataset_path):
+        names = pq.read_schema(dataset_path).names
+    else:
+        names = pacsv.open_csv(dataset_path).schema.names
+    if column not in names:
+        raise ValueError(f"Dataset has no {column} column to stratify by")
+    if is_parquet_dataset(dataset_path):
+        return pq.read_table(dataset_path, columns=[column]).column(column)
+    return pacsv.read_csv(dataset_path, convert_options=pacsv.ConvertOptions(include_columns=[column])).column(column)
+
+
+def _blocks(dataset_path: str) -> Iterator[Tuple[int, int, Callable[[], pa.Table]]]:
+    """The dataset's row groups (CSV: read blocks) as (first row, row count, loader)."""
+    if is_parquet_dataset(dataset_path):
+        parquet = pq.ParquetFile(dataset_path, memory_map=True)
+        start = 0
+        for i in range(parquet.num_row_groups):
+            rows = parquet.metadata.row_group(i).num_rows
+            yield start, rows, partial(parquet.read_row_group, i)
+            start += rows
+        return
+    start = 0
+    for batch in pacsv.open_csv(dataset_path, read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_BYTES)):
+        yield start, batch.num_rows, partial(pa.Table.from_batches, [batch])
+        start += batch.num_rows
+
+
+def _selected_batches(dataset_path: str, selected: np.ndarray) -> Iterator[pa.RecordBatch]:
+    """
+    The selected rows (sorted dataset positions) in dataset order, with their
+    position in DATASET_ROW_COLUMN. Parquet row groups without a selected row
+    are never read.
+    """
+    for start, rows, load in _blocks(dataset_path):
+        low, high = np.searchsorted(selected, [start, start + rows])
+        if low == high:
+            continue
+        positions = selected[low:high]
+        table = load().take(pa.array(positions - start))
+        yield from table.append_column(DATASET_ROW_COLUMN, pa.array(positions, pa.int64())).to_batches()
+
+
+def _write_parquet(batches: Iterable[pa.RecordBatch], path: str) -> None:
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema, compression=DATASET_COMPRESSION)
+            writer.write_batch(batch, row_group_size=DATASET_ROW_GROUP_SIZE)
+        if writer is None:
+            raise ValueError("Dataset has no rows to sample")
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _shuffled(batches: Iterable[pa.RecordBatch], tmp_path: str, rng: np.random.Generator) -> Iterator[pa.RecordBatch]:
+    """
+    Shuffles rows through an uncompressed Arrow file: memory-mapped, only the
+    pages of the rows being taken are resident.
+    """
+    writer = None
+    with pa.OSFile(tmp_path, "wb") as sink:
+        for batch in batches:
+            if writer is None:
+                writer = pa.ipc.new_file(sink, batch.schema)
+            writer.write_batch(batch)
+        if writer is not None:
+            writer.close()
+    try:
+        table = pa.ipc.open_file(pa.memory_map(tmp_path)).read_all()
+        order = rng.permutation(table.num_rows)
+        for i in range(0, len(order), DATASET_ROW_GROUP_SIZE):
+            yield from table.take(pa.array(order[i:i + DATASET_ROW_GROUP_SIZE])).to_batches()
+    finally:
+        os.remove(tmp_path)
+
+
+def build_sample(run_id, dataset_path: str, sampling: Dict[str, Any]) -> int:
+    """
+    Writes the run's sample file, unless a previous attempt already did.
+
+    Only the stratification column is read to choose the rows, then the
+    dataset is streamed block by block, so memory stays bounded by a block
+    whatever the dataset size.
+
+    Returns:
+        The number of rows in the sample.
+    """
+    path = sample_path(run_id)
+    if os.path.exists(path):
+        return pq.ParquetFile(path).metadata.num_rows
+
+    rng = np.random.default_rng(sampling.get("seed"))
+    stratify_by = sampling.get("stratify_by")
+    strata = _read_column(dataset_path, stratify_by) if stratify_by else None
+    rows = len(strata) if strata is not None else _row_count(dataset_path)
+
+    sample_size = sampling.get("sample_size")
+    if sample_size and sample_size < rows:
+        if strata is not None:
+            selected = _stratified(strata, sample_size, rng)
+        else:
+            selected = rng.choice(rows, size=sample_size, replace=False)
+    else:
+        selected = np.arange(rows)
+    # Dataset order keeps reads local and reports in dataset order
+    selected = np.sort(selected)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid4().hex}.tmp"
+    batches = _selected_batches(dataset_path, selected)
+    if sampling.get("sequential"):
+        batches = _shuffled(batches, f"{tmp_path}.arrow", rng)
+    try:
+        _write_parquet(batches, tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return len(selected)
+
+
+def mean_interval(state: Dict[str, Any], confidence: float) -> Optional[Tuple[float, float]]:
+    """Normal-approximation confidence interval of a scorer's mean, from its aggregation state."""
+    count = state["count"]
+    if count < 2:
+        return None
+    mean = state["sum"] / count
+    # Sample variance from the running sums
+    variance = max(state["sum_sq"] - count * mean ** 2, 0.0) / (count - 1)
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * math.sqrt(variance / count)
+    return mean - half_width, mean + half_width
+
+
+def sequential_stop(
+    states: Dict[str, Dict[str, Any]],
+    sampling: Dict[str, Any],
+    baseline: Optional[Dict[str, Any]],
+) -> Optional[str]:
+    """
+    Checks a sequential run's stopping rule against the merged states so far.
+
+    Returns:
+        Why the run can stop ('ci_width' or 'baseline'), or None to go on.
+    """
+    if not states or min(s["count"] for s in states.values()) < sampling.get("min_rows", DEFAULT_MIN_ROWS):
+        return None
+    confidence = sampling.get("confidence", DEFAULT_CONFIDENCE)
+    intervals = {name: mean_interval(state, confidence) for name, state in states.items()}
+    if any(interval is None for interval in intervals.values()):
+        return None
+
+    ci_width = sampling.get("ci_width")
+    if ci_width and all(high - low <= ci_width for low, high in intervals.values()):
+        return "ci_width"
+
+    if baseline:
+        baseline_means = {name: baseline.get(f"{name}/mean") for name in intervals}
+        if all(
+            mean is not None and not (low <= mean <= high)
+            for (low, high), mean in zip(intervals.values(), baseline_means.values())
+        ):
+            return "baseline"
+    return None
+
+
+def sampling_summary(
+    states: Dict[str, Dict[str, Any]],
+    sampling: Dict[str, Any],
+    baseline: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Interval metrics added to a sampled or sequential run's summary."""
+    confidence = sampling.get("confidence", DEFAULT_CONFIDENCE)
+    summary: Dict[str, Any] = {
+        "rows_scored": max((s["count"] + s.get("errors", 0) for s in states.values()), default=0),
+        "confidence": confidence,
+        "stopped_early": sampling.get("stop_reason") is not None,
+    }
+    if sampling.get("stop_reason"):
+        summary["stop_reason"] = sampling["stop_reason"]
+    for name, state in states.items():
+        interval = mean_interval(state, confidence)
+        if interval is None:
+            continue
+        low, high = interval
+        summary[f"{name}/ci_low"] = low
+        summary[f"{name}/ci_high"] = high
+        summary[f"{name}/ci_width"] = high - low
+        baseline_mean = (baseline or {}).get(f"{name}/mean")
+        if baseline_mean is not None:
+            summary[f"{name}/baseline_mean"] = baseline_mean
+            # 1: above the baseline, -1: below, 0: not decided at this confidence
+            summary[f"{name}/vs_baseline"] = 1 if low > baseline_mean else -1 if high < baseline_mean else 0
+    return summary
@@ -1,9 +1,27 @@
 import importlib
-from typing import Any, Dict, List
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
 
 from mlflow.metrics.genai import EvaluationExample, make_genai_metric
 
 from app.db.models import ScorerDefinition, ScorerType
+from app.services.eval.code_scorer import build_code_scorer
+from app.services.eval.native_scorers import native_scorer
+
+
+def scorer_output_name(scorer_def: ScorerDefinition) -> str:
+    """
+    Name under which a scorer's results appear in the row table
+    (`<name>/score`, `<name>/justification`) and in summary metrics.
+    """
+    if scorer_def.scorer_type == ScorerType.BUILTIN:
+        return scorer_def.configuration.get("metric_name") or scorer_def.name
+    return scorer_def.name
 
 
 def scorer_factory(scorer_def: ScorerDefinition) -> Any:
@@ -22,6 +40,10 @@ def scorer_factory(scorer_def: ScorerDefinition) -> Any:
         # Example: Load 'mlflow.metrics.genai.toxicity'
         # Config should look like: { "metric_name": "toxicity" }
         metric_name = config.get("metric_name")
+        # Simple metrics have a vectorized implementation, no MLflow round trip
+        native = native_scorer(metric_name)
+        if native:
+            return native
         # For builtins, mlflow.genai.evaluate might expect the string name or the metric object.
         # Previous attempts with object failed. Trying string name if it's a standard metric.
         # But wait, custom metrics need objects.
@@ -52,10 +74,65 @@ def scorer_factory(scorer_def: ScorerDefinition) -> Any:
         )
         
     elif scorer_def.scorer_type == ScorerType.CODE:
-        # Load custom python logic
-        # For MVP, we might skip complex dynamic loading or implement a simple registry
-        # Security Warning: Ensure strict sandboxing if allowing raw code
-        raise NotImplementedError("Code-based scorers are not yet implemented")
+        # Config: { "code": "def score(batch): ...", "function": "score" }
+        # Executed in sandboxed worker processes, see app.services.eval.code_scorer
+        return build_code_scorer(config)
         
     else:
         raise ValueError(f"Unknown scorer type: {scorer_def.scorer_type}")
+
+
+
+# Hydrated scorers kept in memory, keyed by (scorer id, updated_at)
+SCORER_LRU_SIZE = int(os.getenv("EVAL_SCORER_LRU_SIZE", "256"))
+
+
+@dataclass(frozen=True)
+class HydratedScorer:
+    """
+    Detached snapshot of a ScorerDefinition plus its hydrated MLflow scorer.
+
+    Exposes the same attributes as ScorerDefinition, so it can be passed to
+    helpers such as `scorer_output_name`.
+    """
+
+    id: UUID
+    name: str
+    scorer_type: ScorerType
+    configuration: dict
+    updated_at: datetime
+    scorer: Any
+
+
+_hydrated: "OrderedDict[Tuple[UUID, datetime], HydratedScorer]" = OrderedDict()
+_hydrated_lock = threading.Lock()
+
+
+def hydrate_scorer(scorer_def: ScorerDefinition) -> HydratedScorer:
+    """
+    Returns the hydrated scorer for `scorer_def`, building it only on a cache miss.
+
+    `updated_at` is part of the key, so editing a scorer (which bumps
+    `updated_at`) naturally invalidates its cached entry.
+    """
+    key = (scorer_def.id, scorer_def.updated_at)
+    with _hydrated_lock:
+        hydrated = _hydrated.get(key)
+        if hydrated is not None:
+            _hydrated.move_to_end(key)
+            return hydrated
+
+    hydrated = HydratedScorer(
+        id=scorer_def.id,
+        name=scorer_def.name,
+        scorer_type=scorer_def.scorer_type,
+        configuration=dict(scorer_def.configuration),
+        updated_at=scorer_def.updated_at,
+        scorer=scorer_factory(scorer_def),
+    )
+    with _hydrated_lock:
+        _hydrated[key] = hydrated
+        _hydrated.move_to_end(key)
+        while len(_hydrated) > SCORER_LRU_SIZE:
+            _hydrated.popitem(last=False)
+    return hydrated
@@ -0,0 +1,73 @@
+"""
+MLflow tracking as an asynchronous side channel.
+
+Row-level results never go through MLflow: the executor writes them straight
+to the results store (see results.py). Once a run completes, its summary
+metrics and settings are logged to MLflow from a background thread, so a slow
+or unreachable tracking server neither delays nor fails the run. Pending
+logs are drained when the worker process exits.
+
+Set EVAL_MLFLOW_TRACKING=off to skip MLflow logging altogether.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+
+import mlflow
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app.db.database import db
+from app.db.models import EvaluationRun
+
+logger = logging.getLogger(__name__)
+
+MLFLOW_TRACKING = os.getenv("EVAL_MLFLOW_TRACKING", "async")  # 'async' or 'off'
+
+# One thread: logs are rare and ordering keeps MLflow runs consistent
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlflow-tracking")
+
+
+def _log_run_summary(run_id: UUID) -> None:
+    try:
+        with Session(db.engine) as session:
+            run = session.get(EvaluationRun, run_id)
+            if not run:
+                return
+            mlflow_run_id = run.mlflow_run_id
+            metrics = {k: v for k, v in (run.summary_results or {}).items() if isinstance(v, (int, float))}
+            params = {
+                "profile_id": str(run.profile_id),
+                "dataset_path": run.dataset_path,
+                "chunk_size": run.chunk_size,
+                "shard_count": run.shard_count or 1,
+                "parent_run_id": str(run.parent_run_id) if run.parent_run_id else None,
+            }
+            results_path = run.row_details_path
+
+        # Runs without MLflow-backed scorers get their MLflow run only now
+        with mlflow.start_run(run_id=mlflow_run_id, run_name=None if mlflow_run_id else str(run_id)) as mlflow_run:
+            mlflow.log_params({k: v for k, v in params.items() if v is not None})
+            mlflow.log_metrics(metrics)
+            if results_path:
+                mlflow.set_tag("results_path", results_path)
+
+        if not mlflow_run_id:
+            with Session(db.engine) as session:
+                session.execute(
+                    update(EvaluationRun)
+                    .where(EvaluationRun.id == run_id, EvaluationRun.mlflow_run_id.is_(None))
+                    .values(mlflow_run_id=mlflow_run.info.run_id)
+                )
+                session.commit()
+    except Exception:
+        logger.exception(f"Failed to log run {run_id} to MLflow")
+
+
+def log_run_summary(run_id: UUID) -> None:
+    """Queues the completed run's summary for logging to MLflow."""
+    if MLFLOW_TRACKING == "off":
+        return
+    _executor.submit(_log_run_summary, run_id)
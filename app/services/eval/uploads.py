@@ -0,0 +1,270 @@
+"""
+Dataset uploads.
+
+Uploads are streamed to disk in chunks, with every blocking write and hash
+update run in a worker thread, so a multi-GB upload never stalls the event
+loop. The SHA-256 of the content is computed on the fly. Every upload gets
+its own final file, kept until it is ingested, so concurrent uploads of the
+same name or the same content never clobber each other.
+Multipart uploads are parsed from the raw request stream, not spooled first,
+so uploads larger than EVAL_MAX_UPLOAD_BYTES are rejected as soon as they go
+over the limit (or up front, from the declared size), chunked or not.
+
+Very large files can be sent as resumable uploads: the client opens an
+upload with its total size, then appends parts at the current offset,
+resuming from `offset` after a dropped connection, and completes it. The
+upload's state lives next to its partial file, so any API process sharing
+the upload directory can serve any part.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_DIR = os.getenv("EVAL_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "dead-simpl-uploads"))
+MAX_UPLOAD_BYTES = int(os.getenv("EVAL_MAX_UPLOAD_BYTES", str(5 * 1024 ** 3)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("EVAL_UPLOAD_CHUNK_BYTES", str(1024 ** 2)))
+
+# In-progress resumable uploads: <upload_id>.part and <upload_id>.json
+_PARTS_DIR = os.path.join(UPLOAD_DIR, "parts")
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+class UploadOffsetError(ValueError):
+    def __init__(self, expected: int):
+        super().__init__(f"Upload is at offset {expected}")
+        self.expected = expected
+
+
+@dataclass
+class ResumableUpload:
+    upload_id: str
+    filename: str
+    size: int
+    sha256: Optional[str] = None
+
+    @property
+    def part_path(self) -> str:
+        return os.path.join(_PARTS_DIR, f"{self.upload_id}.part")
+
+    @property
+    def offset(self) -> int:
+        return os.path.getsize(self.part_path)
+
+
+def check_size(size: Optional[int]) -> None:
+    if size is not None and size > MAX_UPLOAD_BYTES:
+        raise UploadTooLargeError(f"Upload is larger than the {MAX_UPLOAD_BYTES} byte limit")
+
+
+def _extension(filename: str) -> str:
+    return os.path.splitext(filename or "")[1].lower() or ".csv"
+
+
+def _finalize(tmp_path: str, sha256: str, filename: str) -> str:
+    """Moves a fully written upload to its final path, which no other upload shares."""
+    path = os.path.join(UPLOAD_DIR, f"{sha256}-{uuid4().hex}{_extension(filename)}")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _write(f, hasher, chunk: bytes) -> None:
+    f.write(chunk)
+    if hasher is not None:
+        hasher.update(chunk)
+
+
+async def save_stream(chunks: AsyncIterator[bytes], filename: str) -> Tuple[str, str, int]:
+    """
+    Writes a whole upload to the upload directory.
+
+    Returns:
+        The file's path, its SHA-256 and its size in bytes.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    tmp_path = os.path.join(UPLOAD_DIR, f".{uuid4().hex}.tmp")
+    hasher, size = hashlib.sha256(), 0
+    f = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            check_size(size)
+            await run_in_threadpool(_write, f, hasher, chunk)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        os.remove(tmp_path)
+        raise
+    await run_in_threadpool(f.close)
+
+    sha256 = hasher.hexdigest()
+    path = await run_in_threadpool(_finalize, tmp_path, sha256, filename)
+    return path, sha256, size
+
+
+class MultipartFileStream:
+    """
+    The file part of a multipart/form-data request, parsed while the body
+    streams in. Nothing is spooled: the caller pulls the file's bytes and can
+    stop reading the request (e.g. once it is over the size limit) at any point.
+    """
+
+    def __init__(self, content_type: str, body: AsyncIterator[bytes], field: str = "file"):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not content_type.startswith("multipart/form-data") or not boundary:
+            raise ValueError("Expected a multipart/form-data upload")
+        self.filename: Optional[str] = None
+        self._field = field
+        self._body = body.__aiter__()
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = self._header_value = b""
+        self._in_file = self._done = False
+        self._data: List[bytes] = []
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        # Only the first file under the expected field name is read
+        if self.filename is None and params.get(b"name") == self._field.encode() and b"filename" in params:
+            self.filename = params[b"filename"].decode("utf-8", "replace")
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._data.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file, self._done = False, True
+
+    async def _feed(self) -> bool:
+        """Parses the next chunk of the body; False once the body is exhausted."""
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            return False
+        self._parser.write(chunk)
+        return True
+
+    async def open(self) -> str:
+        """Reads up to the start of the file's content and returns its filename."""
+        while self.filename is None:
+            if not await self._feed():
+                raise ValueError(f"The upload has no `{self._field}` file")
+        return self.filename
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """The file's content, as it arrives."""
+        while True:
+            if self._data:
+                data, self._data = b"".join(self._data), []
+                yield data
+            if self._done:
+                return
+            if not await self._feed():
+                raise ValueError("The upload ended before the end of its file")
+
+
+def _state_path(upload_id: str) -> str:
+    return os.path.join(_PARTS_DIR, f"{upload_id}.json")
+
+
+def start_upload(filename: str, size: int, sha256: Optional[str] = None) -> ResumableUpload:
+    check_size(size)
+    os.makedirs(_PARTS_DIR, exist_ok=True)
+    upload = ResumableUpload(upload_id=uuid4().hex, filename=filename, size=size, sha256=sha256)
+    open(upload.part_path, "wb").close()
+    with open(_state_path(upload.upload_id), "w") as f:
+        json.dump(asdict(upload), f)
+    return upload
+
+
+def get_upload(upload_id: str) -> Optional[ResumableUpload]:
+    # Ids are generated hex strings, anything else cannot name an upload
+    if not upload_id.isalnum():
+        return None
+    try:
+        with open(_state_path(upload_id)) as f:
+            return ResumableUpload(**json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+async def append_part(upload: ResumableUpload, offset: int, chunks: AsyncIterator[bytes]) -> int:
+    """
+    Appends a part at `offset`, which must be the upload's current size.
+
+    Returns:
+        The new offset. A part cut short by a dropped connection keeps what
+        was written, and the client resumes from the offset.
+    """
+    current = upload.offset
+    if offset != current:
+        raise UploadOffsetError(current)
+    f = await run_in_threadpool(open, upload.part_path, "ab")
+    try:
+        async for chunk in chunks:
+            current += len(chunk)
+            if current > upload.size:
+                raise UploadTooLargeError(f"Upload is larger than its declared {upload.size} bytes")
+            await run_in_threadpool(_write, f, None, chunk)
+    finally:
+        await run_in_threadpool(f.close)
+    return current
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_BYTES):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def complete_upload(upload: ResumableUpload) -> Tuple[str, str, int]:
+    """
+    Checks and finalizes a fully sent resumable upload.
+
+    Returns:
+        The file's path, its SHA-256 and its size in bytes.
+    """
+    if upload.offset != upload.size:
+        raise UploadOffsetError(upload.offset)
+    # Parts may come from several processes, so the hash is taken once at the end
+    sha256 = await run_in_threadpool(_hash_file, upload.part_path)
+    if upload.sha256 and upload.sha256.lower() != sha256:
+        raise ValueError("Uploaded content does not match the declared sha256")
+    path = await run_in_threadpool(_finalize, upload.part_path, sha256, upload.filename)
+    os.remove(_state_path(upload.upload_id))
+    return path, sha256, upload.size
@@ -0,0 +1,138 @@
+"""
+Standalone eval worker.
+
+Pulls runs from the `evaluation_jobs` queue and executes them outside of the
+API process. Scale eval throughput by raising `--concurrency` or by starting
+more worker processes/containers:
+
+    python -m app.services.eval.worker --concurrency 4
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from typing import Dict
+from uuid import UUID, uuid4
+
+from dotenv import load_dotenv
+from sqlmodel import Session
+
+from app.db.database import db, init_database
+from app.services.eval.cache import evict_expired
+from app.services.eval.datasets import collect_garbage
+from app.services.eval.execution import run_batch_task, run_evaluation_task
+from app.services.eval.queue import (
+    claim_job,
+    complete_job,
+    heartbeat,
+    requeue_stale_jobs,
+)
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = float(os.getenv("EVAL_POLL_INTERVAL_SECONDS", "2"))
+HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("EVAL_HEARTBEAT_INTERVAL_SECONDS", "30"))
+
+
+class EvalWorker:
+    """Runs up to `concurrency` evaluation runs at a time from the job queue."""
+
+    def __init__(self, concurrency: int = 1, worker_id: str = None):
+        self.concurrency = concurrency
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._slots_done = threading.Event()
+        self._active_jobs: Dict[UUID, UUID] = {}  # job id -> run id
+        self._lock = threading.Lock()
+
+    def stop(self, *_args) -> None:
+        logger.info(f"Worker {self.worker_id} stopping after in-flight runs finish")
+        self._stop.set()
+
+    def _slot_loop(self) -> None:
+        while not self._stop.is_set():
+            with Session(db.engine) as session:
+                job = claim_job(session, self.worker_id)
+                if not job:
+                    self._stop.wait(POLL_INTERVAL_SECONDS)
+                    continue
+                job_id, run_id, shard_index, batch_id = job.id, job.run_id, job.shard_index, job.batch_id
+
+            with self._lock:
+                self._active_jobs[job_id] = run_id
+            try:
+                if batch_id:
+                    logger.info(f"Worker {self.worker_id} claimed batch {batch_id} (job {job_id})")
+                    run_batch_task(batch_id)
+                else:
+                    logger.info(f"Worker {self.worker_id} claimed run {run_id} (job {job_id}, shard {shard_index})")
+                    run_evaluation_task(run_id, shard_index=shard_index)
+            finally:
+                with self._lock:
+                    self._active_jobs.pop(job_id, None)
+                with Session(db.engine) as session:
+                    complete_job(session, job_id)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._slots_done.wait(HEARTBEAT_INTERVAL_SECONDS):
+            with self._lock:
+                job_ids = list(self._active_jobs)
+            try:
+                with Session(db.engine) as session:
+                    heartbeat(session, job_ids)
+                    requeued = requeue_stale_jobs(session)
+                    if requeued:
+                        logger.info(f"Released {requeued} stale eval jobs")
+                    evict_expired(session)
+                    collect_garbage(session)
+            except Exception:
+                logger.exception("Heartbeat failed")
+
+    def run(self) -> None:
+        logger.info(f"Worker {self.worker_id} started with concurrency {self.concurrency}")
+        with Session(db.engine) as session:
+            requeue_stale_jobs(session)
+
+        # Heartbeats keep going until every slot is done, so a slow shutdown
+        # never lets another worker steal a run that is still in progress.
+        heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat_thread.start()
+
+        slots = [
+            threading.Thread(target=self._slot_loop, name=f"eval-slot-{i}")
+            for i in range(self.concurrency)
+        ]
+        for slot in slots:
+            slot.start()
+        for slot in slots:
+            slot.join()
+        self._slots_done.set()
+        heartbeat_thread.join()
+
+
+def main() -> None:
+    load_dotenv()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
+    parser = argparse.ArgumentParser(description="Dead Simpl evaluation worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("EVAL_WORKER_CONCURRENCY", "2")),
+        help="Number of evaluation runs executed concurrently by this process",
+    )
+    args = parser.parse_args()
+
+    init_database()
+
+    worker = EvalWorker(concurrency=args.concurrency)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
+import json
 import requests
-import time
 import pandas as pd
 import os
 
@@ -71,15 +71,25 @@ def test_eval_flow():
     run_id = response.json()["run_id"]
     print(f"Started Run ID: {run_id}")
 
-    # 5. Poll Status
-    print("\n5. Polling Status...")
-    for _ in range(10):
-        response = requests.get(f"{BASE_URL}/runs/{run_id}")
-        status = response.json()["status"]
-        print(f"Status: {status}")
-        if status in ["COMPLETED", "FAILED"]:
-            break
-        time.sleep(2)
+    # 5. Follow Progress (Server-Sent Events)
+    print("\n5. Following Run Events...")
+    status = None
+    event = None
+    with requests.get(f"{BASE_URL}/runs/{run_id}/events", stream=True, timeout=300) as stream:
+        for line in stream.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+                if event == "progress" and data:
+                    print(f"Progress: {data['rows_scored']}/{data['total_rows']} rows, ETA {data['eta_seconds']}")
+                elif event == "status":
+                    status = data["status"]
+                    print(f"Status: {status}")
+                    if status in ["COMPLETED", "FAILED"]:
+                        break
+
+    response = requests.get(f"{BASE_URL}/runs/{run_id}")
         
     if status == "COMPLETED":
         print("\nRun Completed Successfully!")
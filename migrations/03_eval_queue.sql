@@ -0,0 +1,14 @@
+-- Durable queue for evaluation runs, consumed by app.services.eval.worker
+CREATE TABLE evaluation_jobs (
+    id UUID PRIMARY KEY,
+    run_id UUID NOT NULL REFERENCES evaluation_runs(id) ON DELETE CASCADE,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id VARCHAR(255),
+    claimed_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Indexes
+CREATE INDEX ix_evaluation_jobs_run_id ON evaluation_jobs(run_id);
+CREATE INDEX ix_evaluation_jobs_claim ON evaluation_jobs(worker_id, created_at);
@@ -0,0 +1,20 @@
+-- Checkpoint for chunked execution of evaluation runs
+ALTER TABLE evaluation_runs ADD COLUMN chunk_size INTEGER;
+ALTER TABLE evaluation_runs ADD COLUMN chunks_completed INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE evaluation_runs ADD COLUMN rows_completed INTEGER NOT NULL DEFAULT 0;
+
+-- Per-chunk results of evaluation runs
+CREATE TABLE evaluation_run_chunks (
+    id UUID PRIMARY KEY,
+    run_id UUID NOT NULL REFERENCES evaluation_runs(id) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    start_row INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    aggregates JSONB NOT NULL,
+    results_path VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (run_id, chunk_index)
+);
+
+-- Indexes
+CREATE INDEX ix_evaluation_run_chunks_run_id ON evaluation_run_chunks(run_id);
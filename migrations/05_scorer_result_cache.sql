@@ -0,0 +1,15 @@
+-- Cache hit accounting on evaluation runs
+ALTER TABLE evaluation_runs ADD COLUMN cache_hits INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE evaluation_runs ADD COLUMN cache_misses INTEGER NOT NULL DEFAULT 0;
+
+-- Cross-run memoization of scorer results, keyed by scorer config + row content
+CREATE TABLE scorer_result_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    score DOUBLE PRECISION,
+    justification TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- Indexes
+CREATE INDEX ix_scorer_result_cache_expires_at ON scorer_result_cache(expires_at);
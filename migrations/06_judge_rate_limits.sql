@@ -0,0 +1,11 @@
+-- Live judge call counters on evaluation runs
+ALTER TABLE evaluation_runs ADD COLUMN judge_calls_queued INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE evaluation_runs ADD COLUMN judge_calls_in_flight INTEGER NOT NULL DEFAULT 0;
+
+-- Token buckets shared by every eval worker, one per judge model
+CREATE TABLE judge_rate_buckets (
+    judge_model VARCHAR(255) PRIMARY KEY,
+    requests_level DOUBLE PRECISION NOT NULL DEFAULT 0,
+    tokens_level DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,2 @@
+-- Process-pool size for CPU-bound scorers of a run
+ALTER TABLE evaluation_runs ADD COLUMN cpu_workers INTEGER;
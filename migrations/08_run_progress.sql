@@ -0,0 +1,3 @@
+-- Live progress of evaluation runs
+ALTER TABLE evaluation_runs ADD COLUMN total_rows INTEGER;
+ALTER TABLE evaluation_runs ADD COLUMN progress JSONB;
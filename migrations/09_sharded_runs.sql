@@ -0,0 +1,4 @@
+-- Sharded execution of evaluation runs
+ALTER TABLE evaluation_runs ADD COLUMN shard_count INTEGER;
+ALTER TABLE evaluation_runs ADD COLUMN total_chunks INTEGER;
+ALTER TABLE evaluation_jobs ADD COLUMN shard_index INTEGER;
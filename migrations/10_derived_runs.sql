@@ -0,0 +1,6 @@
+-- Incremental re-evaluation: runs derived from a previous run
+ALTER TABLE evaluation_runs ADD COLUMN parent_run_id UUID REFERENCES evaluation_runs(id) ON DELETE SET NULL;
+ALTER TABLE evaluation_runs ADD COLUMN scorer_versions JSONB;
+
+-- Indexes
+CREATE INDEX ix_evaluation_runs_parent_run_id ON evaluation_runs(parent_run_id);
@@ -0,0 +1,2 @@
+-- Rows of evaluation runs scored through an identical row
+ALTER TABLE evaluation_runs ADD COLUMN rows_deduplicated INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,2 @@
+-- Per-scorer score distributions of completed runs
+ALTER TABLE evaluation_runs ADD COLUMN distributions JSONB;
@@ -0,0 +1,28 @@
+-- One row per summary metric of a completed run, for profile-level trends
+CREATE TABLE run_metrics (
+    run_id UUID NOT NULL REFERENCES evaluation_runs(id) ON DELETE CASCADE,
+    profile_id UUID NOT NULL REFERENCES evaluation_profiles(id) ON DELETE CASCADE,
+    scorer VARCHAR(255) NOT NULL,
+    metric VARCHAR(64) NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (run_id, scorer, metric)
+);
+
+-- Indexes
+CREATE INDEX ix_run_metrics_trends ON run_metrics(profile_id, scorer, metric, created_at);
+
+-- Backfill from the summaries of runs completed so far
+INSERT INTO run_metrics (run_id, profile_id, scorer, metric, value, created_at)
+SELECT
+    r.id,
+    r.profile_id,
+    regexp_replace(m.key, '/[^/]*$', ''),
+    regexp_replace(m.key, '^.*/', ''),
+    (m.value #>> '{}')::DOUBLE PRECISION,
+    r.created_at
+FROM evaluation_runs r, jsonb_each(r.summary_results) m
+WHERE r.status = 'COMPLETED'
+  AND r.profile_id IS NOT NULL
+  AND m.key LIKE '%/%'
+  AND jsonb_typeof(m.value) = 'number';
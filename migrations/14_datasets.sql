@@ -0,0 +1,20 @@
+-- Content-addressed registry of ingested (Parquet) datasets
+CREATE TABLE datasets (
+    id UUID PRIMARY KEY,
+    sha256 VARCHAR(64) NOT NULL UNIQUE,
+    filename VARCHAR(255) NOT NULL,
+    source_format VARCHAR(16) NOT NULL,
+    path VARCHAR(255) NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    row_count INTEGER NOT NULL,
+    columns JSONB NOT NULL,
+    column_stats JSONB NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE evaluation_runs ADD COLUMN dataset_id UUID REFERENCES datasets(id);
+
+-- Indexes
+CREATE INDEX ix_datasets_last_used_at ON datasets(last_used_at);
+CREATE INDEX ix_evaluation_runs_dataset_id ON evaluation_runs(dataset_id);
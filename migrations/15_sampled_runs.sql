@@ -0,0 +1,2 @@
+-- Sampled and sequential (early-stopping) runs
+ALTER TABLE evaluation_runs ADD COLUMN sampling JSONB;
@@ -0,0 +1,2 @@
+-- Runs that generate their outputs with a model before scoring
+ALTER TABLE evaluation_runs ADD COLUMN generation JSONB;
@@ -0,0 +1,6 @@
+-- Runs created together by one batch request, scored in a single pass
+ALTER TABLE evaluation_runs ADD COLUMN batch_id UUID;
+ALTER TABLE evaluation_runs ADD COLUMN candidate VARCHAR(255);
+CREATE INDEX ix_evaluation_runs_batch_id ON evaluation_runs (batch_id);
+
+ALTER TABLE evaluation_jobs ADD COLUMN batch_id UUID;
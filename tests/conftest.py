@@ -0,0 +1,78 @@
+import glob
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+import uvicorn
+
+# Settings are read at import time: no Postgres rate buckets, files in scratch directories
+os.environ.setdefault("EVAL_RATE_LIMIT_BACKEND", "local")
+os.environ.setdefault("EVAL_RESULTS_DIR", tempfile.mkdtemp(prefix="dead-simpl-results-"))
+os.environ.setdefault("EVAL_UPLOAD_DIR", tempfile.mkdtemp(prefix="dead-simpl-uploads-"))
+os.environ.setdefault("EVAL_DATASETS_DIR", tempfile.mkdtemp(prefix="dead-simpl-datasets-"))
+os.environ.setdefault("MLFLOW_DISABLE_AGENT_HINT", "1")
+os.environ.setdefault("EVAL_MLFLOW_TRACKING", "off")
+
+from app import fake_model_server  # noqa: E402
+from app.db.database import db  # noqa: E402
+
+# A scratch Postgres database (its schema is dropped!) for the tests that need one
+TEST_DATABASE_URL = os.getenv("EVAL_TEST_DATABASE_URL")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def _model_server_url():
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(fake_model_server.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("Fake model server did not start")
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def model_server(_model_server_url, monkeypatch):
+    """Base URL of the local fake model server, with default settings and a fresh request count."""
+    monkeypatch.setitem(fake_model_server.settings, "latency", 0.0)
+    monkeypatch.setitem(fake_model_server.settings, "error_rate", 0.0)
+    monkeypatch.setitem(fake_model_server.settings, "fail_next", 0)
+    monkeypatch.setitem(fake_model_server.stats, "requests", 0)
+    return _model_server_url
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The test database, with the schema of migrations/ applied from scratch. Skips without EVAL_TEST_DATABASE_URL."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("EVAL_TEST_DATABASE_URL is not set")
+    db.init_db(TEST_DATABASE_URL)
+    migrations = [os.path.join(MIGRATIONS_DIR, "init.sql")] + sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "[0-9]*.sql")))
+    # Raw cursor: the scripts are run verbatim, with no parameter substitution
+    connection = db.engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public")
+            for path in migrations:
+                with open(path) as f:
+                    cursor.execute(f.read())
+        connection.commit()
+    finally:
+        connection.close()
+    yield db.engine
+    db.engine.dispose()
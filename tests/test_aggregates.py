@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.eval.aggregates import (
+    EXACT_QUANTILE_VALUES,
+    chunk_state,
+    finalize,
+    merge_states,
+)
+
+
+def _summary(frame: pd.DataFrame, chunk_rows: int = None, shards: int = 1) -> dict:
+    """Summary of `frame` scored in chunks of `chunk_rows`, reduced across `shards` as the executor does."""
+    if chunk_rows is None:
+        return finalize(merge_states([chunk_state(frame)]))
+    chunks = [chunk_state(frame.iloc[i:i + chunk_rows]) for i in range(0, len(frame), chunk_rows)]
+    # Every shard merges its own chunks, then the shard states are merged
+    shard_states = [merge_states(chunks[s::shards]) for s in range(shards)]
+    return finalize(merge_states(shard_states))
+
+
+def _scores(values) -> pd.DataFrame:
+    return pd.DataFrame({"row_index": range(len(values)), "judge/score": values, "judge/justification": None})
+
+
+@pytest.mark.parametrize("chunk_rows,shards", [(1, 1), (7, 1), (100, 3), (999, 4)])
+def test_merged_chunks_match_single_pass(chunk_rows, shards):
+    rng = np.random.default_rng(0)
+    values = rng.integers(1, 6, 2000).astype(float)
+    values[rng.choice(2000, 50, replace=False)] = np.nan
+    frame = _scores(values)
+
+    single, merged = _summary(frame), _summary(frame, chunk_rows, shards)
+
+    assert merged.keys() == single.keys()
+    for key in single:
+        assert merged[key] == pytest.approx(single[key]), key
+    assert single["judge/count"] == 1950
+    assert single["judge/errors"] == 50
+
+
+def test_discrete_quantiles_are_exact():
+    values = np.array([1, 1, 1, 2, 5] * 1000, dtype=float)
+
+    summary = _summary(_scores(values), chunk_rows=333, shards=2)
+
+    for q in (50, 90, 99):
+        assert summary[f"judge/p{q}"] == np.quantile(values, q / 100)
+    assert summary["judge/p50"] == 1.0
+
+
+def test_continuous_quantiles_are_close():
+    values = np.random.default_rng(1).normal(size=20000)
+
+    single, merged = _summary(_scores(values)), _summary(_scores(values), chunk_rows=1000, shards=3)
+
+    for q in (50, 90, 99):
+        assert merged[f"judge/p{q}"] == pytest.approx(np.quantile(values, q / 100), abs=0.05)
+        assert merged[f"judge/p{q}"] == pytest.approx(single[f"judge/p{q}"], abs=0.05)
+    assert merged["judge/mean"] == pytest.approx(values.mean())
+    assert merged["judge/std"] == pytest.approx(values.std())
+
+
+def test_exact_counts_give_way_to_the_digest():
+    # Each chunk stays under the limit, their union does not
+    values = np.arange(EXACT_QUANTILE_VALUES * 2, dtype=float)
+    states = [chunk_state(_scores(values[i::2])) for i in range(2)]
+    assert all(state["judge"]["values"] for state in states)
+
+    merged = merge_states(states)
+
+    assert merged["judge"]["values"] is None
+    assert finalize(merged)["judge/p50"] == pytest.approx(np.quantile(values, 0.5), rel=0.02)
+
+
+def test_states_without_exact_counts_still_merge():
+    old = chunk_state(_scores([1.0, 2.0]))
+    del old["judge"]["values"]
+
+    merged = merge_states([old, chunk_state(_scores([3.0]))])
+
+    assert merged["judge"]["values"] is None
+    assert finalize(merged)["judge/count"] == 3
+
+
+def test_all_errors():
+    summary = _summary(_scores([np.nan, np.nan]), chunk_rows=1)
+
+    assert summary == {"judge/count": 0, "judge/errors": 2}
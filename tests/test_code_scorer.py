@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from app.services.eval import code_scorer
+from app.services.eval.code_scorer import SandboxError, SandboxPool
+
+
+class _FakeProcess:
+    """Stands in for a sandbox process; dies after each batch when `dies` is set."""
+
+    started = 0
+    dies = False
+
+    def __init__(self):
+        type(self).started += 1
+        self._alive = True
+
+    def alive(self):
+        return self._alive
+
+    def kill(self):
+        self._alive = False
+
+    def score(self, scorer, table):
+        time.sleep(0.01)
+        if type(self).dies:
+            self._alive = False
+            raise SandboxError("Code scorer process exited with code -9")
+        return table
+
+
+@pytest.fixture
+def fake_process(monkeypatch):
+    process = type("Process", (_FakeProcess,), {"started": 0, "dies": False})
+    monkeypatch.setattr(code_scorer, "SandboxProcess", process)
+    return process
+
+
+def _score_concurrently(pool, callers):
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(pool.score(None, "batch"))
+        except SandboxError as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=call, daemon=True) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in threads), "callers hung waiting for a process"
+    return outcomes
+
+
+def test_reuses_idle_processes(fake_process):
+    pool = SandboxPool(2)
+
+    outcomes = _score_concurrently(pool, 8)
+
+    assert outcomes == ["batch"] * 8
+    assert fake_process.started <= 2
+
+
+def test_dead_processes_are_replaced_for_waiting_callers(fake_process):
+    fake_process.dies = True
+    pool = SandboxPool(2)
+
+    outcomes = _score_concurrently(pool, 6)
+
+    assert len(outcomes) == 6 and all(isinstance(o, SandboxError) for o in outcomes)
+    # Every batch got a fresh process once the previous one died
+    assert fake_process.started == 6
+    assert pool._started == 0
+
+
+def test_failed_start_frees_the_slot(fake_process, monkeypatch):
+    pool = SandboxPool(1)
+    monkeypatch.setattr(code_scorer, "SandboxProcess", lambda: (_ for _ in ()).throw(OSError("no bwrap")))
+    with pytest.raises(OSError):
+        pool.score(None, "batch")
+
+    monkeypatch.setattr(code_scorer, "SandboxProcess", fake_process)
+    assert pool.score(None, "batch") == "batch"
+
+
+def test_waiting_is_bounded(fake_process, monkeypatch):
+    monkeypatch.setattr(code_scorer, "CODE_SCORER_ACQUIRE_TIMEOUT_SECONDS", 0.05)
+    pool = SandboxPool(1)
+    busy = pool._acquire()
+
+    with pytest.raises(SandboxError, match="No code scorer process became available"):
+        pool.score(None, "batch")
+
+    pool._release(busy)
+    assert pool.score(None, "batch") == "batch"
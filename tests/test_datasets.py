@@ -0,0 +1,83 @@
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlmodel import Session, select
+
+from app.db.models import Dataset
+from app.services.eval.datasets import collect_garbage, ingest_dataset
+from app.services.eval.uploads import save_stream
+
+
+def _csv() -> bytes:
+    # Unique content, so every test registers its own dataset
+    return f"inputs,outputs\n{uuid4().hex},yes\nsecond,no\n".encode()
+
+
+async def _chunks(content: bytes):
+    yield content
+
+
+def _upload(content: bytes, filename: str = "data.csv"):
+    return asyncio.run(save_stream(_chunks(content), filename))
+
+
+def test_concurrent_ingests_of_the_same_content(database):
+    content = _csv()
+    uploads = [_upload(content) for _ in range(4)]
+    barrier = threading.Barrier(len(uploads))
+    ids, errors = [], []
+
+    def ingest(path, sha256, size):
+        barrier.wait()
+        try:
+            with Session(database) as session:
+                ids.append(ingest_dataset(session, path, sha256, "data.csv", size).id)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest, args=upload) for upload in uploads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(ids)) == 1
+    assert not any(os.path.exists(path) for path, _, _ in uploads)
+    with Session(database) as session:
+        datasets = session.exec(select(Dataset).where(Dataset.sha256 == uploads[0][1])).all()
+        assert len(datasets) == 1
+        assert datasets[0].row_count == 2
+        assert os.path.exists(datasets[0].path)
+
+
+def test_reupload_keeps_the_dataset_from_garbage_collection(database):
+    content = _csv()
+    with Session(database) as session:
+        dataset = ingest_dataset(session, *_upload(content)[:2], "data.csv", len(content))
+        dataset.last_used_at = datetime.utcnow() - timedelta(days=30)
+        session.add(dataset)
+        session.commit()
+
+        again = ingest_dataset(session, *_upload(content)[:2], "data.csv", len(content))
+        collect_garbage(session)
+
+        assert again.id == dataset.id
+        assert again.last_used_at > datetime.utcnow() - timedelta(minutes=1)
+        assert session.get(Dataset, dataset.id) is not None
+        assert os.path.exists(dataset.path)
+
+
+def test_lost_dataset_file_is_converted_again(database):
+    content = _csv()
+    with Session(database) as session:
+        dataset = ingest_dataset(session, *_upload(content)[:2], "data.csv", len(content))
+        os.remove(dataset.path)
+
+        again = ingest_dataset(session, *_upload(content)[:2], "data.csv", len(content))
+
+        assert again.id == dataset.id
+        assert os.path.exists(again.path)
@@ -0,0 +1,87 @@
+import os
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.fake_model_server import settings, stats
+from app.services.eval import judge_executor
+from app.services.eval.generation import (
+    GENERATION_ERROR_COLUMN,
+    CandidateGenerator,
+    generated_chunk_path,
+    with_generation_errors,
+)
+
+
+@pytest.fixture
+def generator(model_server):
+    generator = CandidateGenerator(
+        uuid4(), "chatbot", {"model": "openai:/fake", "base_url": model_server, "max_workers": 1}
+    )
+    yield generator
+    generator.close()
+
+
+def _chunks(sizes):
+    start = 0
+    for chunk_index, size in enumerate(sizes):
+        yield chunk_index, pd.DataFrame(
+            {"inputs": [f"question {i}" for i in range(start, start + size)]}, index=range(start, start + size)
+        )
+        start += size
+
+
+def test_generates_outputs_in_chunk_order(generator):
+    chunks = list(generator.pipeline(_chunks([3, 2, 4]), wanted=lambda chunk_index: chunk_index != 1))
+
+    assert [chunk_index for chunk_index, _ in chunks] == [0, 1, 2]
+    first, skipped, last = (df for _, df in chunks)
+    assert first["outputs"].tolist() == [f"Answer to: question {i}" for i in range(3)]
+    assert first[GENERATION_ERROR_COLUMN].isna().all()
+    assert "outputs" not in skipped.columns
+    assert list(last.index) == [5, 6, 7, 8]
+    assert stats["requests"] == 7
+
+
+def test_failed_rows_carry_the_error(generator, monkeypatch):
+    monkeypatch.setattr(judge_executor, "MAX_RETRIES", 0)
+    settings["fail_next"] = 1
+
+    [(_, df)] = generator.pipeline(_chunks([3]), wanted=lambda _: True)
+
+    errors = df[GENERATION_ERROR_COLUMN]
+    assert errors.notna().sum() == 1
+    assert errors.dropna().str.startswith("Generation failed").all()
+    assert df.loc[errors.notna(), "outputs"].isna().all()
+    assert df.loc[errors.isna(), "outputs"].str.startswith("Answer to").all()
+
+
+def test_resumed_run_reuses_generated_chunks(generator):
+    list(generator.pipeline(_chunks([2, 2]), wanted=lambda _: True))
+    assert os.path.exists(generated_chunk_path(generator.run_id, 1))
+    assert stats["requests"] == 4
+
+    [(_, first), (_, second)] = generator.pipeline(_chunks([2, 2]), wanted=lambda _: True)
+
+    assert stats["requests"] == 4
+    assert list(second.index) == [2, 3]
+    assert second["outputs"].tolist() == ["Answer to: question 2", "Answer to: question 3"]
+
+
+def test_failed_rows_error_every_scorer():
+    df = pd.DataFrame({"inputs": ["a", "b", "c"], "outputs": ["x", None, "z"]}, index=[10, 11, 12])
+    errors = pd.Series([None, "Generation failed: 429", None], index=df.index)
+    # Only the rows that generated are scored
+    results = pd.DataFrame(
+        {"inputs": ["a", "c"], "length/score": [1.0, 1.0], "length/justification": ["ok", "ok"]}, index=[10, 12]
+    )
+
+    full = with_generation_errors(df, results, errors)
+
+    assert list(full.index) == [10, 11, 12]
+    assert full["length/score"].tolist()[::2] == [1.0, 1.0]
+    assert np.isnan(full.loc[11, "length/score"])
+    assert full["length/justification"].tolist() == ["ok", "Generation failed: 429", "ok"]
+    assert full[GENERATION_ERROR_COLUMN].notna().tolist() == [False, True, False]
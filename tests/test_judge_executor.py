@@ -0,0 +1,95 @@
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+
+from app.db.models import ScorerType
+from app.fake_model_server import _score, settings, stats
+from app.services.eval import judge_executor
+from app.services.eval.judge_executor import is_async_judge, score_judges
+from app.services.eval.scorer_factory import HydratedScorer
+
+
+def _judge(base_url: str, name: str = "relevance", **configuration) -> HydratedScorer:
+    return HydratedScorer(
+        id=uuid4(),
+        name=name,
+        scorer_type=ScorerType.LLM_JUDGE,
+        configuration={"judge_model": "openai:/fake-judge", "base_url": base_url, **configuration},
+        updated_at=datetime.utcnow(),
+        scorer=None,
+    )
+
+
+def _rows(n: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"inputs": [f"question {i}" for i in range(n)], "outputs": [f"answer {i}" for i in range(n)]},
+        index=range(100, 100 + n),
+    )
+
+
+def _expected_score(payload: dict) -> float:
+    # The fake server grades a payload by its checksum
+    return float(_score(json.dumps(payload)))
+
+
+def test_scores_every_row_one_call_per_row(model_server):
+    judge = _judge(model_server)
+    rows = _rows(12)
+    assert is_async_judge(judge)
+
+    result = score_judges([(judge, rows)])["relevance"]
+
+    assert list(result.index) == list(rows.index)
+    expected = [_expected_score(row) for row in rows.to_dict(orient="records")]
+    assert result["relevance/score"].tolist() == expected
+    assert result["relevance/justification"].eq("stub").all()
+    assert stats["requests"] == 12
+
+
+def test_batched_judge_grades_items_by_id(model_server):
+    judge = _judge(model_server, batch_size=5)
+    rows = _rows(12)
+
+    result = score_judges([(judge, rows)])["relevance"]
+
+    records = rows.to_dict(orient="records")
+    expected = [_expected_score({"id": i % 5, **row}) for i, row in enumerate(records)]
+    assert result["relevance/score"].tolist() == expected
+    assert stats["requests"] == 3
+
+
+def test_judges_run_together_on_their_own_rows(model_server):
+    first, second = _judge(model_server, "first"), _judge(model_server, "second")
+    rows = _rows(6)
+
+    results = score_judges([(first, rows), (second, rows.iloc[2:4])])
+
+    assert results["first"]["first/score"].notna().sum() == 6
+    assert list(results["second"].index) == list(rows.index[2:4])
+
+
+def test_retries_rate_limited_calls(model_server):
+    settings["fail_next"] = 4
+    calls = []
+
+    judge = _judge(model_server)
+    result = score_judges([(judge, _rows(3))], on_stats=lambda q, f: calls.append((q, f)))["relevance"]
+
+    assert result["relevance/score"].notna().all()
+    assert stats["requests"] == 3 + 4
+    # The last report is the drained queue
+    assert calls[-1] == (0, 0)
+
+
+def test_gives_up_after_max_retries(model_server, monkeypatch):
+    monkeypatch.setattr(judge_executor, "MAX_RETRIES", 1)
+    settings["fail_next"] = 100
+
+    result = score_judges([(_judge(model_server), _rows(2))])["relevance"]
+
+    assert np.isnan(result["relevance/score"]).all()
+    assert result["relevance/justification"].str.startswith("Judge call failed").all()
+    assert stats["requests"] == 4
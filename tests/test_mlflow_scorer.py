@@ -0,0 +1,76 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import mlflow
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.db.models import ScorerType
+from app.services.eval import cache
+from app.services.eval.execution import _score_chunk
+from app.services.eval.mlflow_scorer import mlflow_scores
+from app.services.eval.native_scorers import native_scorer
+from app.services.eval.results import ROW_INDEX_COLUMN
+from app.services.eval.scorer_factory import HydratedScorer
+
+
+@pytest.fixture
+def evaluate_calls(monkeypatch):
+    """Records mlflow.genai.evaluate calls; each scorer scores a row by its output length."""
+    calls = []
+
+    def evaluate(data, scorers):
+        calls.append((len(data), list(scorers)))
+        lengths = data["outputs"].str.len()
+        table = pd.DataFrame({"outputs": data["outputs"].to_numpy()})
+        for i, scorer in enumerate(scorers):
+            # Builtin metric columns may come back versioned
+            table[f"{scorer}/v1/value"] = (lengths * (i + 1)).to_numpy()
+            table[f"{scorer}/v1/justification"] = f"by {scorer}"
+        return SimpleNamespace(result_df=table)
+
+    monkeypatch.setattr(mlflow.genai, "evaluate", evaluate)
+    monkeypatch.setattr(cache, "CACHE_ENABLED", False)
+    return calls
+
+
+def _builtin(metric: str) -> HydratedScorer:
+    return HydratedScorer(
+        id=uuid4(),
+        name=metric,
+        scorer_type=ScorerType.BUILTIN,
+        configuration={"metric_name": metric},
+        updated_at=datetime.utcnow(),
+        scorer=native_scorer(metric) or metric,
+    )
+
+
+def _rows() -> pd.DataFrame:
+    outputs = ["a", "bb", "ccc", "bb"]
+    return pd.DataFrame({ROW_INDEX_COLUMN: range(4), "inputs": ["q"] * 4, "outputs": outputs}, index=range(10, 14))
+
+
+def test_scorers_with_prefixed_names_get_their_own_columns(evaluate_calls):
+    scores = mlflow_scores(_rows(), {"toxicity": "toxicity", "toxicity_v2": "toxicity_v2"})
+
+    assert scores["toxicity/score"].tolist() == [1, 2, 3, 2]
+    assert scores["toxicity_v2/score"].tolist() == [2, 4, 6, 4]
+    assert scores["toxicity_v2/justification"].eq("by toxicity_v2").all()
+
+
+@pytest.mark.parametrize("cpu_workers", [1, 4])
+def test_mlflow_scorers_share_one_evaluate_call_per_chunk(evaluate_calls, cpu_workers):
+    scorers = [_builtin("toxicity"), _builtin("toxicity_v2"), _builtin("token_count")]
+    run = SimpleNamespace(id=uuid4(), cpu_workers=cpu_workers)
+    progress = SimpleNamespace(scorer_done=lambda name, rows: None)
+
+    results, _, misses, duplicates = _score_chunk(None, run, _rows(), scorers, progress)
+
+    # The native token_count never goes through MLflow; duplicates are scored once
+    assert evaluate_calls == [(3, ["toxicity", "toxicity_v2"])]
+    assert duplicates == 1
+    assert results["toxicity/score"].tolist() == [1, 2, 3, 2]
+    assert results["toxicity_v2/score"].tolist() == [2, 4, 6, 4]
+    assert np.array_equal(results["token_count/score"], [1, 1, 1, 1])
@@ -0,0 +1,106 @@
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.eval.native_scorers import (
+    native_scorer,
+    normalized_match,
+    rouge_l,
+    token_f1,
+)
+
+_PUNCTUATION = re.compile(r"[!-/:-@\[-`{-~]")
+
+
+def _normalize(text):
+    # The native metrics' normalization: lowercase, ASCII punctuation to spaces, no articles
+    tokens = _PUNCTUATION.sub(" ", (text or "").lower()).split()
+    return [t for t in tokens if t not in ("a", "an", "the")]
+
+
+def _reference_f1(prediction, reference):
+    p, r = _normalize(prediction), _normalize(reference)
+    if not p or not r:
+        return float(p == r)
+    common = sum((Counter(p) & Counter(r)).values())
+    return 2 * common / (len(p) + len(r))
+
+
+def _reference_lcs(a, b):
+    table = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            table[i + 1][j + 1] = table[i][j] + 1 if x == y else max(table[i][j + 1], table[i + 1][j])
+    return table[-1][-1]
+
+
+def _reference_rouge_l(prediction, reference):
+    p, r = _normalize(prediction), _normalize(reference)
+    if not p and not r:
+        return 0.0
+    return 2 * _reference_lcs(p, r) / (len(p) + len(r))
+
+
+def _random_text(rng, words):
+    vocabulary = ["cat", "dog", "The", "a", "sat", "on", "mat", "café", "naïve", "日本語", "🙂", "don't", "x,y"]
+    return " ".join(rng.choice(vocabulary, size=words))
+
+
+EDGE_CASES = [
+    ("", ""),
+    ("", "something"),
+    ("something", ""),
+    (None, "something"),
+    ("   ", "\t\n"),
+    ("The", "a an the"),
+    ("Hello, World!", "hello world"),
+    ("Café NAÏVE", "café naïve"),
+    ("日本語 テキスト", "日本語"),
+    ("emoji 🙂 here", "🙂 emoji"),
+    # Ties: repeated tokens and equal-length alternative alignments
+    ("a b a b a b", "b a b a"),
+    ("x y x y", "y x y x"),
+    ("cat cat cat", "cat"),
+    ("one two three", "three two one"),
+]
+
+
+def _frame(pairs):
+    return pd.DataFrame({"outputs": [p for p, _ in pairs], "ground_truth": [r for _, r in pairs]})
+
+
+def _long_pairs():
+    rng = np.random.default_rng(7)
+    # Longer than one 64-bit word of the bit-parallel LCS, on both sides
+    return [(_random_text(rng, n), _random_text(rng, m)) for n, m in [(65, 64), (64, 65), (130, 200), (300, 70), (1, 257)]]
+
+
+@pytest.mark.parametrize("pairs", [EDGE_CASES, _long_pairs()], ids=["edge_cases", "long"])
+def test_token_f1_matches_reference(pairs):
+    expected = [_reference_f1(p, r) for p, r in pairs]
+
+    np.testing.assert_allclose(token_f1(_frame(pairs)), expected)
+
+
+@pytest.mark.parametrize("pairs", [EDGE_CASES, _long_pairs()], ids=["edge_cases", "long"])
+def test_rouge_l_matches_reference(pairs):
+    expected = [_reference_rouge_l(p, r) for p, r in pairs]
+
+    np.testing.assert_allclose(rouge_l(_frame(pairs)), expected)
+
+
+@pytest.mark.parametrize("pairs", [EDGE_CASES, _long_pairs()], ids=["edge_cases", "long"])
+def test_normalized_match_matches_reference(pairs):
+    pairs = pairs + [(p, p.upper() + " !") for p, _ in pairs if p]
+    expected = [float(_normalize(p) == _normalize(r)) for p, r in pairs]
+
+    np.testing.assert_array_equal(normalized_match(_frame(pairs)), expected)
+
+
+def test_readability_approximations_are_opt_in():
+    for name in ("flesch_kincaid_grade_level", "ari_grade_level"):
+        assert native_scorer(name) is None
+        assert native_scorer(f"{name}_approx") is not None
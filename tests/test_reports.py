@@ -0,0 +1,143 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.services.eval.reports import Report, page_rows, query, write_sort_index
+from app.services.eval.results import ROW_INDEX_COLUMN
+
+CHUNK_ROWS = [10, 10, 7]
+ROW_GROUP_ROWS = 4
+
+
+def _scores(n: int) -> np.ndarray:
+    # Few distinct values, so sorts have ties, and some errored rows
+    scores = np.array([(i * 7) % 5 + 1 for i in range(n)], dtype=float)
+    scores[::6] = np.nan
+    return scores
+
+
+@pytest.fixture(params=[True, False], ids=["sort_index", "no_sort_index"])
+def report(request, tmp_path):
+    scores = _scores(sum(CHUNK_ROWS))
+    start = 0
+    for chunk, rows in enumerate(CHUNK_ROWS):
+        table = pa.table({
+            ROW_INDEX_COLUMN: pa.array(range(start, start + rows), type=pa.int64()),
+            "inputs": [f"question {i}" for i in range(start, start + rows)],
+            "outputs": [("yes " if i % 3 else "no ") + str(i) for i in range(start, start + rows)],
+            "quality/score": scores[start:start + rows],
+            "quality/justification": ["ok"] * rows,
+        })
+        # Row groups that straddle the page sizes below
+        pq.write_table(table, os.path.join(tmp_path, f"chunk-{chunk:06d}.parquet"), row_group_size=ROW_GROUP_ROWS)
+        start += rows
+    report = Report(str(tmp_path))
+    if request.param:
+        write_sort_index(report)
+        report = Report(str(tmp_path))
+    return report
+
+
+def _all_rows(report: Report) -> pd.DataFrame:
+    return pd.concat([pq.read_table(os.path.join(report.path, n)).to_pandas() for n in sorted(os.listdir(report.path))
+                      if n.endswith(".parquet")], ignore_index=True)
+
+
+def _page_by_cursor(report: Report, limit: int, **kwargs) -> list:
+    seen, cursor = [], None
+    # A cursor that does not advance would page forever
+    for _ in range(sum(CHUNK_ROWS) + 1):
+        table, _ = query(report, limit=limit, cursor=cursor, **kwargs)
+        rows, cursor = page_rows(table, limit)
+        seen += [row[ROW_INDEX_COLUMN] for row in rows]
+        if cursor is None:
+            return seen
+    pytest.fail(f"Cursor paging did not finish, stuck after {seen[-limit:]}")
+
+
+def _page_by_offset(report: Report, limit: int, **kwargs) -> list:
+    seen, offset = [], 0
+    while True:
+        table, total = query(report, limit=limit, offset=offset, **kwargs)
+        seen += table.column(ROW_INDEX_COLUMN).to_pylist()
+        offset += limit
+        if offset >= total:
+            assert len(seen) == total
+            return seen
+
+
+def _matching(report: Report, predicate) -> list:
+    rows = _all_rows(report)
+    return rows[predicate(rows)][ROW_INDEX_COLUMN].tolist()
+
+
+def _assert_sorted(report: Report, row_indexes: list, descending: bool):
+    scores = _all_rows(report).set_index(ROW_INDEX_COLUMN)["quality/score"].loc[row_indexes].to_numpy()
+    valid = scores[~np.isnan(scores)]
+    # Errored rows come last in both directions
+    assert np.isnan(scores[len(valid):]).all()
+    steps = np.diff(valid)
+    assert (steps <= 0).all() if descending else (steps >= 0).all()
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 5, 27, 100])
+def test_cursor_pages_cover_every_row_once(report, limit):
+    assert _page_by_cursor(report, limit) == list(range(sum(CHUNK_ROWS)))
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 9])
+def test_filtered_cursor_pages_cover_every_match_once(report, limit):
+    expected = _matching(report, lambda rows: rows["quality/score"] >= 3)
+
+    assert _page_by_cursor(report, limit, filters=["quality>=3"]) == expected
+    assert _page_by_cursor(report, limit, filters=["quality>=3"], search="YES") == _matching(
+        report, lambda rows: (rows["quality/score"] >= 3) & rows["outputs"].str.startswith("yes")
+    )
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7])
+def test_offset_pages_cover_every_row_once(report, limit):
+    assert _page_by_offset(report, limit) == list(range(sum(CHUNK_ROWS)))
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [1, 3, 4, 10])
+def test_sorted_filtered_pages_cover_every_match_once(report, limit, descending):
+    sort = "-quality" if descending else "quality"
+    expected = _matching(report, lambda rows: rows["quality/score"] != 2)
+
+    seen = _page_by_offset(report, limit, sort=sort, filters=["quality!=2"])
+
+    assert len(seen) == len(set(seen))
+    assert sorted(seen) == sorted(expected)
+    _assert_sorted(report, seen, descending)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_pages_without_filter(report, descending):
+    seen = _page_by_offset(report, 4, sort="-quality" if descending else "quality")
+
+    assert sorted(seen) == list(range(sum(CHUNK_ROWS)))
+    _assert_sorted(report, seen, descending)
+
+
+def test_errored_rows_filter(report):
+    expected = _matching(report, lambda rows: rows["quality/score"].isna())
+
+    assert _page_by_cursor(report, 2, filters=["quality=null"]) == expected
+
+
+def test_cursor_past_the_end(report):
+    table, total = query(report, cursor=sum(CHUNK_ROWS) - 1)
+
+    assert table.num_rows == 0
+    assert total == sum(CHUNK_ROWS)
+
+
+def test_sorted_queries_reject_cursors(report):
+    with pytest.raises(ValueError, match="Cursors are not supported"):
+        query(report, sort="quality", cursor=3)
@@ -0,0 +1,142 @@
+import math
+import os
+import threading
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlmodel import Session, select
+
+from app.db.models import (
+    EvaluationProfile,
+    EvaluationRun,
+    EvaluationRunChunk,
+    RunMetric,
+    RunStatus,
+    ScorerDefinition,
+    ScorerType,
+)
+from app.services.eval import execution
+from app.services.eval.datasets import iter_chunks
+from app.services.eval.execution import _shard_chunks, run_evaluation_task
+from app.services.eval.results import ROW_INDEX_COLUMN
+
+ROWS = 53
+CHUNK_SIZE = 5
+
+
+def _frame(rows: int = ROWS) -> pd.DataFrame:
+    return pd.DataFrame({
+        "inputs": [f"question {i}" for i in range(rows)],
+        "outputs": [" ".join(["word"] * (i % 7 + 1)) for i in range(rows)],
+    })
+
+
+@pytest.fixture
+def parquet_dataset(tmp_path):
+    path = str(tmp_path / "dataset.parquet")
+    # Row groups that do not line up with chunks
+    pq.write_table(pa.Table.from_pandas(_frame(), preserve_index=False), path, row_group_size=7)
+    return path
+
+
+@pytest.mark.parametrize("shard_count", [1, 2, 3, 4, 11, 12])
+def test_shards_cover_every_chunk_once(shard_count):
+    total_chunks = math.ceil(ROWS / CHUNK_SIZE)
+    ranges = [_shard_chunks(total_chunks, shard_count, i) for i in range(shard_count)]
+
+    assert [c for start, stop in ranges for c in range(start, stop)] == list(range(total_chunks))
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_chunk_ranges_read_the_same_rows_as_a_full_pass(fmt, parquet_dataset, tmp_path):
+    path = parquet_dataset
+    if fmt == "csv":
+        path = str(tmp_path / "dataset.csv")
+        _frame().to_csv(path, index=False)
+    full = list(iter_chunks(path, CHUNK_SIZE))
+    total_chunks = len(full)
+
+    for shard_count in (2, 3, 4):
+        for shard in range(shard_count):
+            start, stop = _shard_chunks(total_chunks, shard_count, shard)
+            chunks = list(iter_chunks(path, CHUNK_SIZE, start, stop))
+            assert len(chunks) == stop - start
+            for got, expected in zip(chunks, full[start:stop]):
+                pd.testing.assert_frame_equal(got.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_chunk_range_reads_only_its_row_groups(parquet_dataset, monkeypatch):
+    read = []
+    iter_batches = pq.ParquetFile.iter_batches
+
+    def spy(self, *args, row_groups=None, **kwargs):
+        read.extend(row_groups)
+        return iter_batches(self, *args, row_groups=row_groups, **kwargs)
+
+    monkeypatch.setattr(pq.ParquetFile, "iter_batches", spy)
+
+    # Rows 20-34 live in row groups 2 (14-20), 3 (21-27) and 4 (28-34)
+    list(iter_chunks(parquet_dataset, CHUNK_SIZE, 4, 7))
+
+    assert read == [2, 3, 4]
+
+
+def _create_run(session: Session, profile: EvaluationProfile, dataset: str, shard_count: int) -> EvaluationRun:
+    run = EvaluationRun(profile_id=profile.id, dataset_path=dataset, chunk_size=CHUNK_SIZE, shard_count=shard_count)
+    session.add(run)
+    session.commit()
+    session.refresh(run)
+    return run
+
+
+def test_sharded_run_is_reduced_once(database, parquet_dataset, monkeypatch):
+    finished = []
+    finish_if_complete = execution._finish_if_complete
+
+    def counting_finish(session, run_id):
+        done = finish_if_complete(session, run_id)
+        if done:
+            finished.append(run_id)
+        return done
+
+    monkeypatch.setattr(execution, "_finish_if_complete", counting_finish)
+
+    with Session(database) as session:
+        scorer = ScorerDefinition(
+            name=f"tokens-{uuid4().hex[:8]}", scorer_type=ScorerType.BUILTIN, configuration={"metric_name": "token_count"}
+        )
+        session.add(scorer)
+        session.commit()
+        profile = EvaluationProfile(name="sharding", scorer_ids=[scorer.id])
+        session.add(profile)
+        session.commit()
+        sharded_id = _create_run(session, profile, parquet_dataset, shard_count=3).id
+        single_id = _create_run(session, profile, parquet_dataset, shard_count=1).id
+
+    shards = [threading.Thread(target=run_evaluation_task, args=(sharded_id, i)) for i in range(3)]
+    for shard in shards:
+        shard.start()
+    for shard in shards:
+        shard.join()
+    run_evaluation_task(single_id)
+
+    assert finished == [sharded_id, single_id]
+    with Session(database) as session:
+        sharded, single = session.get(EvaluationRun, sharded_id), session.get(EvaluationRun, single_id)
+        assert sharded.status == RunStatus.COMPLETED, sharded.error_message
+        assert sharded.total_chunks == sharded.chunks_completed == math.ceil(ROWS / CHUNK_SIZE)
+        assert sharded.rows_completed == ROWS
+        assert sharded.summary_results == single.summary_results
+        assert sharded.summary_results["token_count/count"] == ROWS
+
+        chunks = session.exec(select(EvaluationRunChunk).where(EvaluationRunChunk.run_id == sharded.id)).all()
+        rows = pd.concat([pd.read_parquet(chunk.results_path) for chunk in chunks])[ROW_INDEX_COLUMN]
+        assert sorted(rows) == list(range(ROWS))
+        assert all(os.path.exists(chunk.results_path) for chunk in chunks)
+
+        metrics = session.exec(select(RunMetric).where(RunMetric.run_id == sharded.id)).all()
+        assert {f"{m.scorer}/{m.metric}" for m in metrics} <= set(sharded.summary_results)
+        assert len(metrics) == len({(m.scorer, m.metric) for m in metrics})
@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routers import eval as eval_router
+from app.services.eval import uploads
+from app.services.eval.uploads import MultipartFileStream, save_stream
+
+
+async def _chunks(content: bytes):
+    yield content
+
+
+def _upload(content: bytes, filename: str = "data.csv"):
+    return asyncio.run(save_stream(_chunks(content), filename))
+
+
+def test_uploads_of_the_same_content_keep_their_own_files():
+    content = b"inputs,outputs\nsame,content\n"
+
+    (first, sha_first, _), (second, sha_second, _) = _upload(content), _upload(content)
+
+    assert sha_first == sha_second
+    assert first != second
+    assert os.path.exists(first) and os.path.exists(second)
+
+
+def _multipart(content: bytes, filename: str = "data.csv", boundary: str = "b0undary") -> bytes:
+    return (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="note"\r\n\r\nnot the file\r\n'
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+
+
+async def _pieces(body: bytes, size: int, sent: list = None):
+    for i in range(0, len(body), size):
+        if sent is not None:
+            sent.append(size)
+        yield body[i:i + size]
+
+
+@pytest.mark.parametrize("piece_size", [1, 7, 4096])
+def test_multipart_file_is_parsed_as_it_streams(piece_size):
+    content = b"inputs,outputs\r\n--not-a-boundary,\xc3\xa9\r\n" * 50
+
+    async def read():
+        upload = MultipartFileStream("multipart/form-data; boundary=b0undary", _pieces(_multipart(content), piece_size))
+        filename = await upload.open()
+        return filename, b"".join([chunk async for chunk in upload.chunks()])
+
+    assert asyncio.run(read()) == ("data.csv", content)
+
+
+def test_multipart_without_the_file_is_rejected():
+    async def read():
+        body = b'--b0undary\r\nContent-Disposition: form-data; name="note"\r\n\r\nhi\r\n--b0undary--\r\n'
+        await MultipartFileStream("multipart/form-data; boundary=b0undary", _pieces(body, 10)).open()
+
+    with pytest.raises(ValueError, match="no `file` file"):
+        asyncio.run(read())
+
+
+def _post_chunked(body: bytes, sent: list) -> httpx.Response:
+    app = FastAPI()
+    app.include_router(eval_router.router)
+
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # A generator body: chunked transfer, no Content-Length
+            return await client.post(
+                "/eval/upload",
+                content=_pieces(body, 16 * 1024, sent),
+                headers={"content-type": "multipart/form-data; boundary=b0undary"},
+            )
+
+    return asyncio.run(post())
+
+
+def test_chunked_upload_is_ingested(database):
+    content = "".join(f"question {i},answer {i}\n" for i in range(5000)).encode()
+
+    response = _post_chunked(_multipart(b"inputs,outputs\n" + content, "qa.csv"), [])
+
+    assert response.status_code == 200, response.text
+    assert response.json()["row_count"] == 5000
+    assert response.json()["detected_columns"] == ["inputs", "outputs"]
+
+
+def test_chunked_upload_over_the_limit_stops_reading_early(monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 64 * 1024)
+    sent = []
+
+    response = _post_chunked(_multipart(b"x" * (4 * 1024 * 1024)), sent)
+
+    assert response.status_code == 413
+    assert sum(sent) < 256 * 1024
+    assert not [name for name in os.listdir(uploads.UPLOAD_DIR) if name.endswith(".tmp")]